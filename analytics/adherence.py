@@ -0,0 +1,172 @@
+"""
+Schedule adherence of supervisions.
+
+Compares supervisions with their planned times: late start and early finish
+against the planned times of the supervision (in settings.ADMIN_TIME_ZONE),
+overtime of activity statistics against the planned duration of their
+activity, and idle gaps between consecutive statistics. All supervisions of
+a request are computed in one pass with pandas. Reports of verified
+supervisions are cached until the supervision or one of its statistics
+changes.
+"""
+import math
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from analytics.models import ActivityStatistics, Supervision
+from analytics.rollups import local_timezone, planned_seconds
+from core.metrics import record_cache_read
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+ADHERENCE_CACHE_KEY = "analytics:adherence:{}"
+ADHERENCE_CACHE_TIMEOUT = 24 * 60 * 60
+
+METRICS_CACHE_NAME = "adherence"
+
+DAY_SECONDS = 24 * 60 * 60
+STATISTICS_COLUMNS = ["supervision_id", "activity_id", "start_date", "end_date"]
+
+
+def _time_seconds(value) -> float | None:
+    if value is None:
+        return None
+    return value.hour * 3600 + value.minute * 60 + value.second + value.microsecond / 1e6
+
+
+def _wrap(seconds: "pd.Series") -> "pd.Series":
+    """Bring differences of times of day into [-12 h, 12 h), so a start just after midnight is not a day early."""
+    return (seconds + DAY_SECONDS / 2) % DAY_SECONDS - DAY_SECONDS / 2
+
+
+def _seconds_of_day(dates: "pd.Series") -> "pd.Series":
+    import pandas as pd
+
+    local = pd.to_datetime(dates, utc=True).dt.tz_convert(local_timezone())
+    return (local - local.dt.normalize()).dt.total_seconds()
+
+
+def _duration(seconds) -> timedelta | None:
+    return None if math.isnan(seconds) else timedelta(seconds=float(seconds))
+
+
+def compute_reports(supervisions: list[Supervision]) -> dict[int, dict]:
+    """Adherence reports of the supervisions by id; the number of queries does not depend on their number."""
+    # pandas (with numpy) is imported on first use only, see core.startup
+    import pandas as pd
+
+    if not supervisions:
+        return {}
+
+    plans = pd.DataFrame.from_records(
+        [
+            (
+                supervision.pk,
+                supervision.start_date,
+                supervision.end_date,
+                _time_seconds(supervision.planned_start_time),
+                _time_seconds(supervision.planned_end_time),
+            )
+            for supervision in supervisions
+        ],
+        columns=["supervision_id", "start_date", "end_date", "planned_start", "planned_end"],
+    ).set_index("supervision_id")
+    plans[["planned_start", "planned_end"]] = plans[["planned_start", "planned_end"]].astype(float)
+    late_start = _wrap(_seconds_of_day(plans["start_date"]) - plans["planned_start"]).clip(lower=0)
+    early_finish = _wrap(plans["planned_end"] - _seconds_of_day(plans["end_date"])).clip(lower=0)
+
+    rows = ActivityStatistics.objects.filter(supervision_id__in=plans.index.tolist()).order_by(
+        "supervision_id", "start_date", "id"
+    ).values_list(*STATISTICS_COLUMNS)
+    frame = pd.DataFrame.from_records(list(rows), columns=STATISTICS_COLUMNS)
+    start = pd.to_datetime(frame["start_date"], utc=True)
+    end = pd.to_datetime(frame["end_date"], utc=True)
+
+    # Planned durations ending before they start end on the next day, as in core.utils.time_difference
+    excess = (end - start).dt.total_seconds() - frame["activity_id"].map(
+        planned_seconds(frame["activity_id"].unique())
+    )
+    frame["overtime"] = excess.where(excess > 0)
+    gap = (start - end.groupby(frame["supervision_id"]).shift()).dt.total_seconds()
+    frame["idle"] = gap.where(gap > 0)
+
+    totals = frame.groupby("supervision_id").agg(
+        statistics_count=("activity_id", "count"),
+        overtime_count=("overtime", "count"),
+        overtime=("overtime", "sum"),
+        idle_count=("idle", "count"),
+        idle=("idle", "sum"),
+        max_idle=("idle", "max"),
+    ).reindex(plans.index)
+    totals = totals.fillna({column: 0 for column in totals.columns if column != "max_idle"})
+
+    reports = {}
+    for supervision in supervisions:
+        row = totals.loc[supervision.pk]
+        reports[supervision.pk] = {
+            "supervision": supervision.pk,
+            "verified": supervision.verified,
+            "start_date": supervision.start_date,
+            "end_date": supervision.end_date,
+            "planned_start_time": supervision.planned_start_time,
+            "planned_end_time": supervision.planned_end_time,
+            "late_start": _duration(late_start[supervision.pk]),
+            "early_finish": _duration(early_finish[supervision.pk]),
+            "statistics_count": int(row["statistics_count"]),
+            "overtime_count": int(row["overtime_count"]),
+            "overtime": _duration(row["overtime"]),
+            "idle_count": int(row["idle_count"]),
+            "idle": _duration(row["idle"]),
+            "max_idle": _duration(row["max_idle"]),
+        }
+
+    return reports
+
+
+def _versions(supervisions: list[Supervision]) -> dict[int, tuple]:
+    """What a cached report depends on: the supervision and the last change and number of its statistics."""
+    rows = (
+        ActivityStatistics.objects.filter(supervision_id__in=[supervision.pk for supervision in supervisions])
+        .values("supervision_id")
+        .annotate(updated=Max("updated_date"), count=Count("id"))
+        .order_by()
+    )
+    statistics = {row["supervision_id"]: (row["updated"], row["count"]) for row in rows}
+    return {
+        supervision.pk: (supervision.updated_date, *statistics.get(supervision.pk, (None, 0)))
+        for supervision in supervisions
+    }
+
+
+def get_adherence_reports(supervisions: list[Supervision]) -> list[dict]:
+    """Adherence reports in the order of the supervisions; those of verified supervisions come from the cache."""
+    verified = [supervision for supervision in supervisions if supervision.verified]
+    reports = {}
+    if verified:
+        versions = _versions(verified)
+        cached = cache.get_many([ADHERENCE_CACHE_KEY.format(supervision.pk) for supervision in verified])
+        for supervision in verified:
+            entry = cached.get(ADHERENCE_CACHE_KEY.format(supervision.pk))
+            hit = entry is not None and entry["version"] == versions[supervision.pk]
+            record_cache_read(METRICS_CACHE_NAME, hit=hit)
+            if hit:
+                reports[supervision.pk] = entry["report"]
+
+    computed = compute_reports([supervision for supervision in supervisions if supervision.pk not in reports])
+    if verified:
+        cache.set_many(
+            {
+                ADHERENCE_CACHE_KEY.format(pk): {"version": versions[pk], "report": report}
+                for pk, report in computed.items()
+                if pk in versions
+            },
+            ADHERENCE_CACHE_TIMEOUT,
+        )
+
+    reports.update(computed)
+    return [reports[supervision.pk] for supervision in supervisions]
@@ -8,7 +8,9 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from nested_admin.nested import NestedTabularInline, NestedModelAdmin
 from analytics.models import (
+    ActivityNorm,
     ActivityStatistics,
+    DailyActivityRollup,
     Supervision,
     Comment,
     CommentFiles,
@@ -17,20 +19,22 @@ from analytics.models import (
 from django.utils.translation import gettext_lazy as _
 
 from core import admin_mixins
-from core.models import Organization
+from core.paginators import EstimatedCountPaginator
 
 
-class ActivityStatisticsOrganizationFilter(admin.SimpleListFilter):
+class ActivityStatisticsOrganizationFilter(admin_mixins.AutocompleteListFilter):
     title = _("organization")
     parameter_name = "organization"
+    source_model = Supervision
+    field_name = "organization"
+    lookup_field = "supervision__organization__id"
 
-    def lookups(self, request, model_admin):
-        return [(item.id, item.name) for item in Organization.objects.all()]
 
-    def queryset(self, request, queryset):
-        if self.value():
-            return queryset.filter(supervision__organization__id=self.value())
-        return queryset
+class SupervisionOrganizationFilter(admin_mixins.AutocompleteListFilter):
+    title = _("organization")
+    parameter_name = "organization"
+    field_name = "organization"
+    lookup_field = "organization__id"
 
 
 class ActivityStatisticsSupervisionFilter(admin.SimpleListFilter):
@@ -66,8 +70,9 @@ class CommentFileInline(NestedTabularInline):
         return ""
 
 
-class CommentsAdminInline(NestedTabularInline):
+class CommentsAdminInline(admin_mixins.PaginatedInlineMixin, NestedTabularInline):
     model = Comment
+    per_page = 10
     formfield_overrides = {
         PointField: {"widget": OSMWidget(attrs={
             'map_width': 500,
@@ -86,10 +91,15 @@ class CommentsAdminInline(NestedTabularInline):
         "updated_date",
     ) + admin_mixins.CreatedByUpdatedByAdminMixin.readonly_fields
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("created_by")
+
 
 @admin.register(ActivityStatistics)
 class ActivityStatisticsAdmin(
-    admin_mixins.LocalizedDateTimeAdminMixin, NestedModelAdmin
+    admin_mixins.LocalizedDateTimeAdminMixin,
+    admin_mixins.AutocompleteListFilterAdminMixin,
+    NestedModelAdmin,
 ):
     list_display = (
         "id",
@@ -99,6 +109,7 @@ class ActivityStatisticsAdmin(
         "start_date",
         "end_date",
         "delta",
+        "is_outlier",
         "is_valid",
     )
     readonly_fields = (
@@ -112,15 +123,21 @@ class ActivityStatisticsAdmin(
         "start_date",
         "end_date",
         "delta",
+        "outlier_score",
+        "is_outlier",
         "is_valid",
         "failure",
     )
-    fields = ("id", "activity", "start_date", "end_date", "delta", "failure")
+    fields = ("id", "activity", "start_date", "end_date", "delta", "outlier_score", "is_outlier", "failure")
     list_filter = (
         ActivityStatisticsOrganizationFilter,
         ActivityStatisticsSupervisionFilter,
+        "is_outlier",
         "activity",
     )
+    list_select_related = ("activity__activity_group", "supervision__organization", "failure")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     inlines = (CommentsAdminInline,)
 
@@ -149,7 +166,9 @@ class SupervisionCommentsAdminInline(NestedTabularInline):
 
 @admin.register(Supervision)
 class SupervisionAdmin(
-    admin_mixins.LocalizedDateTimeAdminMixin, admin.ModelAdmin
+    admin_mixins.LocalizedDateTimeAdminMixin,
+    admin_mixins.AutocompleteListFilterAdminMixin,
+    admin.ModelAdmin,
 ):
     list_display = (
         "id",
@@ -166,7 +185,10 @@ class SupervisionAdmin(
         + admin_mixins.CreatedByUpdatedByAdminMixin.readonly_fields
         + ("updated_date", "created_date", "linked_activity_table", "verification_date")
     )
-    list_filter = ("organization",)
+    list_filter = (SupervisionOrganizationFilter,)
+    list_select_related = ("organization", "user")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fields = (
         ("organization", "user", "worker", "start_date", "end_date", "planned_start_time", "planned_end_time")
         + admin_mixins.CreatedByUpdatedByAdminMixin.fields
@@ -190,7 +212,7 @@ class SupervisionAdmin(
     def linked_activity_table(self, obj):
         rows = "".join(
             f"<tr><td>{item.activity.name}</td><td>{item.delta}</td></tr>"
-            for item in obj.statistics.all()
+            for item in obj.statistics.select_related("activity")
         )
         html = f"<table><thead><tr><th>Activity name</th><th>Delta</th></tr></thead><tbody>{rows}</tbody></table>"
         return mark_safe(html)
@@ -198,12 +220,8 @@ class SupervisionAdmin(
     linked_activity_table.short_description = "Statistics"
 
     def save_model(self, request, obj, form, change):
-        monitor_field_name = "verified"
-
-        if change:  # Only for existing objects
-            original_obj = Supervision.objects.get(pk=obj.pk)
-            if getattr(obj, monitor_field_name) != getattr(original_obj, monitor_field_name):
-                obj.verification_date = timezone.now()
+        if change and "verified" in obj.changed_fields:
+            obj.verification_date = timezone.now()
 
         super().save_model(request, obj, form, change)
 
@@ -211,3 +229,55 @@ class SupervisionAdmin(
 @admin.register(Failure)
 class FailureAdmin(admin_mixins.LocalizedDateTimeAdminMixin, admin.ModelAdmin):
     readonly_fields = ("start_date", "end_date")
+
+
+@admin.register(ActivityNorm)
+class ActivityNormAdmin(admin_mixins.LocalizedDateTimeAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "activity",
+        "scope",
+        "classifier",
+        "organization",
+        "sample_count",
+        "median",
+        "trimmed_mean",
+        "p10",
+        "p90",
+        "computed_date",
+    )
+    list_filter = ("scope",)
+    list_select_related = ("activity", "classifier", "organization")
+    search_fields = ("activity__name",)
+
+    # Norms are computed from verified activity statistics only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyActivityRollup)
+class DailyActivityRollupAdmin(admin_mixins.LocalizedDateTimeAdminMixin, admin.ModelAdmin):
+    list_display = (
+        "day",
+        "organization",
+        "worker",
+        "activity",
+        "statistics_count",
+        "total_duration",
+        "failure_duration",
+        "overtime_count",
+    )
+    list_filter = ("day",)
+    list_select_related = ("organization", "worker", "activity")
+    search_fields = ("activity__name", "worker__first_name", "worker__last_name")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Rollups are computed by the refresh_rollups command
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,143 @@
+import json
+import tracemalloc
+from itertools import count
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from analytics.models import ActivityStatistics, Supervision
+from core.benchmarking import benchmark
+from core.models import Organization
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from layouts.models import Activity
+from users.models import User
+
+
+COMMENT_FILE_SIZE = 200 * 1024
+COMMENT_COORDINATES = json.dumps({"type": "Point", "coordinates": [27.56, 53.9]})
+
+
+def start_supervision(context) -> tuple[Supervision, list[int]]:
+    """A running supervision of the benchmark user and two activities of the worker's layout."""
+    worker = User.objects.filter(username__startswith=f"{context.label}_worker_").order_by("id").first()
+    supervision = Supervision.objects.create(
+        worker=worker,
+        organization_id=worker.organization_id,
+        user=context.user,
+    )
+    activities = list(
+        Activity.objects.filter(
+            activity_group__layout__classifier_id=worker.classifier_id
+        ).values_list("id", flat=True)[:2]
+    )
+    return supervision, activities
+
+
+@benchmark("supervision_list", rounds=20)
+def supervision_list(context):
+    url = reverse("supervision")
+    return lambda: context.request("get", url)
+
+
+def _render_page(context, renderer):
+    """Render a full page of 100 supervisions; extra values are the size and the peak memory allocated by one render."""
+    data = context.request("get", reverse("supervision"), data={"size": 100}).data
+
+    tracemalloc.start()
+    rendered = renderer.render(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    extra = {"supervisions": len(data["results"]), "bytes": len(rendered), "peak_kib": round(peak / 1024)}
+
+    def render():
+        renderer.render(data)
+        return extra
+
+    return render
+
+
+@benchmark("supervision_page_render_json", rounds=30)
+def supervision_page_render_json(context):
+    return _render_page(context, JSONRenderer())
+
+
+@benchmark("supervision_page_render_orjson", rounds=30)
+def supervision_page_render_orjson(context):
+    return _render_page(context, ORJSONRenderer())
+
+
+@benchmark("supervision_page_render_msgpack", rounds=30)
+def supervision_page_render_msgpack(context):
+    return _render_page(context, MessagePackRenderer())
+
+
+def _export(context, organization: Organization | None):
+    url = reverse("supervision_list_export")
+    rows = ActivityStatistics.objects.filter(supervision__verified=True)
+    if organization:
+        url = f"{url}?organization={organization.pk}"
+        rows = rows.filter(supervision__organization=organization)
+
+    extra = {"rows": rows.count()}
+
+    def export():
+        context.request("get", url)
+        return extra
+
+    return export
+
+
+@benchmark("supervision_export_10k", rounds=5, warmup=1)
+def supervision_export_10k(context):
+    # The dataset of run_benchmarks spreads ~100k export rows over 10 organizations
+    organization = Organization.objects.get(name=f"{context.label} organization 0")
+    return _export(context, organization)
+
+
+@benchmark("supervision_export_100k", rounds=3, warmup=1)
+def supervision_export_100k(context):
+    return _export(context, None)
+
+
+@benchmark("activity_transition", rounds=50)
+def activity_transition(context):
+    supervision, activities = start_supervision(context)
+    url = reverse("analytics_create", args=[supervision.pk])
+    steps = count()
+
+    return lambda: context.request("post", url, 201, data={"activity": activities[next(steps) % 2]}, format="json")
+
+
+@benchmark("failure_start_finish", rounds=50)
+def failure_start_finish(context):
+    supervision, activities = start_supervision(context)
+    ActivityStatistics.objects.create(activity_id=activities[0], supervision=supervision)
+    start_url = reverse("activity_start_failure", args=[supervision.pk, activities[0]])
+    finish_url = reverse("activity_finish_failure", args=[supervision.pk, activities[0]])
+
+    def start_finish():
+        context.request("post", start_url, 201)
+        context.request("post", finish_url, 201)
+
+    return start_finish
+
+
+@benchmark("comment_create_with_files", rounds=30)
+def comment_create_with_files(context):
+    supervision, activities = start_supervision(context)
+    statistics = ActivityStatistics.objects.create(activity_id=activities[0], supervision=supervision)
+    url = reverse("analytics_comment", kwargs={"analytics_id": statistics.pk})
+    content = b"\xff" * COMMENT_FILE_SIZE
+
+    def create_comment():
+        files = [SimpleUploadedFile(f"photo_{number}.jpg", content, "image/jpeg") for number in range(2)]
+        context.request(
+            "post",
+            url,
+            201,
+            data={"text": "Benchmark comment", "coordinates": COMMENT_COORDINATES, "files": files},
+            format="multipart",
+        )
+
+    return create_comment
@@ -31,3 +31,9 @@ class SupervisionIsNotFinishedException(BaseAPIException):
     status_code = status.HTTP_400_BAD_REQUEST
     default_detail = "Last supervision is not finished"
     default_code = "last_supervision_is_not_finished"
+
+
+class LiveFeedRequiresASGIException(BaseAPIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = "The live feed is only served by the ASGI server"
+    default_code = "live_feed_requires_asgi"
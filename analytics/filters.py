@@ -1,10 +1,12 @@
 from datetime import date, datetime
 
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 from rest_framework.filters import BaseFilterBackend
 
-from analytics.models import Supervision
-from analytics.utils import parse_date_query_param
+from analytics import geo
+from analytics.models import ActivityStatistics, Comment, Supervision
+from analytics.utils import parse_bbox_query_param, parse_date_query_param, parse_point_query_param
 
 
 class SupervisionDateFilter(BaseFilterBackend):
@@ -40,3 +42,107 @@ class SupervisionDateFilter(BaseFilterBackend):
         
         return queryset
 
+
+
+class SupervisionOutlierFilter(BaseFilterBackend):
+    """Filter backend for filtering supervisions with or without activity statistics flagged as outliers."""
+
+    def filter_queryset(self, request, queryset, view):
+        has_outliers = request.query_params.get('has_outliers')
+        if has_outliers is None:
+            return queryset
+
+        outliers = Exists(ActivityStatistics.objects.filter(supervision=OuterRef('pk'), is_outlier=True))
+        if has_outliers.lower() in ('true', '1'):
+            return queryset.filter(outliers)
+        if has_outliers.lower() in ('false', '0'):
+            return queryset.filter(~outliers)
+
+        return queryset.none()
+
+
+class DailyRollupDateFilter(BaseFilterBackend):
+    """Filter backend for filtering daily rollups by day within a date range."""
+
+    def filter_queryset(self, request, queryset, view):
+        start_date_param = request.query_params.get('start_date')
+        end_date_param = request.query_params.get('end_date')
+
+        start_date = parse_date_query_param(start_date_param) if start_date_param else None
+        end_date = parse_date_query_param(end_date_param) if end_date_param else None
+
+        if start_date_param and not start_date:
+            return queryset.none()
+        if end_date_param and not end_date:
+            return queryset.none()
+
+        if start_date:
+            queryset = queryset.filter(day__gte=start_date)
+        if end_date:
+            queryset = queryset.filter(day__lte=end_date)
+
+        return queryset
+
+
+class CommentDateFilter(BaseFilterBackend):
+    """Filter backend for filtering comments by created_date within a date range."""
+
+    def filter_queryset(self, request, queryset, view):
+        start_date_param = request.query_params.get('start_date')
+        end_date_param = request.query_params.get('end_date')
+
+        start_date = parse_date_query_param(start_date_param) if start_date_param else None
+        end_date = parse_date_query_param(end_date_param) if end_date_param else None
+
+        if start_date_param and not start_date:
+            return queryset.none()
+        if end_date_param and not end_date:
+            return queryset.none()
+
+        if start_date:
+            queryset = queryset.filter(
+                created_date__gte=timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+            )
+        if end_date:
+            queryset = queryset.filter(
+                created_date__lte=timezone.make_aware(datetime.combine(end_date, datetime.max.time()))
+            )
+
+        return queryset
+
+
+class CommentLocationFilter(BaseFilterBackend):
+    """
+    Filter backend for filtering by comment coordinates: within a bounding box and within a radius of a point.
+
+    Views of comments are filtered directly; other views name the lookup from Comment to their model in
+    ``comment_lookup`` and get the rows with a matching comment.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        bbox_param = request.query_params.get('bbox')
+        point_param = request.query_params.get('point')
+        if not bbox_param and not point_param:
+            return queryset
+
+        lookup = getattr(view, 'comment_lookup', None)
+        comments = queryset if lookup is None else Comment.objects.all()
+        if bbox_param:
+            polygon = parse_bbox_query_param(bbox_param)
+            if polygon is None:
+                return queryset.none()
+            comments = geo.in_bbox(comments, polygon)
+
+        if point_param:
+            point = parse_point_query_param(point_param)
+            try:
+                radius = float(request.query_params.get('radius', ''))
+            except ValueError:
+                return queryset.none()
+            if point is None or not 0 < radius <= geo.MAX_RADIUS:
+                return queryset.none()
+            comments = geo.within_radius(comments, point, radius)
+
+        if lookup is None:
+            return comments
+        return queryset.filter(Exists(comments.filter(**{lookup: OuterRef('pk')})))
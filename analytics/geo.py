@@ -0,0 +1,149 @@
+"""
+Spatial queries of comment coordinates.
+
+Comments are found within a bounding box, within a radius of a point and
+nearest to a point. Every query is narrowed down to a bounding box first,
+which the GiST index of Comment.coordinates answers; only the comments in the
+box of a search circle get the exact spheroid distance. Map clusters snap the
+coordinates to a grid of the zoom level and count the comments per cell in
+one GROUP BY, about CELLS_PER_TILE² clusters per 256 px map tile.
+
+GeoJSON exports are built by the database, one Feature text per row, and
+streamed as a FeatureCollection in chunks of EXPORT_CHUNK_SIZE features.
+Under ASGI the chunks are fetched with sync_to_async, in the thread of the
+request's database connection, so the cursor stays in one thread and the
+event loop is not blocked.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.gis.db.models import Collect
+from django.contrib.gis.db.models.functions import AsGeoJSON, Centroid, Distance, SnapToGrid
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+from django.db.models import Count, F, JSONField, Max, QuerySet, TextField, Value
+from django.db.models.functions import Cast, JSONObject
+
+from analytics.utils import bbox_polygon
+
+
+# Meters per degree of latitude, and of longitude at the equator
+METERS_PER_DEGREE = 111_320
+# Grid cells per side of a 256 px map tile: a cluster per 32 px
+CELLS_PER_TILE = 8
+MAX_ZOOM = 22
+MAX_NEAREST = 100
+# Radius searches are limited to this, meters
+MAX_RADIUS = 100_000
+# Nearest comments are searched this far at most, meters
+DEFAULT_NEAREST_DISTANCE = 50_000
+# Coordinates are exported with 6 decimals, about 0.1 m
+GEOJSON_PRECISION = 6
+EXPORT_CHUNK_SIZE = 2000
+
+
+def circle_bbox(point: Point, meters: float) -> Polygon:
+    """Bounding box of the circle around the point; longitude wrap-around at ±180° is not handled."""
+    latitude_delta = meters / METERS_PER_DEGREE
+    # Degrees of longitude shrink towards the poles
+    longitude_delta = meters / (METERS_PER_DEGREE * max(math.cos(math.radians(point.y)), 0.01))
+    return bbox_polygon(
+        max(point.x - longitude_delta, -180),
+        max(point.y - latitude_delta, -90),
+        min(point.x + longitude_delta, 180),
+        min(point.y + latitude_delta, 90),
+    )
+
+
+def in_bbox(queryset: QuerySet, polygon: Polygon, field: str = "coordinates") -> QuerySet:
+    return queryset.filter(**{f"{field}__intersects": polygon})
+
+
+def within_radius(queryset: QuerySet, point: Point, meters: float, field: str = "coordinates") -> QuerySet:
+    return in_bbox(queryset, circle_bbox(point, meters), field).filter(
+        **{f"{field}__distance_lte": (point, D(m=meters))}
+    )
+
+
+def nearest(queryset: QuerySet, point: Point, limit: int, max_distance: float = DEFAULT_NEAREST_DISTANCE) -> QuerySet:
+    """The ``limit`` comments nearest to the point within ``max_distance`` meters, annotated with their ``distance``."""
+    return (
+        within_radius(queryset, point, max_distance)
+        .annotate(distance=Distance("coordinates", point))
+        .order_by("distance", "id")[:limit]
+    )
+
+
+def grid_size(zoom: int) -> float:
+    """Grid cell size in degrees at the zoom level of a web map."""
+    return 360 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def clusters(queryset: QuerySet, polygon: Polygon, zoom: int) -> list[dict]:
+    """Comments in the bounding box grouped into grid cells; a single comment keeps its id."""
+    rows = (
+        in_bbox(queryset, polygon)
+        .annotate(cell=SnapToGrid("coordinates", grid_size(zoom)))
+        .values("cell")
+        .annotate(count=Count("id"), center=Centroid(Collect("coordinates")), comment=Max("id"))
+        .order_by()
+    )
+    return [
+        {
+            "count": row["count"],
+            "coordinates": row["center"],
+            "comment": row["comment"] if row["count"] == 1 else None,
+        }
+        for row in rows
+    ]
+
+
+def geojson_features(queryset: QuerySet) -> QuerySet:
+    """Comments as GeoJSON Feature texts built by the database, in the order of their ids."""
+    feature = JSONObject(
+        type=Cast(Value("Feature"), TextField()),
+        geometry=Cast(AsGeoJSON("coordinates", precision=GEOJSON_PRECISION), JSONField()),
+        properties=JSONObject(
+            id=F("id"),
+            text=F("text"),
+            created_date=F("created_date"),
+            activity_statistics=F("activity_statistics_id"),
+            activity=F("activity_statistics__activity_id"),
+            supervision=F("activity_statistics__supervision_id"),
+            organization=F("activity_statistics__supervision__organization_id"),
+            worker=F("activity_statistics__supervision__worker_id"),
+        ),
+    )
+    return (
+        queryset.filter(coordinates__isnull=False)
+        .select_related(None)
+        .prefetch_related(None)
+        .annotate(feature=Cast(feature, TextField()))
+        .order_by("id")
+        .values_list("feature", flat=True)
+    )
+
+
+def stream_feature_collection(features: QuerySet):
+    """FeatureCollection text in chunks; rows come from a server-side cursor, so memory does not grow with them."""
+    yield '{"type":"FeatureCollection","features":['
+    chunk = []
+    separator = ""
+    for feature in features.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        chunk.append(feature)
+        if len(chunk) == EXPORT_CHUNK_SIZE:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]}"
+
+
+async def astream_feature_collection(features: QuerySet):
+    """stream_feature_collection for ASGI servers, which would buffer a sync stream whole."""
+    chunks = stream_feature_collection(features)
+    # Thread-sensitive: every chunk is read in the thread that opened the server-side cursor
+    while (chunk := await sync_to_async(next, thread_sensitive=True)(chunks, None)) is not None:
+        yield chunk
@@ -0,0 +1,59 @@
+"""
+Live supervision events.
+
+The analytics services publish activity transitions, failure starts and
+finishes and supervision finishes to the channel of the organization of the
+supervision, once the transaction commits. /api/supervisions/live/ streams
+the events of one organization to the dashboards as Server-Sent Events, so
+they no longer poll the supervision list.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from analytics.models import Supervision
+from core import event_bus
+from core.event_bus import encode_event
+
+
+ACTIVITY_STARTED = "activity_started"
+FAILURE_STARTED = "failure_started"
+FAILURE_FINISHED = "failure_finished"
+SUPERVISION_FINISHED = "supervision_finished"
+
+CHANNEL = "live:organization:{}"
+# Reconnect delay of EventSource clients after a dropped connection
+RETRY_MILLISECONDS = 3000
+
+
+def organization_channel(organization_id: int) -> str:
+    return CHANNEL.format(organization_id)
+
+
+def publish_supervision_event(event_type: str, supervision: Supervision, **data):
+    """Publish the event to the organization of the supervision after commit; nothing is sent on rollback."""
+    event = {
+        "type": event_type,
+        "date": timezone.now(),
+        "organization": supervision.organization_id,
+        "supervision": supervision.pk,
+        "worker": supervision.worker_id,
+        **data,
+    }
+    transaction.on_commit(partial(event_bus.publish, organization_channel(supervision.organization_id), event))
+
+
+async def stream_events(subscription, heartbeat: float):
+    """Server-Sent Events of the subscription; a comment every ``heartbeat`` seconds keeps proxies from closing it."""
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            event = await subscription.get(heartbeat)
+            if event is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {encode_event(event)}\n\n"
+    finally:
+        # Also on a client disconnect, which cancels the stream
+        await subscription.close()
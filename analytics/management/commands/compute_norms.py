@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.norms import recompute_norms, recompute_stale_norms
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the activity time norms from verified, failure-free activity statistics; "
+        "with --stale, recomputes the norms still marked stale by verification changes, e.g. after a restart"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--activity",
+            type=int,
+            action="append",
+            help="Recompute only this activity (repeatable). Default: all activities",
+        )
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help="Recompute only the activities whose norms are marked stale",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="With --stale, recompute at most this many activities, the longest stale first",
+        )
+
+    def handle(self, *args, **options):
+        if options["stale"] and options["activity"]:
+            raise CommandError("--stale and --activity cannot be combined")
+        if options["limit"] is not None and not options["stale"]:
+            raise CommandError("--limit needs --stale")
+
+        started = time.perf_counter()
+        if options["stale"]:
+            activities, stored = recompute_stale_norms(options["limit"])
+            message = f"Stored {stored} norms of {activities} stale activities"
+        else:
+            stored = recompute_norms(options["activity"])
+            message = f"Stored {stored} norms"
+        self.stdout.write(self.style.SUCCESS(f"{message} in {time.perf_counter() - started:.1f} s"))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.outliers import detect_outliers
+
+
+class Command(BaseCommand):
+    help = (
+        "Scores the durations of finished activity statistics against the durations of their activity "
+        "and flags the outliers for verification"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--activity",
+            type=int,
+            action="append",
+            help="Score only the statistics of this activity (repeatable). Default: all activities",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated, flagged = detect_outliers(options["activity"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{flagged} outliers, {updated} statistics updated in {time.perf_counter() - started:.1f} s"
+            )
+        )
@@ -0,0 +1,88 @@
+import os
+import time
+from dataclasses import fields
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.synthetic import DatasetOptions, generate_dataset
+from core.models import Organization
+
+
+OPTION_HELP = {
+    "label": "Prefix of the generated names; one dataset per label",
+    "seed": "Random seed; the same seed and sizes produce the same data",
+    "organizations": "Number of organizations",
+    "classifiers_per_organization": "Classifiers (each with its own layout) per organization",
+    "groups_per_layout": "Activity groups per layout",
+    "activities_per_group": "Activities per activity group",
+    "workers": "Number of workers, spread over the classifiers",
+    "supervisors": "Number of supervisors",
+    "supervisions": "Number of supervisions",
+    "min_activities": "Minimum activity statistics per supervision",
+    "max_activities": "Maximum activity statistics per supervision",
+    "failure_rate": "Share of activity statistics with a failure",
+    "comment_rate": "Share of activity statistics with a comment",
+    "file_rate": "Share of comments with a file",
+    "verified_rate": "Share of verified supervisions",
+    "days": "Number of days the supervisions are spread over",
+    "batch_size": "Supervisions per batch (one transaction each)",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a deterministic synthetic dataset (organizations, classifiers, layouts, users, "
+        "supervisions with activity statistics, failures, comments and files) for load testing"
+    )
+
+    def add_arguments(self, parser):
+        defaults = DatasetOptions()
+        for option in fields(DatasetOptions):
+            if option.name in ("start_date", "jobs"):
+                continue
+
+            parser.add_argument(
+                f"--{option.name.replace('_', '-')}",
+                type=type(getattr(defaults, option.name)),
+                default=getattr(defaults, option.name),
+                help=f"{OPTION_HELP[option.name]}. Default: {getattr(defaults, option.name)}",
+            )
+
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            default=defaults.start_date,
+            help=f"First day of the supervisions (YYYY-MM-DD). Default: {defaults.start_date}",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Parallel worker processes for the supervision batches (PostgreSQL only). Default: CPU count",
+        )
+
+    def handle(self, *args, **options):
+        dataset_options = DatasetOptions(**{option.name: options[option.name] for option in fields(DatasetOptions)})
+
+        if dataset_options.organizations < 1 or dataset_options.workers < 1 or dataset_options.supervisors < 1:
+            raise CommandError("At least one organization, worker and supervisor is required.")
+        if dataset_options.min_activities > dataset_options.max_activities:
+            raise CommandError("--min-activities must not exceed --max-activities.")
+        if Organization.objects.filter(name__startswith=f"{dataset_options.label} organization ").exists():
+            raise CommandError(f"A dataset labelled '{dataset_options.label}' already exists, use another --label.")
+
+        started = time.perf_counter()
+
+        def progress(done, batches, inserted):
+            if options["verbosity"] >= 1:
+                self.stdout.write(f"Batch {done}/{batches}: {inserted} rows, {time.perf_counter() - started:.1f} s")
+
+        inserted = generate_dataset(dataset_options, progress=progress)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Generated {inserted} rows in {elapsed:.1f} s ({inserted / max(elapsed, 0.001):.0f} rows/s)"
+            )
+        )
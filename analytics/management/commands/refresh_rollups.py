@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Refreshes the daily activity rollups with the supervisions changed since the previous run; "
+        "the first run, or one with --full, rebuilds all rollups"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Rebuild all rollups, also dropping those of deleted supervisions",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        stored, workers = refresh_rollups(full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {stored} rollups of {workers} workers in {time.perf_counter() - started:.1f} s"
+            )
+        )
@@ -0,0 +1,152 @@
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+from analytics.synthetic import DatasetOptions, generate_dataset
+from core.benchmarking import BenchmarkContext, compare, get_benchmarks, results_to_json, run_benchmark
+from core.models import Organization
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the API benchmarks against a test database with a synthetic dataset, "
+        "writes the timings as JSON and compares them with a baseline"
+    )
+    label = "benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+        parser.add_argument("--baseline", type=Path, help="Compare with the results in this JSON file")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Relative slowdown of the median that counts as a regression. Default: 0.2",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            help="Run only benchmarks whose name contains this text (repeatable)",
+        )
+        parser.add_argument("--rounds", type=int, help="Override the number of timed rounds of every benchmark")
+        self.add_environment_arguments(parser)
+
+    @staticmethod
+    def add_environment_arguments(parser):
+        parser.add_argument(
+            "--supervisions",
+            type=int,
+            default=8_000,
+            help="Supervisions in the dataset; the default gives ~100k export rows. Default: 8000",
+        )
+        parser.add_argument(
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Parallel processes for the dataset generation. Default: CPU count",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database and its dataset between runs",
+        )
+
+    def handle(self, *args, **options):
+        benchmarks = [
+            registered for registered in get_benchmarks()
+            if not options["filter"] or any(text in registered.name for text in options["filter"])
+        ]
+        if not benchmarks:
+            raise CommandError("No benchmarks selected.")
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(options["baseline"].read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read the baseline: {e}")
+
+        with self.benchmark_environment(options) as context:
+            results = []
+            for registered in benchmarks:
+                result = run_benchmark(registered, context, options["rounds"])
+                results.append(result)
+                self.stdout.write(
+                    f"{result.name:<28} median {result.median * 1000:>10.3f} ms  "
+                    f"p95 {result.p95 * 1000:>10.3f} ms  ({result.rounds} rounds)"
+                    + "".join(f"  {name}={value}" for name, value in result.extra.items())
+                )
+
+        if options["output"]:
+            options["output"].write_text(
+                results_to_json(results, {"database": connection.vendor, "supervisions": options["supervisions"]})
+            )
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            self._compare(results, baseline, options["threshold"])
+
+    @contextmanager
+    def benchmark_environment(self, options):
+        """Test databases with the benchmark dataset and in-memory file storage; yields a BenchmarkContext."""
+        runner = DiscoverRunner(interactive=False, keepdb=options["keepdb"], verbosity=options["verbosity"])
+        runner.setup_test_environment()
+        old_config = runner.setup_databases()
+        try:
+            # Comment files of the benchmarks must not end up in the real storage
+            storages = {**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+            with override_settings(STORAGES=storages):
+                self._ensure_dataset(options)
+                yield BenchmarkContext(self.label)
+        finally:
+            runner.teardown_databases(old_config)
+            runner.teardown_test_environment()
+
+    def _ensure_dataset(self, options):
+        if Organization.objects.filter(name__startswith=f"{self.label} organization ").exists():
+            self.stdout.write("Using the existing benchmark dataset")
+            return
+
+        self.stdout.write(f"Generating the benchmark dataset ({options['supervisions']} supervisions)")
+        generate_dataset(
+            DatasetOptions(
+                label=self.label,
+                organizations=10,
+                classifiers_per_organization=5,
+                workers=1_000,
+                supervisors=50,
+                supervisions=options["supervisions"],
+                jobs=options["jobs"],
+            )
+        )
+
+    def _compare(self, results, baseline, threshold):
+        regressions = []
+        self.stdout.write(f"\n{'benchmark':<28} {'median ms':>12} {'baseline ms':>12} {'change':>8}")
+        for comparison in compare(results, baseline):
+            if comparison.change is None:
+                self.stdout.write(f"{comparison.name:<28} {comparison.median * 1000:>12.3f} {'-':>12} {'new':>8}")
+                continue
+
+            line = (
+                f"{comparison.name:<28} {comparison.median * 1000:>12.3f} "
+                f"{comparison.baseline_median * 1000:>12.3f} {comparison.change:>+8.1%}"
+            )
+            if comparison.change > threshold:
+                regressions.append(comparison.name)
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(f"Slower than the baseline by more than {threshold:.0%}: {', '.join(regressions)}")
+
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
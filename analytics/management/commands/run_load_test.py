@@ -0,0 +1,169 @@
+import json
+import random
+from contextlib import contextmanager
+from itertools import count
+from pathlib import Path
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.test import APIClient
+
+from analytics.benchmarks import start_supervision
+from analytics.management.commands.run_benchmarks import Command as BenchmarkCommand
+from analytics.models import Supervision
+from core.loadtest import run_load
+from core.models import Organization
+from core.paginators import CustomPagination
+
+
+MODES = ("atomic", "policy")
+
+
+def _view_callbacks(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _view_callbacks(pattern.url_patterns)
+        else:
+            yield pattern.callback
+
+
+@contextmanager
+def atomic_requests_everywhere():
+    """Undo the per-view transaction policy: every request runs in one transaction as with plain ATOMIC_REQUESTS."""
+    restored = {}
+    for callback in _view_callbacks(get_resolver().url_patterns):
+        if "_non_atomic_requests" in callback.__dict__:
+            restored[callback] = callback.__dict__.pop("_non_atomic_requests")
+
+    try:
+        yield
+    finally:
+        for callback, aliases in restored.items():
+            callback._non_atomic_requests = aliases
+
+
+class Command(BenchmarkCommand):
+    help = (
+        "Runs a concurrent API load test (lists, exports and activity transitions) against a test database "
+        "with a synthetic dataset, with every request in a transaction ('atomic') and with the per-view "
+        "transaction policy ('policy'), and reports throughput, latency and connections idle in a transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent clients. Default: 16")
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds per mode. Default: 30")
+        parser.add_argument(
+            "--mode",
+            action="append",
+            choices=MODES,
+            help="Run only this transaction mode (repeatable). Default: both",
+        )
+        parser.add_argument("--output", type=Path, help="Write the results to this JSON file")
+        self.add_environment_arguments(parser)
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["duration"] <= 0:
+            raise CommandError("--threads and --duration must be positive.")
+
+        modes = options["mode"] or MODES
+        results = {}
+        with self.benchmark_environment(options) as context:
+            pooled = "pool" in connection.settings_dict.get("OPTIONS", {})
+            self.stdout.write(
+                f"{connection.vendor}, connection pool {'on' if pooled else 'off'}, "
+                f"{options['threads']} threads, {options['duration']:.0f} s per mode"
+            )
+            if connection.vendor != "postgresql":
+                self.stdout.write(self.style.WARNING("Idle-in-transaction sampling needs PostgreSQL"))
+
+            for mode in modes:
+                factory = self._worker_factory(context)
+                if mode == "atomic":
+                    with atomic_requests_everywhere():
+                        result = run_load(mode, factory, options["threads"], options["duration"])
+                else:
+                    result = run_load(mode, factory, options["threads"], options["duration"])
+
+                results[mode] = result
+                self._write_result(result)
+
+        if len(results) == len(MODES):
+            self._write_change(results["atomic"], results["policy"])
+
+        if options["output"]:
+            options["output"].write_text(
+                json.dumps(
+                    {
+                        "meta": {
+                            "database": connection.vendor,
+                            "pool": pooled,
+                            "threads": options["threads"],
+                            "supervisions": options["supervisions"],
+                        },
+                        "results": {mode: result.as_dict() for mode, result in results.items()},
+                    },
+                    indent=2,
+                )
+            )
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _worker_factory(self, context):
+        """Every worker mixes supervision lists, analytics lists, exports and transitions of its own supervision."""
+        organization = Organization.objects.get(name=f"{self.label} organization 0")
+        supervision_ids = list(
+            Supervision.objects.filter(organization=organization, verified=True).values_list("id", flat=True)[:100]
+        )
+        list_url = reverse("supervision")
+        pages = max(1, min(5, Supervision.objects.count() // CustomPagination.page_size))
+        export_url = f"{reverse('supervision_list_export')}?organization={organization.pk}"
+
+        def factory(number):
+            supervision, activities = start_supervision(context)
+            transition_url = reverse("analytics_create", args=[supervision.pk])
+            client = APIClient()
+            client.force_authenticate(context.user)
+            choices = random.Random(number)
+            steps = count()
+
+            def request(method, url, status_code=200, **kwargs):
+                response = getattr(client, method)(url, **kwargs)
+                if response.status_code != status_code:
+                    raise AssertionError(f"{method.upper()} {url} returned {response.status_code}")
+
+            def send():
+                roll = choices.random()
+                if roll < 0.4:
+                    request("get", f"{list_url}?page={choices.randint(1, pages)}")
+                elif roll < 0.7:
+                    request("get", reverse("analytics", args=[choices.choice(supervision_ids)]))
+                elif roll < 0.95:
+                    request("post", transition_url, 201, data={"activity": activities[next(steps) % 2]}, format="json")
+                else:
+                    request("get", export_url)
+
+            return send
+
+        return factory
+
+    def _write_result(self, result):
+        data = result.as_dict()
+        idle = (
+            f"idle in transaction mean {data['idle_in_transaction_mean']:.2f} max {data['idle_in_transaction_max']}"
+            if result.idle_samples
+            else "idle in transaction n/a"
+        )
+        self.stdout.write(
+            f"{result.name:<8} {data['throughput']:>8.1f} req/s  p50 {data['p50_ms']} ms  p95 {data['p95_ms']} ms  "
+            f"{data['requests']} requests, {data['errors']} errors  {idle}"
+        )
+
+    def _write_change(self, atomic, policy):
+        if atomic.throughput:
+            self.stdout.write(f"Throughput change: {policy.throughput / atomic.throughput - 1:+.1%}")
+        if atomic.idle_samples and policy.idle_samples:
+            self.stdout.write(
+                f"Idle in transaction: mean {atomic.idle_in_transaction_mean:.2f} -> "
+                f"{policy.idle_in_transaction_mean:.2f}, max {atomic.idle_in_transaction_max} -> "
+                f"{policy.idle_in_transaction_max}"
+            )
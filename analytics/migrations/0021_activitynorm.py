@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 19:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0020_ensure_comment_table'),
+        ('core', '0005_alter_classifier_options_alter_organization_options_and_more'),
+        ('layouts', '0008_activity_planned_end_time_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityNorm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('activity', 'Activity'), ('classifier', 'Classifier'), ('organization', 'Organization')], max_length=16, verbose_name='scope')),
+                ('sample_count', models.PositiveIntegerField(verbose_name='sample count')),
+                ('median', models.DurationField(verbose_name='median')),
+                ('trimmed_mean', models.DurationField(verbose_name='trimmed mean')),
+                ('p10', models.DurationField(verbose_name='10th percentile')),
+                ('p90', models.DurationField(verbose_name='90th percentile')),
+                ('computed_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='computed date')),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='norms', to='layouts.activity', verbose_name='activity')),
+                ('classifier', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_norms', to='core.classifier', verbose_name='classifier')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='activity_norms', to='core.organization', verbose_name='organization')),
+            ],
+            options={
+                'verbose_name': 'Activity norm',
+                'verbose_name_plural': 'Activity norms',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('scope', 'activity')), fields=('activity',), name='unique_activity_norm'), models.UniqueConstraint(condition=models.Q(('scope', 'classifier')), fields=('activity', 'classifier'), name='unique_activity_classifier_norm'), models.UniqueConstraint(condition=models.Q(('scope', 'organization')), fields=('activity', 'organization'), name='unique_activity_organization_norm')],
+            },
+        ),
+    ]
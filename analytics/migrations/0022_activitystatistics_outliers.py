@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-19 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0021_activitynorm'),
+        ('layouts', '0008_activity_planned_end_time_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitystatistics',
+            name='is_outlier',
+            field=models.BooleanField(default=False, verbose_name='outlier'),
+        ),
+        migrations.AddField(
+            model_name='activitystatistics',
+            name='outlier_score',
+            field=models.FloatField(blank=True, help_text='Robust z-score of the duration among the durations of the activity: positive when longer, negative when shorter. Maintained by analytics.outliers', null=True, verbose_name='outlier score'),
+        ),
+        migrations.AddIndex(
+            model_name='activitystatistics',
+            index=models.Index(condition=models.Q(('is_outlier', True)), fields=['supervision'], name='statistics_outlier_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2 on 2026-10-19 19:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0022_activitystatistics_outliers'),
+        ('core', '0005_alter_classifier_options_alter_organization_options_and_more'),
+        ('layouts', '0008_activity_planned_end_time_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('statistics_count', models.PositiveIntegerField(verbose_name='statistics count')),
+                ('total_duration', models.DurationField(verbose_name='total duration')),
+                ('min_duration', models.DurationField(verbose_name='min duration')),
+                ('max_duration', models.DurationField(verbose_name='max duration')),
+                ('failure_duration', models.DurationField(verbose_name='failure duration')),
+                ('overtime_count', models.PositiveIntegerField(verbose_name='overtime count')),
+                ('computed_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='computed date')),
+            ],
+            options={
+                'verbose_name': 'Daily activity rollup',
+                'verbose_name_plural': 'Daily activity rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True, verbose_name='name')),
+                ('value', models.DateTimeField(verbose_name='value')),
+            ],
+            options={
+                'verbose_name': 'Rollup watermark',
+                'verbose_name_plural': 'Rollup watermarks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='activitystatistics',
+            index=models.Index(fields=['updated_date'], name='statistics_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='supervision',
+            index=models.Index(fields=['updated_date'], name='supervision_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyactivityrollup',
+            name='activity',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='layouts.activity', verbose_name='activity'),
+        ),
+        migrations.AddField(
+            model_name='dailyactivityrollup',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity_rollups', to='core.organization', verbose_name='organization'),
+        ),
+        migrations.AddField(
+            model_name='dailyactivityrollup',
+            name='worker',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity_rollups', to=settings.AUTH_USER_MODEL, verbose_name='worker'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyactivityrollup',
+            index=models.Index(fields=['organization', 'day'], name='rollup_organization_day_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyactivityrollup',
+            index=models.Index(fields=['day'], name='rollup_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyactivityrollup',
+            constraint=models.UniqueConstraint(fields=('worker', 'day', 'organization', 'activity'), name='unique_daily_activity_rollup'),
+        ),
+    ]
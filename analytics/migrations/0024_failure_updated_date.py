@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-19 19:43
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_created_date(apps, schema_editor):
+    Failure = apps.get_model('analytics', 'Failure')
+    Failure.objects.update(created_date=F('start_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0023_dailyactivityrollup'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='failure',
+            name='created_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='created_date'),
+        ),
+        migrations.AddField(
+            model_name='failure',
+            name='updated_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='updated_date'),
+        ),
+        migrations.RunPython(backfill_created_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated_date'], name='comment_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='failure',
+            index=models.Index(fields=['updated_date'], name='failure_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 20:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0024_failure_updated_date'),
+        ('layouts', '0009_updated_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleActivityNorm',
+            fields=[
+                ('activity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stale_norm', serialize=False, to='layouts.activity', verbose_name='activity')),
+                ('marked_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='marked date')),
+            ],
+            options={
+                'verbose_name': 'Stale activity norm',
+                'verbose_name_plural': 'Stale activity norms',
+            },
+        ),
+    ]
@@ -1,16 +1,24 @@
+from datetime import timedelta
+
 from django.contrib.gis.db import models
 from django.utils import timezone
 
 from analytics.utils import get_yandex_map_link
 from core import model_mixins
-from core.model_mixins import CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin, PlannedStartEndTimeMixin
-from core.models import Organization
+from core.model_mixins import (
+    ChangedFieldsMixin,
+    CreatedUpdatedMixin,
+    StartEndDateMixin,
+    VerifiedMixin,
+    PlannedStartEndTimeMixin,
+)
+from core.models import Classifier, Organization
 from core.utils import timedelta_to_str, time_difference
 from layouts.models import Activity
 from django.utils.translation import gettext_lazy as _
 
 
-class Supervision(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin, PlannedStartEndTimeMixin):
+class Supervision(ChangedFieldsMixin, CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin, PlannedStartEndTimeMixin):
     worker = models.ForeignKey(
         "users.User",
         verbose_name=_("worker"),
@@ -40,6 +48,10 @@ class Supervision(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin, Planned
     class Meta:
         verbose_name = _("Supervision")
         verbose_name_plural = _("Supervisions")
+        indexes = [
+            # Changes since a watermark or sync cursor, see analytics.rollups and analytics.sync
+            models.Index(fields=["updated_date"], name="supervision_updated_idx"),
+        ]
 
     def __str__(self):
         return _("Supervision ") + f"{self.pk}"
@@ -62,6 +74,25 @@ class Supervision(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin, Planned
 
     planned_delta.fget.short_description = _("Planned duration")
 
+    # Computed from the statistics, so list views prefetch "statistics" with "failure" and "activity"
+    @property
+    def display_total_failure_delta(self):
+        failure_deltas = [
+            statistics.failure.end_date - statistics.failure.start_date
+            for statistics in self.statistics.all()
+            if statistics.failure_id and statistics.failure.start_date and statistics.failure.end_date
+        ]
+        if failure_deltas:
+            return timedelta_to_str(sum(failure_deltas, timedelta()))
+
+        return "--:--:--"
+
+    display_total_failure_delta.fget.short_description = _("Total failure duration")
+
+    @property
+    def overtime_activities_count(self):
+        return sum(statistics.is_overtime for statistics in self.statistics.all())
+
 
 class SupervisionComment(CreatedUpdatedMixin):
     text = models.TextField(
@@ -82,7 +113,7 @@ class SupervisionComment(CreatedUpdatedMixin):
         verbose_name_plural = _("Comments")
 
 
-class ActivityStatistics(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin):
+class ActivityStatistics(ChangedFieldsMixin, CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin):
     activity = models.ForeignKey(
         Activity,
         verbose_name=_("activity"),
@@ -108,10 +139,29 @@ class ActivityStatistics(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin):
         null=True,
         help_text=_("Admin comment for this activity statistics")
     )
+    outlier_score = models.FloatField(
+        verbose_name=_("outlier score"),
+        null=True,
+        blank=True,
+        help_text=_(
+            "Robust z-score of the duration among the durations of the activity: "
+            "positive when longer, negative when shorter. Maintained by analytics.outliers"
+        ),
+    )
+    is_outlier = models.BooleanField(verbose_name=_("outlier"), default=False)
 
     class Meta:
         verbose_name = _("Activity statistics")
         verbose_name_plural = _("Activity statistics")
+        indexes = [
+            # Outliers are few; the partial index serves the outlier filters of supervisions and statistics
+            models.Index(
+                fields=["supervision"],
+                condition=models.Q(is_outlier=True),
+                name="statistics_outlier_idx",
+            ),
+            models.Index(fields=["updated_date"], name="statistics_updated_idx"),
+        ]
 
     def __str__(self):
         return _("Statistics for ") + f"{self.activity.name}"
@@ -125,8 +175,16 @@ class ActivityStatistics(CreatedUpdatedMixin, StartEndDateMixin, VerifiedMixin):
 
     delta.fget.short_description = _("Duration")
 
+    @property
+    def is_overtime(self):
+        activity = self.activity
+        if not (self.start_date and self.end_date and activity.planned_start_time and activity.planned_end_time):
+            return False
+
+        return self.end_date - self.start_date > time_difference(activity.planned_start_time, activity.planned_end_time)
 
-class Comment(CreatedUpdatedMixin):
+
+class Comment(ChangedFieldsMixin, CreatedUpdatedMixin):
     text = models.TextField(
         verbose_name=_("text"),
     )
@@ -136,7 +194,8 @@ class Comment(CreatedUpdatedMixin):
         on_delete=models.CASCADE,
         related_name="comments",
     )
-    coordinates = models.PointField(verbose_name=_("coordinates"), null=True, blank=True)
+    # GiST index of the bounding box, map queries of analytics.geo filter with it first
+    coordinates = models.PointField(verbose_name=_("coordinates"), null=True, blank=True, spatial_index=True)
 
     @property
     def latitude(self):
@@ -159,6 +218,9 @@ class Comment(CreatedUpdatedMixin):
     class Meta:
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
+        indexes = [
+            models.Index(fields=["updated_date"], name="comment_updated_idx"),
+        ]
 
 
 class CommentFiles(CreatedUpdatedMixin):
@@ -181,12 +243,15 @@ class CommentFiles(CreatedUpdatedMixin):
 
 
 
-class Failure(model_mixins.StartEndDateMixin):
+class Failure(ChangedFieldsMixin, model_mixins.CreatedUpdatedDateMixin, model_mixins.StartEndDateMixin):
     pass
 
     class Meta:
         verbose_name = _("Failure")
         verbose_name_plural = _("Failures")
+        indexes = [
+            models.Index(fields=["updated_date"], name="failure_updated_idx"),
+        ]
 
     @property
     def is_finished(self):
@@ -206,3 +271,157 @@ class Failure(model_mixins.StartEndDateMixin):
 
     def __str__(self):
         return _("Failure") + f" #{self.id} - {self.delta}"
+
+
+class ActivityNorm(models.Model):
+    """
+    Time norm of an activity derived from verified, failure-free activity statistics,
+    overall or for one classifier or organization. Maintained by analytics.norms.
+    """
+
+    class Scope(models.TextChoices):
+        ACTIVITY = "activity", _("Activity")
+        CLASSIFIER = "classifier", _("Classifier")
+        ORGANIZATION = "organization", _("Organization")
+
+    activity = models.ForeignKey(
+        Activity,
+        verbose_name=_("activity"),
+        on_delete=models.CASCADE,
+        related_name="norms",
+    )
+    scope = models.CharField(verbose_name=_("scope"), max_length=16, choices=Scope.choices)
+    classifier = models.ForeignKey(
+        Classifier,
+        verbose_name=_("classifier"),
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="activity_norms",
+    )
+    organization = models.ForeignKey(
+        Organization,
+        verbose_name=_("organization"),
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="activity_norms",
+    )
+    sample_count = models.PositiveIntegerField(verbose_name=_("sample count"))
+    median = models.DurationField(verbose_name=_("median"))
+    trimmed_mean = models.DurationField(verbose_name=_("trimmed mean"))
+    p10 = models.DurationField(verbose_name=_("10th percentile"))
+    p90 = models.DurationField(verbose_name=_("90th percentile"))
+    computed_date = models.DateTimeField(verbose_name=_("computed date"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Activity norm")
+        verbose_name_plural = _("Activity norms")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["activity"],
+                condition=models.Q(scope="activity"),
+                name="unique_activity_norm",
+            ),
+            models.UniqueConstraint(
+                fields=["activity", "classifier"],
+                condition=models.Q(scope="classifier"),
+                name="unique_activity_classifier_norm",
+            ),
+            models.UniqueConstraint(
+                fields=["activity", "organization"],
+                condition=models.Q(scope="organization"),
+                name="unique_activity_organization_norm",
+            ),
+        ]
+
+    def __str__(self):
+        return _("Norm for ") + f"{self.activity_id} ({self.scope})"
+
+
+class StaleActivityNorm(models.Model):
+    """
+    Activity whose norms are out of date after a verification change, marked in the transaction
+    of the change and cleared when its norms are recomputed. Maintained by analytics.norms.
+    """
+
+    activity = models.OneToOneField(
+        Activity,
+        verbose_name=_("activity"),
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="stale_norm",
+    )
+    marked_date = models.DateTimeField(verbose_name=_("marked date"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Stale activity norm")
+        verbose_name_plural = _("Stale activity norms")
+
+    def __str__(self):
+        return _("Stale norms of ") + f"{self.activity_id}"
+
+
+class DailyActivityRollup(models.Model):
+    """
+    Verified activity statistics of a worker summed up per organization, activity and
+    local day (settings.ADMIN_TIME_ZONE) for reporting. Maintained by analytics.rollups.
+    """
+
+    organization = models.ForeignKey(
+        Organization,
+        verbose_name=_("organization"),
+        on_delete=models.CASCADE,
+        related_name="daily_activity_rollups",
+    )
+    worker = models.ForeignKey(
+        "users.User",
+        verbose_name=_("worker"),
+        on_delete=models.CASCADE,
+        related_name="daily_activity_rollups",
+    )
+    activity = models.ForeignKey(
+        Activity,
+        verbose_name=_("activity"),
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    day = models.DateField(verbose_name=_("day"))
+    statistics_count = models.PositiveIntegerField(verbose_name=_("statistics count"))
+    total_duration = models.DurationField(verbose_name=_("total duration"))
+    min_duration = models.DurationField(verbose_name=_("min duration"))
+    max_duration = models.DurationField(verbose_name=_("max duration"))
+    failure_duration = models.DurationField(verbose_name=_("failure duration"))
+    overtime_count = models.PositiveIntegerField(verbose_name=_("overtime count"))
+    computed_date = models.DateTimeField(verbose_name=_("computed date"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Daily activity rollup")
+        verbose_name_plural = _("Daily activity rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "day", "organization", "activity"],
+                name="unique_daily_activity_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["organization", "day"], name="rollup_organization_day_idx"),
+            models.Index(fields=["day"], name="rollup_day_idx"),
+        ]
+
+    def __str__(self):
+        return _("Rollup for ") + f"{self.worker_id} {self.activity_id} {self.day}"
+
+
+class RollupWatermark(models.Model):
+    """Changes up to ``value`` are included in the rollup ``name``."""
+
+    name = models.CharField(verbose_name=_("name"), max_length=64, unique=True)
+    value = models.DateTimeField(verbose_name=_("value"))
+
+    class Meta:
+        verbose_name = _("Rollup watermark")
+        verbose_name_plural = _("Rollup watermarks")
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
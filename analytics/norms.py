@@ -0,0 +1,198 @@
+"""
+Time norms of activities.
+
+Norms are robust statistics (median, 10% trimmed mean, P10/P90 and sample
+count) of the durations of verified, failure-free activity statistics, per
+activity overall, per classifier of the worker and per organization. They are
+computed with pandas, one batch of activities at a time, and stored in
+ActivityNorm. Verification changes mark the affected activities stale, one
+upsert in the transaction of the change; once it commits, a background thread
+of the process recomputes the stale activities, so a request never waits for
+a recompute. Marks outlive a restart; the next recompute or compute_norms
+--stale picks them up. compute_norms recomputes everything.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+from typing import TYPE_CHECKING
+
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from analytics.models import ActivityNorm, ActivityStatistics, StaleActivityNorm
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# One worker, so recomputes of a process never run concurrently
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="norms")
+_queued_lock = threading.Lock()
+_queued = False
+
+# Share of the shortest and of the longest durations left out of the trimmed mean
+TRIM_PROPORTION = 0.1
+BATCH_SIZE = 500
+
+SCOPE_KEYS = {
+    ActivityNorm.Scope.ACTIVITY: ["activity_id"],
+    ActivityNorm.Scope.CLASSIFIER: ["activity_id", "classifier_id"],
+    ActivityNorm.Scope.ORGANIZATION: ["activity_id", "organization_id"],
+}
+COLUMNS = ["activity_id", "classifier_id", "organization_id", "start_date", "end_date"]
+
+
+def norm_statistics():
+    """Activity statistics norms are derived from: verified, finished and without a failure."""
+    return ActivityStatistics.objects.filter(
+        Q(verified=True) | Q(supervision__verified=True),
+        failure__isnull=True,
+        end_date__isnull=False,
+        end_date__gt=F("start_date"),
+    )
+
+
+def load_durations(activity_ids) -> "pd.DataFrame":
+    # pandas (with numpy) is imported on first use only, see core.startup
+    import pandas as pd
+
+    rows = norm_statistics().filter(activity_id__in=activity_ids).values_list(
+        "activity_id",
+        "supervision__worker__classifier_id",
+        "supervision__organization_id",
+        "start_date",
+        "end_date",
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=COLUMNS)
+    frame["seconds"] = (
+        pd.to_datetime(frame["end_date"], utc=True) - pd.to_datetime(frame["start_date"], utc=True)
+    ).dt.total_seconds()
+    return frame.drop(columns=["start_date", "end_date"])
+
+
+def aggregate(frame: "pd.DataFrame", keys: list[str]) -> "pd.DataFrame":
+    """Norm statistics of the ``seconds`` column per group of ``keys``; rows with a null key are left out."""
+    import numpy as np
+
+    frame = frame.dropna(subset=keys)
+    grouped = frame.groupby(keys)["seconds"]
+    result = grouped.agg(sample_count="count", median="median")
+    result["p10"] = grouped.quantile(0.1)
+    result["p90"] = grouped.quantile(0.9)
+
+    # Trimmed mean: drop floor(n * TRIM_PROPORTION) durations at each end of every group
+    rank = grouped.rank(method="first")
+    count = grouped.transform("count")
+    cut = np.floor(count * TRIM_PROPORTION)
+    kept = frame[(rank > cut) & (rank <= count - cut)]
+    result["trimmed_mean"] = kept.groupby(keys)["seconds"].mean()
+
+    return result.reset_index()
+
+
+def build_norms(frame: "pd.DataFrame") -> list[ActivityNorm]:
+    computed_date = timezone.now()
+    norms = []
+    for scope, keys in SCOPE_KEYS.items():
+        for row in aggregate(frame, keys).itertuples(index=False):
+            norms.append(
+                ActivityNorm(
+                    activity_id=int(row.activity_id),
+                    scope=scope,
+                    classifier_id=int(row.classifier_id) if scope == ActivityNorm.Scope.CLASSIFIER else None,
+                    organization_id=int(row.organization_id) if scope == ActivityNorm.Scope.ORGANIZATION else None,
+                    sample_count=int(row.sample_count),
+                    median=timedelta(seconds=float(row.median)),
+                    trimmed_mean=timedelta(seconds=float(row.trimmed_mean)),
+                    p10=timedelta(seconds=float(row.p10)),
+                    p90=timedelta(seconds=float(row.p90)),
+                    computed_date=computed_date,
+                )
+            )
+
+    return norms
+
+
+def recompute_norms(activity_ids=None) -> int:
+    """Replace the norms of the given activities, or of all activities; returns the number of norms stored."""
+    if activity_ids is None:
+        activity_ids = sorted(
+            set(norm_statistics().values_list("activity_id", flat=True).distinct())
+            | set(ActivityNorm.objects.values_list("activity_id", flat=True).distinct())
+        )
+    else:
+        activity_ids = sorted(set(activity_ids))
+
+    stored = 0
+    for start in range(0, len(activity_ids), BATCH_SIZE):
+        batch = activity_ids[start:start + BATCH_SIZE]
+        norms = build_norms(load_durations(batch))
+        with transaction.atomic():
+            ActivityNorm.objects.filter(activity_id__in=batch).delete()
+            ActivityNorm.objects.bulk_create(norms)
+        stored += len(norms)
+
+    return stored
+
+
+def mark_stale(activity_ids):
+    """Mark the norms of the activities stale; a mark made again moves its date, so a running recompute keeps it."""
+    activity_ids = set(activity_ids)
+    if not activity_ids:
+        return
+
+    marked_date = timezone.now()
+    StaleActivityNorm.objects.bulk_create(
+        [StaleActivityNorm(activity_id=activity_id, marked_date=marked_date) for activity_id in activity_ids],
+        update_conflicts=True,
+        unique_fields=["activity"],
+        update_fields=["marked_date"],
+    )
+    transaction.on_commit(queue_stale_recompute)
+
+
+def queue_stale_recompute():
+    """Recompute the stale norms in the background; changes made while a recompute is queued join it."""
+    global _queued
+    with _queued_lock:
+        if _queued:
+            return
+        _queued = True
+    _executor.submit(_recompute_stale_in_background)
+
+
+def _recompute_stale_in_background():
+    global _queued
+    with _queued_lock:
+        # Marks made from now on queue the next run
+        _queued = False
+    try:
+        recompute_stale_norms()
+    except Exception:
+        logger.exception("Recomputing stale activity norms failed")
+    finally:
+        # The worker thread is reused; its connections must not linger between runs
+        connections.close_all()
+
+
+def recompute_stale_norms(limit=None) -> tuple[int, int]:
+    """Recompute the norms of the stale activities, the longest stale first; returns the activities and norms."""
+    marks = list(
+        StaleActivityNorm.objects.order_by("marked_date", "activity_id").values_list("activity_id", "marked_date")[:limit]
+    )
+    stored = recompute_norms([activity_id for activity_id, _ in marks])
+
+    # Marks moved during the recompute stay for the next run
+    for start in range(0, len(marks), BATCH_SIZE):
+        batch = marks[start:start + BATCH_SIZE]
+        StaleActivityNorm.objects.filter(
+            reduce(or_, (Q(activity_id=activity_id, marked_date=marked_date) for activity_id, marked_date in batch))
+        ).delete()
+
+    return len(marks), stored
@@ -0,0 +1,139 @@
+"""
+Outlier detection of activity durations.
+
+Every finished activity statistic gets a robust z-score of its duration among
+the failure-free durations of its activity: the distance from the median in
+units of the median absolute deviation, falling back to the interquartile
+range and then the mean absolute deviation when more than half of the
+durations are equal. Statistics scored beyond OUTLIER_THRESHOLD, e.g. an
+activity left running or a one-second tap, are flagged for verification. Scores are computed with pandas, one batch of
+activities at a time, and only changed rows are written back.
+"""
+import math
+from typing import TYPE_CHECKING
+
+from django.db import transaction
+from django.db.models import Q
+
+from analytics.models import ActivityStatistics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Scores beyond this are flagged; 3.5 is the usual cut-off of the modified z-score
+OUTLIER_THRESHOLD = 3.5
+# Activities with fewer failure-free durations are not scored
+MIN_SAMPLES = 10
+# Scale factors making the deviations consistent with the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+IQR_SCALE = 1.349
+MEAN_AD_SCALE = 1.2533
+# Scores are stored rounded, so recomputing an unchanged distribution writes nothing
+SCORE_DIGITS = 2
+BATCH_SIZE = 200
+UPDATE_BATCH_SIZE = 1000
+
+COLUMNS = ["id", "activity_id", "failure_id", "start_date", "end_date", "outlier_score", "is_outlier"]
+
+
+def scored_statistics():
+    return ActivityStatistics.objects.filter(end_date__isnull=False)
+
+
+def load_durations(activity_ids) -> "pd.DataFrame":
+    # pandas (with numpy) is imported on first use only, see core.startup
+    import pandas as pd
+
+    rows = scored_statistics().filter(activity_id__in=activity_ids).values_list(*COLUMNS)
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=10000), columns=COLUMNS)
+    frame["seconds"] = (
+        pd.to_datetime(frame["end_date"], utc=True) - pd.to_datetime(frame["start_date"], utc=True)
+    ).dt.total_seconds()
+    return frame.drop(columns=["start_date", "end_date"])
+
+
+def score(frame: "pd.DataFrame") -> "pd.DataFrame":
+    """Add ``score`` and ``outlier`` columns scoring ``seconds`` within each activity."""
+    import numpy as np
+
+    reference = frame[frame["failure_id"].isna()]
+    grouped = reference.groupby("activity_id")["seconds"]
+    stats = grouped.agg(samples="count", median="median")
+    stats["q1"] = grouped.quantile(0.25)
+    stats["q3"] = grouped.quantile(0.75)
+    deviation = (reference["seconds"] - reference["activity_id"].map(stats["median"])).abs()
+    stats["mad"] = deviation.groupby(reference["activity_id"]).median()
+    stats["mean_ad"] = deviation.groupby(reference["activity_id"]).mean()
+
+    iqr = stats["q3"] - stats["q1"]
+    stats["scale"] = np.select(
+        [stats["mad"] > 0, iqr > 0],
+        [stats["mad"] * MAD_SCALE, iqr / IQR_SCALE],
+        stats["mean_ad"] * MEAN_AD_SCALE,
+    )
+    stats.loc[stats["samples"] < MIN_SAMPLES, "scale"] = np.nan
+
+    per_row = stats.reindex(frame["activity_id"])
+    median, scale = per_row["median"].to_numpy(), per_row["scale"].to_numpy()
+    difference = frame["seconds"].to_numpy() - median
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A zero scale means that all the durations are equal: any other duration is an outlier
+        scores = np.where(scale > 0, difference / scale, np.where(difference == 0, 0.0, np.sign(difference) * np.inf))
+    scores = np.where(np.isnan(scale), np.nan, scores)
+
+    frame = frame.assign(score=np.round(np.clip(scores, -1e6, 1e6), SCORE_DIGITS))
+    frame["outlier"] = frame["score"].abs() > OUTLIER_THRESHOLD
+    return frame
+
+
+def changed_statistics(frame: "pd.DataFrame") -> list[ActivityStatistics]:
+    stored = frame["outlier_score"]
+    changed = frame[
+        (frame["outlier"] != frame["is_outlier"])
+        | (stored.isna() != frame["score"].isna())
+        | (stored.notna() & (stored != frame["score"]))
+    ]
+    return [
+        ActivityStatistics(
+            pk=int(row.id),
+            outlier_score=None if math.isnan(row.score) else float(row.score),
+            is_outlier=bool(row.outlier),
+        )
+        for row in changed.itertuples(index=False)
+    ]
+
+
+def detect_outliers(activity_ids=None) -> tuple[int, int]:
+    """Score the statistics of the given activities, or of all; returns the number of updated and flagged rows."""
+    if activity_ids is None:
+        activity_ids = sorted(
+            set(scored_statistics().values_list("activity_id", flat=True).distinct())
+            | set(
+                ActivityStatistics.objects.filter(Q(outlier_score__isnull=False) | Q(is_outlier=True))
+                .values_list("activity_id", flat=True)
+                .distinct()
+            )
+        )
+    else:
+        activity_ids = sorted(set(activity_ids))
+
+    updated = flagged = 0
+    for start in range(0, len(activity_ids), BATCH_SIZE):
+        batch = activity_ids[start:start + BATCH_SIZE]
+        frame = score(load_durations(batch))
+        statistics = changed_statistics(frame)
+        with transaction.atomic():
+            # Statistics no longer finished keep no score
+            ActivityStatistics.objects.filter(
+                Q(outlier_score__isnull=False) | Q(is_outlier=True),
+                activity_id__in=batch,
+                end_date__isnull=True,
+            ).update(outlier_score=None, is_outlier=False)
+            ActivityStatistics.objects.bulk_update(
+                statistics, ["outlier_score", "is_outlier"], batch_size=UPDATE_BATCH_SIZE
+            )
+        updated += len(statistics)
+        flagged += int(frame["outlier"].sum())
+
+    return updated, flagged
@@ -0,0 +1,217 @@
+"""
+Daily activity rollups for reporting.
+
+Verified, finished activity statistics are summed up per organization, worker,
+activity and local day (settings.ADMIN_TIME_ZONE) in DailyActivityRollup.
+refresh_rollups() rebuilds only the worker days of supervisions changed since
+the watermark of its previous run, i.e. with the supervision, one of its
+statistics or their failure saved after it. Rollups are computed with pandas,
+one batch of workers at a time. Rollups of deleted supervisions are dropped
+by a full rebuild only.
+"""
+import zoneinfo
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from analytics.models import ActivityStatistics, DailyActivityRollup, Failure, RollupWatermark, Supervision
+from layouts.models import Activity
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+ROLLUP_NAME = "daily_activity"
+# Rows saved shortly before a run may not be committed yet; the next run processes them again
+SAFETY_MARGIN = timedelta(minutes=5)
+WORKER_BATCH_SIZE = 100
+ID_BATCH_SIZE = 1000
+CREATE_BATCH_SIZE = 1000
+
+KEYS = ["organization_id", "worker_id", "activity_id", "day"]
+COLUMNS = [
+    "organization_id",
+    "worker_id",
+    "activity_id",
+    "start_date",
+    "end_date",
+    "failure_start_date",
+    "failure_end_date",
+]
+
+
+def local_timezone() -> zoneinfo.ZoneInfo:
+    return zoneinfo.ZoneInfo(settings.ADMIN_TIME_ZONE)
+
+
+def rollup_statistics():
+    """Activity statistics the rollups sum up: finished and verified, directly or with their supervision."""
+    return ActivityStatistics.objects.filter(
+        Q(verified=True) | Q(supervision__verified=True),
+        end_date__isnull=False,
+    )
+
+
+def _batches(values, size):
+    values = sorted(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def changed_supervision_ids(since: datetime) -> set[int]:
+    supervision_ids = set(Supervision.objects.filter(updated_date__gt=since).values_list("id", flat=True))
+    supervision_ids.update(
+        ActivityStatistics.objects.filter(updated_date__gt=since).values_list("supervision_id", flat=True)
+    )
+    # Finishing a failure saves only the failure
+    failure_ids = Failure.objects.filter(updated_date__gt=since).values_list("id", flat=True)
+    for batch in _batches(failure_ids, ID_BATCH_SIZE):
+        supervision_ids.update(
+            ActivityStatistics.objects.filter(failure_id__in=batch).values_list("supervision_id", flat=True)
+        )
+
+    return supervision_ids
+
+
+def affected_worker_days(supervision_ids) -> dict[int, set[date]]:
+    tz = local_timezone()
+    worker_days = defaultdict(set)
+    for batch in _batches(supervision_ids, ID_BATCH_SIZE):
+        rows = ActivityStatistics.objects.filter(supervision_id__in=batch).values_list(
+            "supervision__worker_id", "start_date"
+        )
+        for worker_id, start_date in rows:
+            worker_days[worker_id].add(start_date.astimezone(tz).date())
+
+    return worker_days
+
+
+def planned_seconds(activity_ids) -> dict[int, float]:
+    """Planned duration of the activities; an end time before the start time is on the next day."""
+    planned = {}
+    rows = Activity.objects.filter(
+        id__in=activity_ids, planned_start_time__isnull=False, planned_end_time__isnull=False
+    ).values_list("id", "planned_start_time", "planned_end_time")
+    for activity_id, start_time, end_time in rows:
+        seconds = (
+            datetime.combine(date.min, end_time) - datetime.combine(date.min, start_time)
+        ).total_seconds()
+        planned[activity_id] = seconds % (24 * 3600)
+
+    return planned
+
+
+def load_statistics(worker_ids, days=None) -> "pd.DataFrame":
+    # pandas (with numpy) is imported on first use only, see core.startup
+    import pandas as pd
+
+    statistics = rollup_statistics().filter(supervision__worker_id__in=worker_ids)
+    if days:
+        tz = local_timezone()
+        statistics = statistics.filter(
+            start_date__gte=datetime.combine(min(days), time.min, tzinfo=tz),
+            start_date__lt=datetime.combine(max(days) + timedelta(days=1), time.min, tzinfo=tz),
+        )
+
+    rows = statistics.values_list(
+        "supervision__organization_id",
+        "supervision__worker_id",
+        "activity_id",
+        "start_date",
+        "end_date",
+        "failure__start_date",
+        "failure__end_date",
+    )
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=10000), columns=COLUMNS)
+
+    start = pd.to_datetime(frame["start_date"], utc=True)
+    end = pd.to_datetime(frame["end_date"], utc=True)
+    failure_start = pd.to_datetime(frame["failure_start_date"], utc=True)
+    # A failure not finished yet lasts until the end of the statistic
+    failure_end = pd.to_datetime(frame["failure_end_date"], utc=True).fillna(end)
+
+    frame["day"] = start.dt.tz_convert(local_timezone()).dt.date
+    frame["seconds"] = (end - start).dt.total_seconds()
+    # Part of the statistic during its failure; a failure can span several statistics
+    overlap = end.where(end <= failure_end, failure_end) - start.where(start >= failure_start, failure_start)
+    frame["failure_seconds"] = overlap.dt.total_seconds().clip(lower=0).fillna(0)
+    frame["overtime"] = frame["seconds"] > frame["activity_id"].map(planned_seconds(frame["activity_id"].unique()))
+
+    if days:
+        frame = frame[frame["day"].isin(days)]
+
+    return frame[[*KEYS, "seconds", "failure_seconds", "overtime"]]
+
+
+def build_rollups(frame: "pd.DataFrame") -> list[DailyActivityRollup]:
+    computed_date = timezone.now()
+    result = frame.groupby(KEYS).agg(
+        statistics_count=("seconds", "count"),
+        total=("seconds", "sum"),
+        minimum=("seconds", "min"),
+        maximum=("seconds", "max"),
+        failure=("failure_seconds", "sum"),
+        overtime_count=("overtime", "sum"),
+    )
+
+    return [
+        DailyActivityRollup(
+            organization_id=int(row.organization_id),
+            worker_id=int(row.worker_id),
+            activity_id=int(row.activity_id),
+            day=row.day,
+            statistics_count=int(row.statistics_count),
+            total_duration=timedelta(seconds=float(row.total)),
+            min_duration=timedelta(seconds=float(row.minimum)),
+            max_duration=timedelta(seconds=float(row.maximum)),
+            failure_duration=timedelta(seconds=float(row.failure)),
+            overtime_count=int(row.overtime_count),
+            computed_date=computed_date,
+        )
+        for row in result.reset_index().itertuples(index=False)
+    ]
+
+
+def rebuild_rollups(worker_ids, days=None) -> int:
+    """Replace the rollups of the workers on the given days, or on all days; returns the number stored."""
+    rollups = build_rollups(load_statistics(worker_ids, days))
+    with transaction.atomic():
+        stale = DailyActivityRollup.objects.filter(worker_id__in=worker_ids)
+        if days:
+            stale = stale.filter(day__in=days)
+        stale.delete()
+        DailyActivityRollup.objects.bulk_create(rollups, batch_size=CREATE_BATCH_SIZE)
+
+    return len(rollups)
+
+
+def refresh_rollups(full: bool = False) -> tuple[int, int]:
+    """
+    Bring the rollups up to date; returns the number of rollups stored and of workers processed.
+
+    Without a watermark, or with ``full``, all rollups are rebuilt.
+    """
+    started = timezone.now()
+    watermark = RollupWatermark.objects.filter(name=ROLLUP_NAME).first()
+
+    if full or watermark is None:
+        worker_ids = set(Supervision.objects.values_list("worker_id", flat=True).distinct())
+        worker_ids.update(DailyActivityRollup.objects.values_list("worker_id", flat=True).distinct())
+        batches = [(batch, None) for batch in _batches(worker_ids, WORKER_BATCH_SIZE)]
+    else:
+        worker_days = affected_worker_days(changed_supervision_ids(watermark.value))
+        worker_ids = set(worker_days)
+        batches = [
+            # Every day of one worker in the batch is rebuilt for all of them
+            (batch, set().union(*(worker_days[worker_id] for worker_id in batch)))
+            for batch in _batches(worker_ids, WORKER_BATCH_SIZE)
+        ]
+
+    stored = sum(rebuild_rollups(batch, days) for batch, days in batches)
+    RollupWatermark.objects.update_or_create(name=ROLLUP_NAME, defaults={"value": started - SAFETY_MARGIN})
+    return stored, len(worker_ids)
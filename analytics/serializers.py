@@ -1,20 +1,27 @@
 import json
+from datetime import timezone as dt_timezone
 
 from django.contrib.gis.geos import Point
 from rest_framework import serializers
 from rest_framework_gis.fields import GeometryField
 from rest_framework_gis.serializers import GeoModelSerializer
 
+from analytics import geo
 from analytics.models import (
+    ActivityNorm,
+    DailyActivityRollup,
     ActivityStatistics,
     Supervision,
     Comment,
     CommentFiles,
     Failure,
 )
+from app_settings.serializers import AppSettingSerializer
 from core.models import Organization
-from core.serializers import ClassifierSerializer
-from layouts.models import Activity
+from core.serializers import ClassifierSerializer, DateTimeField
+from layouts.models import Activity, ActivityGroup, Layout
+from layouts.serializers import ImageGallerySerializer
+from analytics.utils import parse_bbox_query_param, parse_point_query_param
 from users.models import User
 
 
@@ -260,9 +267,12 @@ class AnalyticsDetailsSerializer(serializers.ModelSerializer):
             "start_date",
             "end_date",
             "delta",
+            "outlier_score",
+            "is_outlier",
             "verified",
             "verification_date",
         )
+        read_only_fields = ("outlier_score", "is_outlier")
 
 
 class AnalyticsDetailsLiteSerializer(AnalyticsDetailsSerializer):
@@ -305,3 +315,233 @@ class SupervisionListSerializer(serializers.ModelSerializer):
             "start_date": {"read_only": True},
             "end_date": {"read_only": True},
         }
+
+
+class ActivityNormSerializer(serializers.ModelSerializer):
+    activity_name = serializers.CharField(source="activity.name", read_only=True)
+
+    class Meta:
+        model = ActivityNorm
+        fields = (
+            "id",
+            "activity",
+            "activity_name",
+            "scope",
+            "classifier",
+            "organization",
+            "sample_count",
+            "median",
+            "trimmed_mean",
+            "p10",
+            "p90",
+            "computed_date",
+        )
+
+
+class DailyActivityRollupSerializer(serializers.ModelSerializer):
+    organization_name = serializers.CharField(source="organization.name", read_only=True)
+    worker_name = serializers.CharField(source="worker.get_full_name", read_only=True)
+    activity_name = serializers.CharField(source="activity.name", read_only=True)
+
+    class Meta:
+        model = DailyActivityRollup
+        fields = (
+            "day",
+            "organization",
+            "organization_name",
+            "worker",
+            "worker_name",
+            "activity",
+            "activity_name",
+            "statistics_count",
+            "total_duration",
+            "min_duration",
+            "max_duration",
+            "failure_duration",
+            "overtime_count",
+            "computed_date",
+        )
+
+
+class ScheduleAdherenceSerializer(serializers.Serializer):
+    supervision = serializers.IntegerField()
+    verified = serializers.BooleanField()
+    start_date = DateTimeField()
+    end_date = DateTimeField(allow_null=True)
+    planned_start_time = serializers.TimeField(allow_null=True)
+    planned_end_time = serializers.TimeField(allow_null=True)
+    late_start = serializers.DurationField(
+        allow_null=True, help_text="Start after the planned start time; null without a planned start time"
+    )
+    early_finish = serializers.DurationField(
+        allow_null=True, help_text="Finish before the planned end time; null without a planned end time or finish"
+    )
+    statistics_count = serializers.IntegerField()
+    overtime_count = serializers.IntegerField(help_text="Activities over their planned duration")
+    overtime = serializers.DurationField(help_text="Total time over the planned durations")
+    idle_count = serializers.IntegerField(help_text="Gaps between consecutive activities")
+    idle = serializers.DurationField(help_text="Total time between consecutive activities")
+    max_idle = serializers.DurationField(allow_null=True)
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    cursor = serializers.DateTimeField(required=False, default_timezone=dt_timezone.utc)
+
+
+class SyncSupervisionSerializer(serializers.ModelSerializer):
+    worker = UserSerializer(read_only=True)
+    organization = OrganizationSerializer(read_only=True)
+
+    class Meta:
+        model = Supervision
+        fields = (
+            "id",
+            "worker",
+            "organization",
+            "user",
+            "start_date",
+            "end_date",
+            "planned_start_time",
+            "planned_end_time",
+            "delta",
+            "validity",
+            "verified",
+            "updated_date",
+        )
+
+
+class SyncActivityStatisticsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ActivityStatistics
+        fields = (
+            "id",
+            "supervision",
+            "activity",
+            "failure",
+            "start_date",
+            "end_date",
+            "delta",
+            "verified",
+            "updated_date",
+        )
+
+
+class SyncFailureSerializer(FailureSerializer):
+    class Meta(FailureSerializer.Meta):
+        fields = (*FailureSerializer.Meta.fields, "updated_date")
+
+
+class SyncCommentSerializer(CommentSerializer):
+    class Meta(CommentSerializer.Meta):
+        fields = (*CommentSerializer.Meta.fields, "activity_statistics", "updated_date")
+
+
+class SyncLayoutSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Layout
+        fields = ("id", "name", "organization", "classifier", "order", "updated_date")
+
+
+class SyncActivityGroupSerializer(serializers.ModelSerializer):
+    image = ImageGallerySerializer(read_only=True)
+
+    class Meta:
+        model = ActivityGroup
+        fields = ("id", "layout", "name", "image", "column_number", "order", "updated_date")
+
+
+class SyncActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Activity
+        fields = (
+            "id",
+            "activity_group",
+            "name",
+            "planned_start_time",
+            "planned_end_time",
+            "planned_delta",
+            "order",
+            "updated_date",
+        )
+
+
+class SyncAppSettingSerializer(AppSettingSerializer):
+    class Meta(AppSettingSerializer.Meta):
+        fields = (*AppSettingSerializer.Meta.fields, "updated_date")
+
+
+class SyncDeletedSerializer(serializers.Serializer):
+    supervisions = serializers.ListField(child=serializers.IntegerField())
+    statistics = serializers.ListField(child=serializers.IntegerField())
+    failures = serializers.ListField(child=serializers.IntegerField())
+    comments = serializers.ListField(child=serializers.IntegerField())
+    layouts = serializers.ListField(child=serializers.IntegerField())
+    activity_groups = serializers.ListField(child=serializers.IntegerField())
+    activities = serializers.ListField(child=serializers.IntegerField())
+
+
+class SyncSerializer(serializers.Serializer):
+    cursor = serializers.DateTimeField(
+        default_timezone=dt_timezone.utc, help_text="Pass as the cursor of the next sync"
+    )
+    reset = serializers.BooleanField(
+        help_text="The cursor was older than the kept deletions: this is a full sync, drop the local data first"
+    )
+    supervisions = SyncSupervisionSerializer(many=True)
+    statistics = SyncActivityStatisticsSerializer(many=True)
+    failures = SyncFailureSerializer(many=True)
+    comments = SyncCommentSerializer(many=True)
+    layouts = SyncLayoutSerializer(many=True)
+    activity_groups = SyncActivityGroupSerializer(many=True)
+    activities = SyncActivitySerializer(many=True)
+    app_settings = SyncAppSettingSerializer(allow_null=True, help_text="Null when unchanged")
+    deleted = SyncDeletedSerializer(help_text="Ids of the records deleted since the cursor, by kind")
+
+
+class LiveFeedQuerySerializer(serializers.Serializer):
+    organization = serializers.IntegerField(min_value=1)
+
+
+class CommentLocationSerializer(CommentSerializer):
+    supervision = serializers.IntegerField(source="activity_statistics.supervision_id", read_only=True)
+    distance = serializers.SerializerMethodField(help_text="Meters from the point, nearest comments only")
+
+    class Meta:
+        model = Comment
+        geo_field = 'coordinates'
+        fields = ("id", "text", "coordinates", "map_url", "files", "activity_statistics", "supervision", "distance")
+
+    def get_distance(self, instance) -> float | None:
+        distance = getattr(instance, "distance", None)
+        return None if distance is None else round(distance.m, 1)
+
+
+class CommentClusterSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    coordinates = GeometryField(help_text="Center of the comments of the cluster")
+    comment = serializers.IntegerField(allow_null=True, help_text="Id of the only comment of the cluster")
+
+
+class CommentNearestQuerySerializer(serializers.Serializer):
+    point = serializers.CharField(help_text="longitude,latitude")
+    limit = serializers.IntegerField(min_value=1, max_value=geo.MAX_NEAREST, default=10)
+    max_distance = serializers.FloatField(
+        min_value=1, max_value=geo.MAX_RADIUS, default=geo.DEFAULT_NEAREST_DISTANCE
+    )
+
+    def validate_point(self, value):
+        point = parse_point_query_param(value)
+        if point is None:
+            raise serializers.ValidationError("Point must be longitude,latitude")
+        return point
+
+
+class CommentClusterQuerySerializer(serializers.Serializer):
+    bbox = serializers.CharField(help_text="min_longitude,min_latitude,max_longitude,max_latitude")
+    zoom = serializers.IntegerField(min_value=0, max_value=geo.MAX_ZOOM)
+
+    def validate_bbox(self, value):
+        polygon = parse_bbox_query_param(value)
+        if polygon is None:
+            raise serializers.ValidationError("Bounding box must be min_longitude,min_latitude,max_longitude,max_latitude")
+        return polygon
@@ -1,6 +1,7 @@
+from django.db.models import QuerySet
 from django.utils import timezone
 
-from analytics import exceptions
+from analytics import exceptions, live
 from analytics.models import (
     Supervision,
     ActivityStatistics,
@@ -19,11 +20,18 @@ class FailureService:
         failure = Failure.objects.create()
 
         activity_statistics.failure = failure
-        activity_statistics.save(update_fields=["failure"])
+        activity_statistics.save()
 
         activity_statistics.supervision.validity = False
-        activity_statistics.supervision.save(update_fields=["validity"])
-
+        activity_statistics.supervision.save()
+
+        live.publish_supervision_event(
+            live.FAILURE_STARTED,
+            activity_statistics.supervision,
+            statistics=activity_statistics.pk,
+            activity=activity_statistics.activity_id,
+            failure=failure.pk,
+        )
         return failure
 
     def finish_failure(self, activity_statistics: ActivityStatistics) -> Failure:
@@ -31,7 +39,7 @@ class FailureService:
 
         if not failure:
             activity_statistics.failure = failure
-            activity_statistics.save(update_fields=["failure"])
+            activity_statistics.save()
 
             activity_statistics_with_last_failure = self._get_analytics_with_last_failure(
                 activity_statistics.supervision.pk)
@@ -40,8 +48,15 @@ class FailureService:
                 activity_statistics_with_last_failure, activity_statistics, failure)
 
         failure.end_date = timezone.now()
-        failure.save(update_fields=["end_date"])
-
+        failure.save()
+
+        live.publish_supervision_event(
+            live.FAILURE_FINISHED,
+            activity_statistics.supervision,
+            statistics=activity_statistics.pk,
+            activity=activity_statistics.activity_id,
+            failure=failure.pk,
+        )
         return failure
 
     @staticmethod
@@ -59,14 +74,14 @@ class FailureService:
                                                          last_analytics: ActivityStatistics,
                                                          failure: Failure) -> None:
         ActivityStatistics.objects.filter(
-            id__gt=first_analytics, id__lt=last_analytics).update(failure=failure)
+            id__gt=first_analytics, id__lt=last_analytics).update(failure=failure, updated_date=timezone.now())
 
 
 class VerifyMixin:
     def _change_verification(self, entity: VerifiedMixin, verify: bool) -> None:
         entity.verified = verify
         entity.verification_date = timezone.now()
-        entity.save(update_fields=["verified", "verification_date"])
+        entity.save()
 
     def verify(self, entity: VerifiedMixin):
         self._change_verification(entity, True)
@@ -79,7 +94,7 @@ class ActivityStatisticsService(VerifyMixin):
     @staticmethod
     def finish_activity(activity_statistics: ActivityStatistics) -> None:
         activity_statistics.end_date = timezone.now()
-        activity_statistics.save(update_fields=["end_date"])
+        activity_statistics.save()
 
     def start_activity(
             self,
@@ -96,7 +111,16 @@ class ActivityStatisticsService(VerifyMixin):
                 data["failure"] = previous_activity_statistic.failure
 
             self.finish_activity(previous_activity_statistic)
-        return ActivityStatistics.objects.create(**data)
+        activity_statistics = ActivityStatistics.objects.create(**data)
+
+        live.publish_supervision_event(
+            live.ACTIVITY_STARTED,
+            activity_statistics.supervision,
+            statistics=activity_statistics.pk,
+            activity=activity_statistics.activity_id,
+            previous_statistics=previous_activity_statistic.pk if previous_activity_statistic else None,
+        )
+        return activity_statistics
 
 
 class SupervisionService(VerifyMixin):
@@ -114,7 +138,9 @@ class SupervisionService(VerifyMixin):
                 FailureService().finish_failure(last_activity_statistic)
 
         supervision.end_date = timezone.now()
-        supervision.save(update_fields=["end_date"])
+        supervision.save()
+
+        live.publish_supervision_event(live.SUPERVISION_FINISHED, supervision)
 
     @staticmethod
     def delete_not_verified_supervisions() -> tuple[int,dict[str, int]]:
@@ -125,6 +151,13 @@ class SupervisionService(VerifyMixin):
     def get_user_last_active_supervision(user: User) -> Supervision:
         return Supervision.objects.filter(user=user, end_date__isnull=True).order_by("id").last()
 
+    @staticmethod
+    async def aget_user_last_active_supervision(user: User, queryset: QuerySet = None) -> Supervision:
+        if queryset is None:
+            queryset = Supervision.objects.all()
+
+        return await queryset.filter(user=user, end_date__isnull=True).order_by("id").alast()
+
 
 class CommentService:
     @staticmethod
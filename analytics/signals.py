@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from analytics import sync
+from analytics.models import ActivityStatistics, Supervision
+from analytics.norms import mark_stale
+
+
+# Changes of these fields of a verified statistic change the norms of its activity
+NORM_STATISTICS_FIELDS = {"start_date", "end_date", "failure", "activity", "supervision"}
+NORM_SUPERVISION_FIELDS = {"organization", "worker"}
+
+
+def _affects_norms(instance, update_fields, fields: set[str]) -> bool:
+    """Verification changed, or a verified row changed in a field the norms depend on."""
+    if update_fields is None:
+        return instance.verified
+    if "verified" in update_fields:
+        return True
+    return instance.verified and bool(fields.intersection(update_fields))
+
+
+@receiver(post_save, sender=ActivityStatistics)
+def mark_norms_stale_on_statistics_change(sender, instance, update_fields, **kwargs):
+    """Mark the norms of the activity stale when its statistics are verified, unverified or edited."""
+    if _affects_norms(instance, update_fields, NORM_STATISTICS_FIELDS):
+        activity_ids = {instance.activity_id}
+        if "activity" in instance.changed_fields:
+            activity_ids.add(instance._loaded_values["activity_id"])
+        mark_stale(activity_ids)
+
+
+@receiver(post_save, sender=Supervision)
+def mark_norms_stale_on_supervision_change(sender, instance, created, update_fields, **kwargs):
+    """Mark the norms of the activities of a supervision stale when it is verified, unverified or edited."""
+    if not created and _affects_norms(instance, update_fields, NORM_SUPERVISION_FIELDS):
+        mark_stale(instance.statistics.values_list("activity_id", flat=True).distinct())
+
+
+def record_sync_tombstone(sender, instance, using, origin=None, **kwargs):
+    """Keep the deletion of a synced record for the sync feed; cascades from synced records go with their origin."""
+    if sync.needs_tombstone(instance, origin):
+        sync.record_tombstone(instance, using)
+
+
+# Connected per model: a receiver for all senders would turn off fast deletes everywhere
+for model in sync.TOMBSTONE_MODELS:
+    post_delete.connect(record_sync_tombstone, sender=model, dispatch_uid=f"sync_tombstone_{model._meta.label_lower}")
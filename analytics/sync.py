@@ -0,0 +1,157 @@
+"""
+Incremental sync of the mobile clients.
+
+A sync returns what changed for a supervisor since the cursor of the previous
+sync: their supervisions with the statistics, failures and comments, the
+layouts with their activity groups and activities, and the app settings.
+Records are selected by their indexed updated_date. Deletions are kept as
+core.Tombstone rows for settings.SYNC["TOMBSTONE_DAYS"]; a cursor older than
+that gets a full sync with ``reset``. A delete cascading from a synced record
+is not recorded, the clients drop the records it cascaded to with it; a
+delete cascading from a record the clients do not have, e.g. a worker or an
+organization, is.
+The tombstones of a transaction are written in one insert once it commits.
+
+A layout is returned with all its groups and activities when any of them
+changed: reordering shifts the order of the siblings without saving them.
+The next cursor lags settings.SYNC["CURSOR_LAG_SECONDS"] behind the sync, so
+rows of transactions still open during a sync come with the next one; clients
+upsert records by id.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from analytics.models import ActivityStatistics, Comment, CommentFiles, Failure, Supervision
+from app_settings.models import AppSetting
+from core.models import Tombstone
+from layouts.models import Activity, ActivityGroup, Layout
+
+
+# Keys of the deleted ids in the sync response
+TOMBSTONE_MODELS = {
+    Supervision: "supervisions",
+    ActivityStatistics: "statistics",
+    Failure: "failures",
+    Comment: "comments",
+    Layout: "layouts",
+    ActivityGroup: "activity_groups",
+    Activity: "activities",
+}
+
+
+def _changed(queryset: QuerySet, cursor: datetime | None) -> QuerySet:
+    return queryset if cursor is None else queryset.filter(updated_date__gt=cursor)
+
+
+def needs_tombstone(instance, origin) -> bool:
+    """Whether the delete is not a cascade from a synced record, which the clients apply themselves."""
+    if origin is None or origin is instance:
+        return True
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is type(instance) or origin_model not in TOMBSTONE_MODELS
+
+
+class _TombstoneWriter:
+    """on_commit callback writing the tombstones of the deletes made in one savepoint."""
+
+    def __init__(self, using):
+        self.using = using
+        self.tombstones = []
+
+    def __call__(self):
+        Tombstone.objects.using(self.using).bulk_create(self.tombstones)
+
+
+def _current_writer(using) -> _TombstoneWriter:
+    connection = connections[using]
+    savepoint_ids = set(connection.savepoint_ids)
+    for callback_savepoint_ids, callback, _ in connection.run_on_commit:
+        # A writer of another savepoint could outlive a rollback of the deletes of this one
+        if isinstance(callback, _TombstoneWriter) and callback_savepoint_ids == savepoint_ids:
+            return callback
+
+    writer = _TombstoneWriter(using)
+    transaction.on_commit(writer, using=using)
+    return writer
+
+
+def record_tombstone(instance, using):
+    tombstone = Tombstone(model=instance._meta.label_lower, object_id=instance.pk, deleted_date=timezone.now())
+    if connections[using].in_atomic_block:
+        _current_writer(using).tombstones.append(tombstone)
+    else:
+        tombstone.save(using=using)
+
+
+def purge_tombstones() -> int:
+    """Delete the tombstones past the retention; returns their number."""
+    deleted, _ = Tombstone.objects.filter(
+        deleted_date__lt=timezone.now() - timedelta(days=settings.SYNC["TOMBSTONE_DAYS"])
+    ).delete()
+    return deleted
+
+
+def changed_layouts(cursor: datetime | None) -> QuerySet:
+    if cursor is None:
+        return Layout.objects.all()
+
+    return Layout.objects.filter(
+        Q(updated_date__gt=cursor)
+        | Q(id__in=ActivityGroup.objects.filter(updated_date__gt=cursor).values("layout_id"))
+        | Q(id__in=Activity.objects.filter(updated_date__gt=cursor).values("activity_group__layout_id"))
+    )
+
+
+def deleted_ids(cursor: datetime | None) -> dict[str, list[int]]:
+    deleted = {key: [] for key in TOMBSTONE_MODELS.values()}
+    if cursor is None:
+        return deleted
+
+    keys = {model._meta.label_lower: key for model, key in TOMBSTONE_MODELS.items()}
+    rows = Tombstone.objects.filter(deleted_date__gt=cursor, model__in=keys).order_by("id")
+    for model, object_id in rows.values_list("model", "object_id"):
+        deleted[keys[model]].append(object_id)
+
+    return deleted
+
+
+def get_changes(user, cursor: datetime | None = None) -> dict:
+    """Records of the user changed and deleted after the cursor, or all of them without a cursor."""
+    now = timezone.now()
+    reset = cursor is not None and cursor < now - timedelta(days=settings.SYNC["TOMBSTONE_DAYS"])
+    if reset:
+        cursor = None
+
+    statistics = ActivityStatistics.objects.filter(supervision__user=user)
+    if cursor is None:
+        comments = Comment.objects.filter(activity_statistics__supervision__user=user)
+        app_settings = AppSetting.load()
+    else:
+        # Files are added to a comment after it is saved
+        comments = Comment.objects.filter(
+            Q(updated_date__gt=cursor)
+            | Q(id__in=CommentFiles.objects.filter(updated_date__gt=cursor).values("comment_id")),
+            activity_statistics__supervision__user=user,
+        )
+        app_settings = AppSetting.objects.filter(updated_date__gt=cursor).first()
+
+    layout_ids = list(changed_layouts(cursor).values_list("id", flat=True))
+    return {
+        "cursor": now - timedelta(seconds=settings.SYNC["CURSOR_LAG_SECONDS"]),
+        "reset": reset,
+        "supervisions": _changed(Supervision.objects.filter(user=user), cursor)
+        .select_related("worker__classifier", "organization")
+        .order_by("id"),
+        "statistics": _changed(statistics, cursor).order_by("id"),
+        "failures": _changed(Failure.objects.filter(id__in=statistics.values("failure_id")), cursor).order_by("id"),
+        "comments": comments.prefetch_related("files").order_by("id"),
+        "layouts": Layout.objects.filter(id__in=layout_ids).order_by("id"),
+        "activity_groups": ActivityGroup.objects.filter(layout_id__in=layout_ids).select_related("image"),
+        "activities": Activity.objects.filter(activity_group__layout_id__in=layout_ids),
+        "app_settings": app_settings,
+        "deleted": deleted_ids(cursor),
+    }
@@ -0,0 +1,452 @@
+"""
+Deterministic synthetic dataset for load and scale testing.
+
+Reference data (organizations, classifiers, layouts, users) is created with
+bulk_create. Supervisions with their activity statistics, failures, comments
+and comment files are generated in batches, optionally in parallel processes;
+every batch has its own random generator seeded from (seed, batch number), so
+the same options produce the same data however the batches are scheduled.
+On PostgreSQL batches are written with COPY, elsewhere with bulk_create.
+"""
+import io
+import math
+import random
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from multiprocessing import get_context
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.contrib.gis.geos import Point
+from django.db import connection, connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from analytics.models import ActivityStatistics, Comment, CommentFiles, Failure, Supervision
+from core.models import Classifier, Organization
+from layouts.models import Activity, ActivityGroup, Layout
+from users.models import User
+from users.signals import ConstantGroups
+
+
+# Minsk area; comment coordinates are scattered around one point per organization
+BASE_LONGITUDE = 27.56
+BASE_LATITUDE = 53.90
+WORKDAY_START = time(8, 0)
+
+
+@dataclass
+class DatasetOptions:
+    label: str = "synthetic"
+    seed: int = 0
+    organizations: int = 5
+    classifiers_per_organization: int = 10
+    groups_per_layout: int = 4
+    activities_per_group: int = 6
+    workers: int = 500
+    supervisors: int = 50
+    supervisions: int = 10_000
+    min_activities: int = 5
+    max_activities: int = 30
+    failure_rate: float = 0.05
+    comment_rate: float = 0.1
+    file_rate: float = 0.3
+    verified_rate: float = 0.7
+    start_date: date = date(2024, 1, 1)
+    days: int = 365
+    batch_size: int = 1_000
+    jobs: int = 1
+
+
+@dataclass
+class ReferenceData:
+    # (worker id, organization id, classifier id) per worker
+    workers: list[tuple[int, int, int]]
+    supervisors: list[int]
+    # classifier id -> [(activity id, planned duration in seconds), ...] in layout order
+    activities: dict[int, list[tuple[int, int]]]
+    organization_points: dict[int, tuple[float, float]]
+
+
+@dataclass
+class BatchRows:
+    supervisions: list[dict] = field(default_factory=list)
+    failures: list[dict] = field(default_factory=list)
+    statistics: list[dict] = field(default_factory=list)
+    comments: list[dict] = field(default_factory=list)
+    files: list[dict] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return sum(len(rows) for rows in (self.supervisions, self.failures, self.statistics, self.comments, self.files))
+
+
+def _classifier_code(label: str, number: int) -> str:
+    return f"{zlib.crc32(label.encode()) % 1_000_000:06d}{number:012d}"
+
+
+def _aware(value: datetime) -> datetime:
+    return timezone.make_aware(value, timezone.get_default_timezone())
+
+
+def create_reference_data(options: DatasetOptions) -> ReferenceData:
+    """Create organizations, classifiers, layouts with ordered groups and activities, and users."""
+    rng = random.Random(f"{options.seed}:reference")
+    label = options.label
+
+    organizations = Organization.objects.bulk_create(
+        Organization(name=f"{label} organization {number}") for number in range(options.organizations)
+    )
+    organization_points = {
+        organization.pk: (
+            BASE_LONGITUDE + rng.uniform(-0.2, 0.2),
+            BASE_LATITUDE + rng.uniform(-0.1, 0.1),
+        )
+        for organization in organizations
+    }
+
+    classifiers = Classifier.objects.bulk_create(
+        Classifier(
+            code=_classifier_code(label, number),
+            name=f"{label} classifier {number}",
+        )
+        for number in range(options.organizations * options.classifiers_per_organization)
+    )
+    classifier_organizations = {
+        classifier.pk: organizations[number // options.classifiers_per_organization].pk
+        for number, classifier in enumerate(classifiers)
+    }
+
+    layouts = Layout.objects.bulk_create(
+        Layout(
+            name=f"{label} layout {number}",
+            organization_id=classifier_organizations[classifier.pk],
+            classifier=classifier,
+            order=number,
+        )
+        for number, classifier in enumerate(classifiers)
+    )
+    activity_groups = ActivityGroup.objects.bulk_create(
+        ActivityGroup(
+            name=f"Group {number + 1}",
+            layout=layout,
+            column_number=number % len(ActivityGroup.ColumnNumberChoice) + 1,
+            order=number,
+        )
+        for layout in layouts
+        for number in range(options.groups_per_layout)
+    )
+
+    activity_objects = []
+    for activity_group in activity_groups:
+        planned_start = datetime.combine(options.start_date, WORKDAY_START)
+        for number in range(options.activities_per_group):
+            planned_duration = timedelta(minutes=rng.choice((5, 10, 15, 20, 30, 45, 60)))
+            activity_objects.append(
+                Activity(
+                    name=f"Activity {number + 1}",
+                    activity_group=activity_group,
+                    planned_start_time=planned_start.time(),
+                    planned_end_time=(planned_start + planned_duration).time(),
+                    order=number,
+                )
+            )
+            planned_start += planned_duration
+    activity_objects = Activity.objects.bulk_create(activity_objects)
+
+    layout_classifiers = {layout.pk: layout.classifier_id for layout in layouts}
+    group_classifiers = {group.pk: layout_classifiers[group.layout_id] for group in activity_groups}
+    activities = {classifier.pk: [] for classifier in classifiers}
+    for activity in activity_objects:
+        planned_seconds = (
+            datetime.combine(options.start_date, activity.planned_end_time)
+            - datetime.combine(options.start_date, activity.planned_start_time)
+        ).seconds
+        activities[group_classifiers[activity.activity_group_id]].append((activity.pk, planned_seconds))
+
+    # One hash for all users: hashing per user would dominate the run time
+    password = make_password(label)
+    workers = User.objects.bulk_create(
+        User(
+            username=f"{label}_worker_{number}",
+            first_name="Worker",
+            last_name=str(number),
+            password=password,
+            classifier=classifiers[number % len(classifiers)],
+            organization_id=classifier_organizations[classifiers[number % len(classifiers)].pk],
+        )
+        for number in range(options.workers)
+    )
+    supervisors = User.objects.bulk_create(
+        User(
+            username=f"{label}_supervisor_{number}",
+            first_name="Supervisor",
+            last_name=str(number),
+            password=password,
+        )
+        for number in range(options.supervisors)
+    )
+
+    groups = {group.name: group for group in Group.objects.filter(name__in=ConstantGroups.ALL_GROUPS)}
+    memberships = [
+        User.groups.through(user_id=user.pk, group_id=groups[group_name].pk)
+        for group_name, users in ((ConstantGroups.WORKER, workers), (ConstantGroups.SUPERVISOR, supervisors))
+        if group_name in groups
+        for user in users
+    ]
+    User.groups.through.objects.bulk_create(memberships)
+
+    return ReferenceData(
+        workers=[(worker.pk, worker.organization_id, worker.classifier_id) for worker in workers],
+        supervisors=[supervisor.pk for supervisor in supervisors],
+        activities=activities,
+        organization_points=organization_points,
+    )
+
+
+def _duration(rng: random.Random, planned_seconds: int) -> timedelta:
+    """Actual duration around the planned one, with a long tail of overruns."""
+    return timedelta(seconds=max(30, int(planned_seconds * rng.lognormvariate(0, 0.35))))
+
+
+def generate_batch(options: DatasetOptions, reference: ReferenceData, batch: int) -> BatchRows:
+    """Generate the rows of one batch of supervisions (ids are assigned on insert)."""
+    rng = random.Random(f"{options.seed}:{batch}")
+    rows = BatchRows()
+
+    first = batch * options.batch_size
+    for number in range(first, min(first + options.batch_size, options.supervisions)):
+        worker_id, organization_id, classifier_id = reference.workers[number % len(reference.workers)]
+        supervisor_id = reference.supervisors[number % len(reference.supervisors)]
+        layout_activities = reference.activities[classifier_id]
+
+        day = options.start_date + timedelta(days=rng.randrange(options.days))
+        start_date = _aware(datetime.combine(day, WORKDAY_START)) + timedelta(minutes=rng.randint(0, 120))
+
+        supervision = {
+            "_index": len(rows.supervisions),
+            "worker_id": worker_id,
+            "organization_id": organization_id,
+            "user_id": supervisor_id,
+            "start_date": start_date,
+            "validity": True,
+        }
+        rows.supervisions.append(supervision)
+
+        # Workers mostly follow the layout order, sometimes repeating or skipping an activity
+        position = rng.randrange(len(layout_activities))
+        current = start_date
+        for _ in range(rng.randint(options.min_activities, options.max_activities)):
+            activity_id, planned_seconds = layout_activities[position]
+            end = current + _duration(rng, planned_seconds)
+
+            failure_index = None
+            if rng.random() < options.failure_rate:
+                failure_start = current + (end - current) * rng.random()
+                failure_end = failure_start + timedelta(seconds=int(rng.expovariate(1 / 300)) + 10)
+                failure_index = len(rows.failures)
+                rows.failures.append({"start_date": failure_start, "end_date": failure_end})
+                supervision["validity"] = False
+                end = max(end, failure_end)
+
+            statistics_index = len(rows.statistics)
+            rows.statistics.append({
+                "_supervision": supervision["_index"],
+                "_failure": failure_index,
+                "activity_id": activity_id,
+                "start_date": current,
+                "end_date": end,
+                "created_by_id": supervisor_id,
+                "updated_by_id": supervisor_id,
+            })
+
+            if rng.random() < options.comment_rate:
+                longitude, latitude = reference.organization_points[organization_id]
+                comment_index = len(rows.comments)
+                rows.comments.append({
+                    "_statistics": statistics_index,
+                    "text": f"Comment {comment_index}",
+                    "coordinates": (
+                        longitude + rng.gauss(0, 0.005),
+                        latitude + rng.gauss(0, 0.005),
+                    ),
+                    "created_by_id": supervisor_id,
+                    "updated_by_id": supervisor_id,
+                    "created_date": end,
+                    "updated_date": end,
+                })
+                if rng.random() < options.file_rate:
+                    rows.files.append({"_comment": comment_index, "created_date": end, "updated_date": end})
+
+            current = end
+            step = rng.random()
+            if step < 0.8:
+                position = (position + 1) % len(layout_activities)
+            elif step < 0.9:
+                position = rng.randrange(len(layout_activities))
+
+        verified = rng.random() < options.verified_rate
+        supervision.update(
+            end_date=current,
+            verified=verified,
+            verification_date=current + timedelta(days=1) if verified else None,
+            created_by_id=supervisor_id,
+            updated_by_id=supervisor_id,
+            created_date=start_date,
+            updated_date=current,
+        )
+
+    return rows
+
+
+def _reserve_ids(model, count: int) -> list[int]:
+    if not count:
+        return []
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # Other backends are only used single-process (tests), where max(id) is stable
+    first = (model.objects.aggregate(Max("id"))["id__max"] or 0) + 1
+    return list(range(first, first + count))
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Point):
+        return value.ewkt
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy(model, objects: list):
+    fields = model._meta.concrete_fields
+    table = connection.ops.quote_name(model._meta.db_table)
+    column_list = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+    lines = []
+    for obj in objects:
+        values = []
+        for model_field in fields:
+            value = getattr(obj, model_field.attname)
+            if not isinstance(value, Point):
+                value = model_field.get_db_prep_save(value, connection)
+            values.append(_copy_value(value))
+        lines.append("\t".join(values) + "\n")
+
+    sql = f"COPY {table} ({column_list}) FROM STDIN"
+    with connection.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):
+            cursor.copy_expert(sql, io.StringIO("".join(lines)))
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write("".join(lines))
+
+
+def _insert(model, rows: list[dict]):
+    """Insert rows with explicit ids; model instances fill in the field defaults."""
+    objects = [model(**row) for row in rows]
+    if not objects:
+        return
+
+    if connection.vendor == "postgresql":
+        _copy(model, objects)
+    else:
+        model.objects.bulk_create(objects)
+
+
+def write_batch(rows: BatchRows):
+    """Insert a generated batch in one transaction, resolving the references between its rows."""
+
+    def public(row):
+        return {name: value for name, value in row.items() if not name.startswith("_")}
+
+    with transaction.atomic():
+        supervision_ids = _reserve_ids(Supervision, len(rows.supervisions))
+        failure_ids = _reserve_ids(Failure, len(rows.failures))
+        statistics_ids = _reserve_ids(ActivityStatistics, len(rows.statistics))
+        comment_ids = _reserve_ids(Comment, len(rows.comments))
+        file_ids = _reserve_ids(CommentFiles, len(rows.files))
+
+        _insert(Supervision, [
+            {"id": supervision_ids[index], **public(row)} for index, row in enumerate(rows.supervisions)
+        ])
+        _insert(Failure, [
+            {"id": failure_ids[index], **row} for index, row in enumerate(rows.failures)
+        ])
+        _insert(ActivityStatistics, [
+            {
+                "id": statistics_ids[index],
+                "supervision_id": supervision_ids[row["_supervision"]],
+                "failure_id": None if row["_failure"] is None else failure_ids[row["_failure"]],
+                **public(row),
+            }
+            for index, row in enumerate(rows.statistics)
+        ])
+        _insert(Comment, [
+            {
+                "id": comment_ids[index],
+                "activity_statistics_id": statistics_ids[row["_statistics"]],
+                **public(row),
+                "coordinates": Point(*row["coordinates"], srid=4326),
+            }
+            for index, row in enumerate(rows.comments)
+        ])
+        _insert(CommentFiles, [
+            {
+                "id": file_ids[index],
+                "comment_id": comment_ids[row["_comment"]],
+                "file": f"files/synthetic/{comment_ids[row['_comment']]}.jpg",
+                **public(row),
+            }
+            for index, row in enumerate(rows.files)
+        ])
+
+
+def _run_batch(args) -> int:
+    options, reference, batch = args
+    rows = generate_batch(options, reference, batch)
+    write_batch(rows)
+    return rows.count
+
+
+def _close_connections():
+    # Forked processes must not share the parent's database connections
+    connections.close_all()
+
+
+def generate_dataset(options: DatasetOptions, progress=None) -> int:
+    """Create the dataset and return the number of supervision rows and their children inserted."""
+    with transaction.atomic():
+        reference = create_reference_data(options)
+
+    batches = math.ceil(options.supervisions / options.batch_size)
+    tasks = [(options, reference, batch) for batch in range(batches)]
+
+    if options.jobs <= 1 or batches <= 1 or connection.vendor != "postgresql":
+        return _collect(map(_run_batch, tasks), batches, progress)
+
+    _close_connections()
+    with get_context("fork").Pool(options.jobs, initializer=_close_connections) as pool:
+        return _collect(pool.imap_unordered(_run_batch, tasks), batches, progress)
+
+
+def _collect(results, batches: int, progress) -> int:
+    inserted = 0
+    for done, count in enumerate(results, 1):
+        inserted += count
+        if progress:
+            progress(done, batches, inserted)
+
+    return inserted
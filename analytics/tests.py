@@ -1,19 +1,99 @@
-from datetime import date, datetime, timedelta
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from inspect import iscoroutinefunction
+from io import StringIO
+from unittest import mock
 
+import pandas as pd
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
 from django.utils import timezone
-from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 
+from analytics import geo, live
+from analytics.adherence import compute_reports, get_adherence_reports
 from analytics.filters import (
+    CommentLocationFilter,
     DateRangeStrategy,
     SameDayOverlapStrategy,
     SupervisionDateFilter,
+    SupervisionOutlierFilter,
+)
+from analytics.models import (
+    ActivityNorm,
+    ActivityStatistics,
+    Comment,
+    CommentFiles,
+    DailyActivityRollup,
+    Failure,
+    RollupWatermark,
+    StaleActivityNorm,
+    Supervision,
 )
-from analytics.models import Supervision
-from core.models import Organization
+from analytics.norms import aggregate, mark_stale, queue_stale_recompute, recompute_norms, recompute_stale_norms
+from analytics.outliers import detect_outliers, score
+from analytics.rollups import ROLLUP_NAME, refresh_rollups
+from analytics.sync import get_changes, purge_tombstones
+from analytics.utils import parse_bbox_query_param, parse_point_query_param
+from analytics.views import SupervisionViewSet
+from core.event_bus import get_event_bus
+from core.models import Classifier, Organization, Tombstone
+from core.testing import QueryCountTestMixin
+from layouts.models import Activity, ActivityGroup, Layout
 from users.models import User
 
 
+class AnalyticsTestCase(TestCase):
+    """
+    Base of the analytics test cases: a supervisor, a worker of an organization
+    and a supervision of the worker, with one activity in the worker's layout.
+    """
+
+    # Planned times of the activity
+    PLANNED_START_TIME = None
+    PLANNED_END_TIME = None
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(
+            username="admin",
+            email="admin@test.com",
+            password="testpass"
+        )
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        self.worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass",
+            organization=self.organization,
+            classifier=self.classifier,
+        )
+        self.layout = Layout.objects.create(
+            name="Test layout", organization=self.organization, classifier=self.classifier
+        )
+        self.activity_group = ActivityGroup.objects.create(name="Test group", layout=self.layout)
+        self.activity = Activity.objects.create(
+            name="Test activity",
+            activity_group=self.activity_group,
+            planned_start_time=self.PLANNED_START_TIME,
+            planned_end_time=self.PLANNED_END_TIME,
+        )
+        self.supervision = Supervision.objects.create(
+            worker=self.worker, organization=self.organization, user=self.user
+        )
+
+
 class SupervisionDateFilterTestCase(TestCase):
     """Test cases for SupervisionDateFilter."""
 
@@ -366,3 +446,1341 @@ class DateRangeStrategyTestCase(TestCase):
         
         self.assertEqual(filtered.count(), 1)
         self.assertIn(supervision, filtered)
+
+
+class AdminChangelistQueryCountTestCase(TestCase):
+    """Test that admin changelists run a bounded number of queries per page."""
+
+    MAX_CHANGELIST_QUERIES = 15
+
+    def setUp(self):
+        """Set up test data."""
+        self.admin_user = User.objects.create_superuser(
+            username="admin",
+            email="admin@test.com",
+            password="testpass"
+        )
+        self.client.force_login(self.admin_user)
+
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        self.worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass",
+            organization=self.organization,
+            classifier=self.classifier,
+        )
+        layout = Layout.objects.create(
+            name="Test layout", organization=self.organization, classifier=self.classifier
+        )
+        activity_group = ActivityGroup.objects.create(name="Test group", layout=layout)
+        self.activity = Activity.objects.create(name="Test activity", activity_group=activity_group)
+
+    def _create_supervisions(self, count):
+        for _ in range(count):
+            supervision = Supervision.objects.create(
+                worker=self.worker,
+                organization=self.organization,
+                user=self.admin_user,
+            )
+            ActivityStatistics.objects.create(
+                activity=self.activity,
+                supervision=supervision,
+                failure=Failure.objects.create(),
+            )
+
+    def _count_changelist_queries(self, url_name):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(url_name))
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def _assert_bounded_changelist_queries(self, url_name):
+        self._create_supervisions(2)
+        small_page_queries = self._count_changelist_queries(url_name)
+
+        self._create_supervisions(20)
+        large_page_queries = self._count_changelist_queries(url_name)
+
+        self.assertEqual(small_page_queries, large_page_queries)
+        self.assertLessEqual(large_page_queries, self.MAX_CHANGELIST_QUERIES)
+
+    def test_activity_statistics_changelist_query_count(self):
+        """Test that the activity statistics changelist does not query per row."""
+        self._assert_bounded_changelist_queries("admin:analytics_activitystatistics_changelist")
+
+    def test_supervision_changelist_query_count(self):
+        """Test that the supervision changelist does not query per row."""
+        self._assert_bounded_changelist_queries("admin:analytics_supervision_changelist")
+
+
+class ChangedFieldsMixinTestCase(TestCase):
+    """Test cases for ChangedFieldsMixin on analytics models."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.organization = Organization.objects.create(name="Test Org")
+        self.worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass"
+        )
+        supervision = Supervision.objects.create(
+            worker=self.worker,
+            organization=self.organization,
+            user=self.worker,
+        )
+        self.supervision = Supervision.objects.get(pk=supervision.pk)
+
+    def test_loaded_instance_has_no_changed_fields(self):
+        """Test that a freshly loaded instance reports no changes."""
+        self.assertEqual(self.supervision.changed_fields, [])
+
+    def test_changed_fields_lists_modified_fields(self):
+        """Test that modified fields are reported by their names."""
+        self.supervision.verified = True
+        self.supervision.organization = Organization.objects.create(name="Other Org")
+
+        self.assertEqual(self.supervision.changed_fields, ["verified", "organization"])
+
+    def test_save_updates_only_changed_fields(self):
+        """Test that save writes only the changed columns."""
+        self.supervision.validity = False
+
+        with CaptureQueriesContext(connection) as context:
+            self.supervision.save()
+
+        self.assertEqual(len(context.captured_queries), 1)
+        update_sql = context.captured_queries[0]["sql"]
+        self.assertIn('"validity"', update_sql)
+        self.assertNotIn('"admin_comment"', update_sql)
+        self.assertEqual(self.supervision.changed_fields, [])
+        self.assertFalse(Supervision.objects.get(pk=self.supervision.pk).validity)
+
+    def test_save_moves_updated_date(self):
+        """Test that a save limited to the changed fields also moves updated_date."""
+        updated_date = self.supervision.updated_date
+        self.supervision.validity = False
+
+        self.supervision.save()
+
+        self.assertGreater(Supervision.objects.get(pk=self.supervision.pk).updated_date, updated_date)
+        self.assertEqual(self.supervision.changed_fields, [])
+
+    def test_save_without_changes_skips_query(self):
+        """Test that saving an unchanged instance does not hit the database."""
+        with CaptureQueriesContext(connection) as context:
+            self.supervision.save()
+
+        self.assertEqual(len(context.captured_queries), 0)
+
+
+class AsyncReadEndpointsTestCase(TestCase):
+    """Test cases for the async-capable read endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(
+            username="admin",
+            email="admin@test.com",
+            password="testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        self.worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass",
+            organization=self.organization,
+            classifier=self.classifier,
+        )
+        self.layout = Layout.objects.create(
+            name="Test layout", organization=self.organization, classifier=self.classifier
+        )
+        Layout.objects.create(
+            name="Other layout",
+            organization=self.organization,
+            classifier=Classifier.objects.create(code="2" * 18, name="Other classifier"),
+        )
+        self.supervision = Supervision.objects.create(
+            worker=self.worker,
+            organization=self.organization,
+            user=self.user,
+        )
+
+    def test_read_views_are_coroutines(self):
+        """Test that the read endpoints resolve to async views."""
+        urls = (
+            reverse("supervision_detail", args=[self.supervision.pk]),
+            reverse("user_last_active_supervision"),
+            reverse("layout-list"),
+            reverse("app-settings-current"),
+            reverse("health_check"),
+        )
+        for url in urls:
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+        self.assertFalse(iscoroutinefunction(resolve(reverse("supervision")).func))
+
+    def test_retrieve_supervision(self):
+        """Test that supervision retrieve returns the object and 404 for unknown ids."""
+        response = self.client.get(reverse("supervision_detail", args=[self.supervision.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.supervision.pk)
+        self.assertEqual(response.data["worker"]["id"], self.worker.pk)
+
+        response = self.client.get(reverse("supervision_detail", args=[self.supervision.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_sync_handlers_share_async_route(self):
+        """Test that sync actions on an async route still work."""
+        response = self.client.delete(reverse("supervision_detail", args=[self.supervision.pk]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Supervision.objects.filter(pk=self.supervision.pk).exists())
+
+    def test_last_active_supervision(self):
+        """Test that the last unfinished supervision of the user is returned."""
+        response = self.client.get(reverse("user_last_active_supervision"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["id"], self.supervision.pk)
+
+    def test_layouts_filtered_by_worker_classifier(self):
+        """Test that layouts are filtered by the supervision worker classifier."""
+        response = self.client.get(reverse("layout-list"), {"supervision_id": self.supervision.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([layout["id"] for layout in response.data], [self.layout.pk])
+
+        self.assertEqual(self.client.get(reverse("layout-list")).status_code, 400)
+        response = self.client.get(reverse("layout-list"), {"supervision_id": self.supervision.pk + 100})
+        self.assertEqual(response.status_code, 404)
+
+    def test_unauthenticated_request_is_rejected(self):
+        """Test that authentication still runs for async views."""
+        response = APIClient().get(reverse("user_last_active_supervision"))
+
+        self.assertEqual(response.status_code, 401)
+
+
+class AnalyticsQueryCountTestCase(QueryCountTestMixin, TestCase):
+    """Test that the analytics endpoints run a bounded number of queries regardless of result size."""
+
+    MAX_READ_QUERIES = 8
+    MAX_WRITE_QUERIES = 10
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(
+            username="admin",
+            email="admin@test.com",
+            password="testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        self.worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass",
+            organization=self.organization,
+            classifier=self.classifier,
+        )
+        layout = Layout.objects.create(
+            name="Test layout", organization=self.organization, classifier=self.classifier
+        )
+        activity_group = ActivityGroup.objects.create(name="Test group", layout=layout)
+        self.activities = [
+            Activity.objects.create(name=f"Activity {number}", activity_group=activity_group)
+            for number in range(3)
+        ]
+
+        self.supervision = self._create_supervision(finished=False)
+        self.statistics = self._create_statistics(self.supervision)
+
+    def _create_supervision(self, finished=True):
+        now = timezone.now()
+        return Supervision.objects.create(
+            worker=self.worker,
+            organization=self.organization,
+            user=self.user,
+            start_date=now - timedelta(hours=1),
+            end_date=now if finished else None,
+            verified=finished,
+        )
+
+    def _create_statistics(self, supervision, activity=None):
+        now = timezone.now()
+        statistics = ActivityStatistics.objects.create(
+            activity=activity or self.activities[0],
+            supervision=supervision,
+            failure=Failure.objects.create(start_date=now - timedelta(minutes=5), end_date=now),
+            start_date=now - timedelta(minutes=30),
+            end_date=now,
+        )
+        self._create_comments(statistics)
+        return statistics
+
+    def _create_comments(self, statistics, count=2):
+        for number in range(count):
+            comment = Comment.objects.create(text=f"Comment {number}", activity_statistics=statistics)
+            CommentFiles.objects.create(comment=comment, file=f"files/comment_{comment.pk}.png")
+
+    def _create_supervisions(self, count=5):
+        for _ in range(count):
+            supervision = self._create_supervision()
+            for activity in self.activities:
+                self._create_statistics(supervision, activity)
+
+    def _create_supervision_statistics(self, count=5):
+        for _ in range(count):
+            self._create_statistics(self.supervision)
+
+    def test_supervision_list(self):
+        """Test that the supervision list does not query per supervision, analytics or comment."""
+        self.assertConstantRequestQueries(self.MAX_READ_QUERIES, reverse("supervision"), self._create_supervisions)
+
+    def test_supervision_list_failure_time_and_overtime(self):
+        """Test that the failure time and overtime count of a supervision are computed from its statistics."""
+        self.activities[0].planned_start_time, self.activities[0].planned_end_time = time(10, 0), time(10, 20)
+        self.activities[0].save()
+        # Planned across midnight: 50 minutes, longer than the 30 minutes of the statistics
+        self.activities[1].planned_start_time, self.activities[1].planned_end_time = time(23, 50), time(0, 40)
+        self.activities[1].save()
+        self._create_statistics(self.supervision, self.activities[1])
+        finished = self._create_supervision()
+
+        response = self.client.get(reverse("supervision"))
+
+        self.assertEqual(response.status_code, 200)
+        results = {supervision["id"]: supervision for supervision in response.data["results"]}
+        self.assertEqual(results[self.supervision.pk]["overtime_activities_count"], 1)
+        self.assertEqual(results[self.supervision.pk]["display_total_failure_delta"], "00:10:00")
+        self.assertEqual(results[finished.pk]["overtime_activities_count"], 0)
+        self.assertEqual(results[finished.pk]["display_total_failure_delta"], "--:--:--")
+
+    def test_supervision_export(self):
+        """Test that the supervision export does not query per row."""
+        self.assertConstantRequestQueries(
+            self.MAX_READ_QUERIES, reverse("supervision_list_export"), self._create_supervisions
+        )
+
+    def test_supervision_retrieve(self):
+        """Test that the supervision detail runs a fixed number of queries."""
+        self.assertConstantRequestQueries(
+            self.MAX_READ_QUERIES,
+            reverse("supervision_detail", args=[self.supervision.pk]),
+            self._create_supervision_statistics,
+        )
+
+    def test_last_active_supervision(self):
+        """Test that the last active supervision does not query per analytics or comment."""
+        self.assertConstantRequestQueries(
+            self.MAX_READ_QUERIES, reverse("user_last_active_supervision"), self._create_supervision_statistics
+        )
+
+    def test_analytics_list(self):
+        """Test that the supervision analytics list does not query per analytics or comment."""
+        self.assertConstantRequestQueries(
+            self.MAX_READ_QUERIES,
+            reverse("analytics", args=[self.supervision.pk]),
+            self._create_supervision_statistics,
+        )
+
+    def test_analytics_retrieve(self):
+        """Test that the analytics detail does not query per comment."""
+        self.assertConstantRequestQueries(
+            self.MAX_READ_QUERIES,
+            reverse("analytics_details", args=[self.statistics.pk]),
+            lambda: self._create_comments(self.statistics, count=5),
+        )
+
+    def test_supervision_write_endpoints(self):
+        """Test that the supervision write endpoints run a bounded number of queries."""
+        self._create_supervisions()
+        supervision = self._create_supervision()
+        self._create_statistics(supervision)
+        requests = (
+            (
+                "patch",
+                reverse("supervision_detail", args=[supervision.pk]),
+                {"worker": self.worker.pk, "organization": self.organization.pk, "admin_comment": "Checked"},
+                200,
+            ),
+            ("post", reverse("verify_supervision", args=[supervision.pk]), None, 200),
+            ("post", reverse("clear_verification_supervision", args=[supervision.pk]), None, 200),
+            ("post", reverse("finish_supervision", args=[self.supervision.pk]), None, 200),
+            ("post", reverse("supervision"), {"worker": self.worker.pk, "organization": self.organization.pk}, 201),
+            ("delete", reverse("supervision_detail", args=[supervision.pk]), None, 204),
+            ("post", reverse("delete_not_verified_supervisions"), None, 200),
+        )
+        for method, url, data, status_code in requests:
+            self.assertMaxRequestQueries(self.MAX_WRITE_QUERIES, method, url, status_code, data=data, format="json")
+
+    def test_analytics_write_endpoints(self):
+        """Test that the analytics, comment and failure write endpoints run a bounded number of queries."""
+        self._create_supervision_statistics()
+        statistics = ActivityStatistics.objects.create(activity=self.activities[1], supervision=self.supervision)
+        comment = Comment.objects.create(text="Comment", activity_statistics=statistics)
+        requests = (
+            ("patch", reverse("analytics_details", args=[statistics.pk]), {"admin_comment": "Checked"}, 200),
+            ("post", reverse("verify_analytics", args=[statistics.pk]), None, 200),
+            ("post", reverse("clear_verification_analytics", args=[statistics.pk]), None, 200),
+            (
+                "post",
+                reverse("analytics_comment", kwargs={"analytics_id": statistics.pk}),
+                {"text": "New comment"},
+                201,
+            ),
+            ("patch", reverse("analytics_comment", kwargs={"pk": comment.pk}), {"text": "Edited"}, 200),
+            (
+                "post",
+                reverse("activity_start_failure", args=[self.supervision.pk, self.activities[1].pk]),
+                None,
+                201,
+            ),
+            (
+                "post",
+                reverse("activity_finish_failure", args=[self.supervision.pk, self.activities[1].pk]),
+                None,
+                201,
+            ),
+            ("post", reverse("analytics_create", args=[self.supervision.pk]), {"activity": self.activities[2].pk}, 201),
+        )
+        for method, url, data, status_code in requests:
+            self.assertMaxRequestQueries(self.MAX_WRITE_QUERIES, method, url, status_code, data=data, format="json")
+
+
+class SupervisionDisplayTestCase(AnalyticsTestCase):
+    """Test cases for the overtime and failure time shown for supervisions."""
+
+    PLANNED_START_TIME = time(10, 0)
+    PLANNED_END_TIME = time(10, 20)
+    START = datetime(2024, 5, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+    def _statistics(self, minutes, failure_minutes=None, start_date=None):
+        start_date = start_date or self.START
+        failure = None
+        if failure_minutes is not None:
+            failure = Failure.objects.create(
+                start_date=start_date, end_date=start_date + timedelta(minutes=failure_minutes)
+            )
+        return ActivityStatistics.objects.create(
+            activity=self.activity,
+            supervision=self.supervision,
+            failure=failure,
+            start_date=start_date,
+            end_date=start_date + timedelta(minutes=minutes),
+        )
+
+    def test_is_overtime(self):
+        """Test that statistics are overtime only when longer than the planned duration of their activity."""
+        self.assertTrue(self._statistics(21).is_overtime)
+        self.assertFalse(self._statistics(20).is_overtime)
+        self.assertFalse(self._statistics(5).is_overtime)
+
+    def test_is_overtime_across_midnight(self):
+        """Test that a planned duration across midnight wraps to the next day."""
+        self.activity.planned_start_time, self.activity.planned_end_time = time(23, 50), time(0, 40)
+        self.activity.save()
+        late_evening = datetime(2024, 5, 1, 23, 50, tzinfo=dt_timezone.utc)
+
+        self.assertFalse(self._statistics(50, start_date=late_evening).is_overtime)
+        self.assertTrue(self._statistics(51, start_date=late_evening).is_overtime)
+
+    def test_is_overtime_without_data(self):
+        """Test that statistics without an end or an activity without a planned time are never overtime."""
+        statistics = self._statistics(30)
+        statistics.end_date = None
+        self.assertFalse(statistics.is_overtime)
+
+        self.activity.planned_end_time = None
+        self.activity.save()
+        self.assertFalse(self._statistics(30).is_overtime)
+
+    def test_overtime_activities_count(self):
+        """Test that the overtime activities of a supervision are counted."""
+        self.assertEqual(self.supervision.overtime_activities_count, 0)
+
+        self._statistics(30)
+        self._statistics(30)
+        self._statistics(10)
+
+        self.assertEqual(self.supervision.overtime_activities_count, 2)
+
+    def test_display_total_failure_delta(self):
+        """Test that the failure durations of a supervision are summed, and a placeholder is shown without one."""
+        self.assertEqual(self.supervision.display_total_failure_delta, "--:--:--")
+        self._statistics(30)
+        self.assertEqual(self.supervision.display_total_failure_delta, "--:--:--")
+
+        self._statistics(30, failure_minutes=5)
+        self._statistics(30, failure_minutes=70)
+        unfinished = self._statistics(30, failure_minutes=10)
+        Failure.objects.filter(pk=unfinished.failure_id).update(end_date=None)
+
+        self.assertEqual(self.supervision.display_total_failure_delta, "01:15:00")
+
+
+class GenerateDatasetTestCase(TestCase):
+    """Test cases for the generate_dataset management command."""
+
+    OPTIONS = {
+        "organizations": 2,
+        "classifiers_per_organization": 2,
+        "groups_per_layout": 2,
+        "activities_per_group": 3,
+        "workers": 6,
+        "supervisors": 2,
+        "supervisions": 25,
+        "comment_rate": 0.5,
+        "failure_rate": 0.2,
+        "batch_size": 10,
+        "jobs": 1,
+        "verbosity": 0,
+    }
+
+    def _generate(self, label, **options):
+        call_command("generate_dataset", label=label, stdout=StringIO(), **{**self.OPTIONS, **options})
+        return Supervision.objects.filter(worker__username__startswith=f"{label}_").order_by("id")
+
+    def _timeline(self, supervisions):
+        return [
+            (
+                supervision.start_date,
+                supervision.end_date,
+                supervision.validity,
+                supervision.verified,
+                [
+                    (statistics.activity.name, statistics.start_date, statistics.end_date, statistics.failure_id is None)
+                    for statistics in supervision.statistics.order_by("id")
+                ],
+            )
+            for supervision in supervisions
+        ]
+
+    def test_generates_configured_volume(self):
+        """Test that the dataset has the requested sizes and consistent relations."""
+        supervisions = self._generate("first")
+
+        self.assertEqual(supervisions.count(), 25)
+        self.assertEqual(Layout.objects.filter(name__startswith="first ").count(), 4)
+        self.assertEqual(Activity.objects.filter(activity_group__layout__name__startswith="first ").count(), 24)
+        self.assertEqual(User.objects.filter(username__startswith="first_worker_").count(), 6)
+
+        statistics = ActivityStatistics.objects.filter(supervision__in=supervisions)
+        self.assertTrue(5 * 25 <= statistics.count() <= 30 * 25)
+        self.assertFalse(
+            statistics.exclude(
+                activity__activity_group__layout__classifier=F("supervision__worker__classifier")
+            ).exists()
+        )
+        self.assertFalse(statistics.filter(end_date__lt=F("start_date")).exists())
+        self.assertTrue(Comment.objects.filter(activity_statistics__in=statistics, coordinates__isnull=False).exists())
+        self.assertEqual(
+            supervisions.filter(validity=False).count(),
+            supervisions.filter(statistics__failure__isnull=False).distinct().count(),
+        )
+
+    def test_same_seed_generates_same_data(self):
+        """Test that the dataset only depends on the seed and the sizes."""
+        first = self._timeline(self._generate("first"))
+        second = self._timeline(self._generate("second"))
+        other_seed = self._timeline(self._generate("third", seed=1))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_seed)
+
+    def test_existing_label_is_rejected(self):
+        """Test that a label can be used only once."""
+        self._generate("first")
+
+        with self.assertRaises(CommandError):
+            self._generate("first")
+
+
+class ActivityNormTestCase(AnalyticsTestCase):
+    """Test cases for the activity time norms."""
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.other_organization = Organization.objects.create(name="Other Org")
+
+    def _statistics(self, minutes, supervision=None, **kwargs):
+        start_date = timezone.now() - timedelta(hours=1)
+        return ActivityStatistics.objects.create(
+            activity=self.activity,
+            supervision=supervision or self.supervision,
+            start_date=start_date,
+            end_date=start_date + timedelta(minutes=minutes),
+            **kwargs,
+        )
+
+    def test_aggregate_statistics(self):
+        """Test that median, percentiles and the trimmed mean are computed per group."""
+        frame = pd.DataFrame({"activity_id": [1] * 10 + [2] * 3, "seconds": list(range(1, 10)) + [1000, 5, 6, 7]})
+
+        result = aggregate(frame, ["activity_id"]).set_index("activity_id")
+
+        self.assertEqual(result.loc[1, "sample_count"], 10)
+        self.assertAlmostEqual(result.loc[1, "median"], 5.5)
+        self.assertAlmostEqual(result.loc[1, "p10"], 1.9)
+        self.assertAlmostEqual(result.loc[1, "p90"], 108.1)
+        # The shortest and the longest durations are left out
+        self.assertAlmostEqual(result.loc[1, "trimmed_mean"], 5.5)
+        # Groups under ten durations are not trimmed
+        self.assertAlmostEqual(result.loc[2, "trimmed_mean"], 6)
+
+    def test_only_verified_statistics_without_failure_count(self):
+        """Test that unverified, failed and unfinished statistics are left out."""
+        for minutes in (10, 20, 30):
+            self._statistics(minutes, verified=True)
+        self._statistics(100)
+        self._statistics(100, verified=True, failure=Failure.objects.create())
+        ActivityStatistics.objects.create(activity=self.activity, supervision=self.supervision, verified=True)
+
+        recompute_norms()
+
+        norm = ActivityNorm.objects.get(activity=self.activity, scope=ActivityNorm.Scope.ACTIVITY)
+        self.assertEqual(norm.sample_count, 3)
+        self.assertEqual(norm.median, timedelta(minutes=20))
+
+    def test_norms_per_scope(self):
+        """Test that norms are stored per activity, per classifier and per organization."""
+        other_supervision = Supervision.objects.create(
+            worker=self.worker, organization=self.other_organization, user=self.user, verified=True
+        )
+        self._statistics(10, verified=True)
+        self._statistics(30, supervision=other_supervision)
+
+        self.assertEqual(recompute_norms(), 4)
+
+        norms = {
+            (norm.scope, norm.classifier_id, norm.organization_id): (norm.sample_count, norm.median)
+            for norm in ActivityNorm.objects.filter(activity=self.activity)
+        }
+        self.assertEqual(
+            norms,
+            {
+                (ActivityNorm.Scope.ACTIVITY, None, None): (2, timedelta(minutes=20)),
+                (ActivityNorm.Scope.CLASSIFIER, self.classifier.pk, None): (2, timedelta(minutes=20)),
+                (ActivityNorm.Scope.ORGANIZATION, None, self.organization.pk): (1, timedelta(minutes=10)),
+                (ActivityNorm.Scope.ORGANIZATION, None, self.other_organization.pk): (1, timedelta(minutes=30)),
+            },
+        )
+
+    def test_verification_marks_norms_stale(self):
+        """Test that verifying and clearing the verification of statistics marks the norms stale for a recompute."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        statistics = self._statistics(10)
+
+        response = client.post(reverse("verify_analytics", args=[statistics.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ActivityNorm.objects.exists())
+        self.assertEqual(list(StaleActivityNorm.objects.values_list("activity_id", flat=True)), [self.activity.pk])
+
+        self.assertEqual(recompute_stale_norms(), (1, 3))
+        self.assertEqual(ActivityNorm.objects.get(scope=ActivityNorm.Scope.ACTIVITY).sample_count, 1)
+        self.assertFalse(StaleActivityNorm.objects.exists())
+
+        client.post(reverse("clear_verification_analytics", args=[statistics.pk]))
+        call_command("compute_norms", "--stale", stdout=StringIO())
+        self.assertFalse(ActivityNorm.objects.exists())
+
+    def test_supervision_verification_marks_norms_stale(self):
+        """Test that verifying a supervision counts all its statistics once its norms are recomputed."""
+        self._statistics(10)
+        self._statistics(20)
+
+        self.supervision.verified = True
+        self.supervision.save()
+        recompute_stale_norms()
+
+        self.assertEqual(ActivityNorm.objects.get(scope=ActivityNorm.Scope.ACTIVITY).sample_count, 2)
+
+    def test_stale_mark_moved_during_recompute_is_kept(self):
+        """Test that an activity marked again while its norms are recomputed stays stale, and the limit is kept."""
+        other_activity = Activity.objects.create(name="Other activity", activity_group=self.activity.activity_group)
+        mark_stale([self.activity.pk])
+        mark_stale([other_activity.pk])
+
+        def mark_again(activity_ids):
+            mark_stale(activity_ids)
+            return 0
+
+        with mock.patch("analytics.norms.recompute_norms", side_effect=mark_again):
+            self.assertEqual(recompute_stale_norms(limit=1), (1, 0))
+
+        self.assertEqual(StaleActivityNorm.objects.count(), 2)
+        recompute_stale_norms(limit=1)
+        self.assertEqual(list(StaleActivityNorm.objects.values_list("activity_id", flat=True)), [self.activity.pk])
+
+    def test_verification_recomputes_norms_after_commit(self):
+        """Test that the norms of a verification are recomputed in the background once its transaction commits."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        statistics = self._statistics(10)
+
+        with mock.patch("analytics.norms._executor") as executor, mock.patch("analytics.norms.connections"):
+            executor.submit.side_effect = lambda function: function()
+            with self.captureOnCommitCallbacks(execute=True):
+                client.post(reverse("verify_analytics", args=[statistics.pk]))
+                self.assertFalse(ActivityNorm.objects.exists())
+
+        executor.submit.assert_called_once()
+        self.assertEqual(ActivityNorm.objects.get(scope=ActivityNorm.Scope.ACTIVITY).sample_count, 1)
+        self.assertFalse(StaleActivityNorm.objects.exists())
+
+    def test_queued_recompute_is_shared(self):
+        """Test that changes committed while a recompute is queued do not queue another one."""
+        with mock.patch("analytics.norms._executor") as executor, mock.patch("analytics.norms._queued", False):
+            queue_stale_recompute()
+            queue_stale_recompute()
+            executor.submit.assert_called_once()
+
+            with mock.patch("analytics.norms.recompute_stale_norms") as recompute, mock.patch("analytics.norms.connections"):
+                executor.submit.call_args.args[0]()
+            recompute.assert_called_once()
+            queue_stale_recompute()
+            self.assertEqual(executor.submit.call_count, 2)
+
+    def test_list_norms(self):
+        """Test that the norms endpoint lists and filters norms."""
+        self._statistics(10, verified=True)
+        recompute_norms()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("activity_norms"), {"scope": ActivityNorm.Scope.ACTIVITY})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_objects"], 1)
+        norm = response.data["results"][0]
+        self.assertEqual(norm["activity_name"], "Test activity")
+        self.assertEqual(norm["median"], "00:10:00")
+
+        response = client.get(reverse("activity_norms"), {"min_samples": 2})
+        self.assertEqual(response.data["total_objects"], 0)
+
+
+class OutlierDetectionTestCase(AnalyticsTestCase):
+    """Test cases for the outlier detection of activity durations."""
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.other_activity = Activity.objects.create(name="Other activity", activity_group=self.activity_group)
+        self.other_supervision = Supervision.objects.create(
+            worker=self.worker, organization=self.organization, user=self.user
+        )
+
+    def _statistics(self, seconds, activity=None, supervision=None, **kwargs):
+        start_date = timezone.now() - timedelta(days=1)
+        return ActivityStatistics.objects.create(
+            activity=activity or self.activity,
+            supervision=supervision or self.other_supervision,
+            start_date=start_date,
+            end_date=start_date + timedelta(seconds=seconds),
+            **kwargs,
+        )
+
+    def test_score_durations(self):
+        """Test that durations are scored by their distance from the median in MAD units."""
+        seconds = [100, 102, 98, 101, 99, 100, 103, 97, 100, 100, 1, 5000]
+        frame = pd.DataFrame({
+            "activity_id": [1] * len(seconds),
+            "failure_id": [None] * len(seconds),
+            "seconds": seconds,
+        })
+
+        result = score(frame)
+
+        self.assertEqual(list(result["outlier"]), [False] * 10 + [True, True])
+        self.assertLess(result["score"].iloc[10], 0)
+        self.assertGreater(result["score"].iloc[11], 0)
+        self.assertAlmostEqual(result["score"].iloc[6], round(3 / (1.5 * 1.4826), 2))
+
+    def test_small_activities_not_scored(self):
+        """Test that activities with few failure-free durations get no score."""
+        frame = pd.DataFrame({
+            "activity_id": [1] * 12,
+            "failure_id": [None] * 5 + [1] * 7,
+            "seconds": [100] * 11 + [5000],
+        })
+
+        result = score(frame)
+
+        self.assertTrue(result["score"].isna().all())
+        self.assertFalse(result["outlier"].any())
+
+    def test_detect_outliers(self):
+        """Test that outliers are flagged and unchanged scores are not written again."""
+        for seconds in (600, 610, 590, 605, 595, 600, 615, 585, 600, 600):
+            self._statistics(seconds)
+        forgotten = self._statistics(8 * 3600, supervision=self.supervision)
+        tap = self._statistics(1)
+        unfinished = ActivityStatistics.objects.create(
+            activity=self.activity, supervision=self.supervision, outlier_score=10, is_outlier=True
+        )
+        small = self._statistics(5000, activity=self.other_activity)
+
+        self.assertEqual(detect_outliers(), (12, 2))
+
+        flagged = set(ActivityStatistics.objects.filter(is_outlier=True).values_list("id", flat=True))
+        self.assertEqual(flagged, {forgotten.pk, tap.pk})
+        unfinished.refresh_from_db()
+        self.assertIsNone(unfinished.outlier_score)
+        small.refresh_from_db()
+        self.assertIsNone(small.outlier_score)
+
+        self.assertEqual(detect_outliers([self.activity.pk]), (0, 2))
+
+    def test_statistics_outlier_filter(self):
+        """Test that activity statistics can be filtered by outlier flags."""
+        outlier = self._statistics(1, supervision=self.supervision, outlier_score=-4.2, is_outlier=True)
+        self._statistics(600, supervision=self.supervision)
+
+        response = self.client.get(reverse("analytics", args=[self.supervision.pk]), {"is_outlier": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([statistics["id"] for statistics in response.data], [outlier.pk])
+        self.assertEqual(response.data[0]["outlier_score"], -4.2)
+
+    def test_supervision_outlier_filter(self):
+        """Test that supervisions can be filtered by having statistics flagged as outliers."""
+        self._statistics(1, supervision=self.supervision, outlier_score=-4.2, is_outlier=True)
+        self._statistics(600, supervision=self.supervision)
+        factory = APIRequestFactory()
+        outlier_filter = SupervisionOutlierFilter()
+
+        def filtered(params):
+            request = Request(factory.get("/api/supervisions/", params))
+            return list(outlier_filter.filter_queryset(request, Supervision.objects.order_by("id"), None))
+
+        self.assertEqual(filtered({"has_outliers": "true"}), [self.supervision])
+        self.assertEqual(filtered({"has_outliers": "0"}), [self.other_supervision])
+        self.assertEqual(filtered({}), [self.supervision, self.other_supervision])
+        self.assertEqual(filtered({"has_outliers": "maybe"}), [])
+
+
+class DailyActivityRollupTestCase(AnalyticsTestCase):
+    """Test cases for the daily activity rollups."""
+
+    PLANNED_START_TIME = time(8, 0)
+    PLANNED_END_TIME = time(8, 20)
+    # 01:00 on March 11 in the Europe/Moscow admin time zone
+    START = datetime(2026, 3, 10, 22, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.other_worker = User.objects.create_user(
+            username="other_worker", password="testpass", organization=self.organization, classifier=self.classifier
+        )
+
+    def _supervision(self, worker, verified=True):
+        return Supervision.objects.create(
+            worker=worker, organization=self.organization, user=self.user, verified=verified
+        )
+
+    def _statistics(self, supervision, offset_minutes, minutes, failure=None):
+        start_date = self.START + timedelta(minutes=offset_minutes)
+        return ActivityStatistics.objects.create(
+            activity=self.activity,
+            supervision=supervision,
+            start_date=start_date,
+            end_date=start_date + timedelta(minutes=minutes),
+            failure=failure,
+        )
+
+    def test_full_refresh(self):
+        """Test that verified statistics are summed up per worker, activity and local day."""
+        supervision = self._supervision(self.worker)
+        self._statistics(supervision, 0, 10)
+        self._statistics(supervision, 10, 30)
+        failure = Failure.objects.create(
+            start_date=self.START + timedelta(minutes=50), end_date=self.START + timedelta(minutes=70)
+        )
+        self._statistics(supervision, 40, 20, failure=failure)
+        self._statistics(self._supervision(self.worker, verified=False), 100, 10)
+
+        self.assertEqual(refresh_rollups(), (1, 1))
+
+        rollup = DailyActivityRollup.objects.get()
+        self.assertEqual(
+            (rollup.worker_id, rollup.organization_id, rollup.activity_id, rollup.day),
+            (self.worker.pk, self.organization.pk, self.activity.pk, date(2026, 3, 11)),
+        )
+        self.assertEqual(rollup.statistics_count, 3)
+        self.assertEqual(rollup.total_duration, timedelta(minutes=60))
+        self.assertEqual(rollup.min_duration, timedelta(minutes=10))
+        self.assertEqual(rollup.max_duration, timedelta(minutes=30))
+        self.assertEqual(rollup.failure_duration, timedelta(minutes=10))
+        self.assertEqual(rollup.overtime_count, 1)
+        self.assertTrue(RollupWatermark.objects.filter(name=ROLLUP_NAME).exists())
+
+    def test_incremental_refresh(self):
+        """Test that only the worker days of supervisions changed since the watermark are rebuilt."""
+        self._statistics(self._supervision(self.worker), 0, 10)
+        other_supervision = self._supervision(self.other_worker, verified=False)
+        self._statistics(other_supervision, 0, 20)
+        refresh_rollups()
+        RollupWatermark.objects.filter(name=ROLLUP_NAME).update(value=timezone.now())
+        # Left alone by the next run unless the worker's supervisions change
+        DailyActivityRollup.objects.filter(worker=self.worker).update(statistics_count=99)
+
+        other_supervision.verified = True
+        other_supervision.save()
+
+        self.assertEqual(refresh_rollups(), (1, 1))
+        self.assertEqual(DailyActivityRollup.objects.get(worker=self.worker).statistics_count, 99)
+        self.assertEqual(
+            DailyActivityRollup.objects.get(worker=self.other_worker).total_duration, timedelta(minutes=20)
+        )
+
+        self.assertEqual(refresh_rollups(full=True), (2, 2))
+        self.assertEqual(DailyActivityRollup.objects.get(worker=self.worker).statistics_count, 1)
+
+    def test_daily_activity_report(self):
+        """Test that the report lists rollups filtered by worker and day."""
+        self._statistics(self._supervision(self.worker), 0, 10)
+        self._statistics(self._supervision(self.other_worker), 24 * 60, 20)
+        refresh_rollups()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("daily_activity_report"), {"worker": self.worker.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_objects"], 1)
+        self.assertEqual(response.data["results"][0]["day"], "2026-03-11")
+        self.assertEqual(response.data["results"][0]["total_duration"], "00:10:00")
+
+        response = client.get(reverse("daily_activity_report"), {"start_date": "2026-03-12"})
+        self.assertEqual([row["worker"] for row in response.data["results"]], [self.other_worker.pk])
+        response = client.get(reverse("daily_activity_report"), {"start_date": "bad"})
+        self.assertEqual(response.data["total_objects"], 0)
+
+
+class ScheduleAdherenceTestCase(AnalyticsTestCase):
+    """Test cases for the schedule adherence of supervisions."""
+
+    PLANNED_START_TIME = time(8, 0)
+    PLANNED_END_TIME = time(8, 20)
+    # 08:15 in the Europe/Moscow admin time zone
+    START = datetime(2026, 3, 11, 5, 15, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        super().setUp()
+        self.supervision.start_date = self.START
+        self.supervision.end_date = self.START + timedelta(hours=8, minutes=15)
+        self.supervision.planned_start_time = time(8, 0)
+        self.supervision.planned_end_time = time(17, 0)
+        self.supervision.save()
+        for offset, minutes in ((0, 30), (40, 10), (50, 5)):
+            ActivityStatistics.objects.create(
+                activity=self.activity,
+                supervision=self.supervision,
+                start_date=self.START + timedelta(minutes=offset),
+                end_date=self.START + timedelta(minutes=offset + minutes),
+            )
+
+    def test_compute_report(self):
+        """Test that late start, early finish, overtime and idle gaps are computed against the plan."""
+        unplanned = Supervision.objects.create(worker=self.worker, organization=self.organization, user=self.user)
+
+        reports = compute_reports([self.supervision, unplanned])
+
+        report = reports[self.supervision.pk]
+        self.assertEqual(report["late_start"], timedelta(minutes=15))
+        self.assertEqual(report["early_finish"], timedelta(minutes=30))
+        self.assertEqual(report["statistics_count"], 3)
+        self.assertEqual((report["overtime_count"], report["overtime"]), (1, timedelta(minutes=10)))
+        self.assertEqual((report["idle_count"], report["idle"]), (1, timedelta(minutes=10)))
+        self.assertEqual(report["max_idle"], timedelta(minutes=10))
+
+        report = reports[unplanned.pk]
+        self.assertIsNone(report["late_start"])
+        self.assertIsNone(report["early_finish"])
+        self.assertEqual((report["statistics_count"], report["idle"], report["max_idle"]), (0, timedelta(0), None))
+
+    def test_verified_reports_are_cached(self):
+        """Test that reports of verified supervisions are cached until one of their statistics changes."""
+        self.supervision.verified = True
+        self.supervision.save()
+        get_adherence_reports([self.supervision])
+
+        with self.assertNumQueries(1):
+            report, = get_adherence_reports([self.supervision])
+        self.assertEqual(report["overtime"], timedelta(minutes=10))
+
+        statistics = self.supervision.statistics.order_by("start_date").first()
+        statistics.end_date = statistics.start_date + timedelta(minutes=25)
+        statistics.save()
+
+        report, = get_adherence_reports([self.supervision])
+        self.assertEqual(report["overtime"], timedelta(minutes=5))
+
+    def test_adherence_endpoint(self):
+        """Test that the endpoint reports the filtered supervisions."""
+        Supervision.objects.create(
+            worker=User.objects.create_user(username="other_worker", password="testpass"),
+            organization=self.organization,
+            user=self.user,
+        )
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("supervision_adherence"), {"worker": self.worker.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_objects"], 1)
+        report = response.data["results"][0]
+        self.assertEqual(report["supervision"], self.supervision.pk)
+        self.assertEqual(report["late_start"], "00:15:00")
+        self.assertEqual(report["idle_count"], 1)
+
+
+class SyncTestCase(AnalyticsTestCase):
+    """Test cases for the sync feed of the mobile clients."""
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.activities = [
+            self.activity,
+            Activity.objects.create(name="Other activity", activity_group=self.activity_group),
+        ]
+        self.statistics = ActivityStatistics.objects.create(
+            activity=self.activity, supervision=self.supervision, start_date=timezone.now()
+        )
+        self.other_supervision = Supervision.objects.create(
+            worker=self.worker,
+            organization=self.organization,
+            user=User.objects.create_user(username="other", password="testpass"),
+        )
+        self.cursor = timezone.now()
+
+    def test_full_sync_without_cursor(self):
+        """Test that a sync without a cursor returns all records of the user."""
+        changes = get_changes(self.user)
+
+        self.assertFalse(changes["reset"])
+        self.assertEqual(list(changes["supervisions"]), [self.supervision])
+        self.assertEqual(list(changes["statistics"]), [self.statistics])
+        self.assertEqual(list(changes["activities"]), self.activities)
+        self.assertIsNotNone(changes["app_settings"])
+
+    def test_sync_returns_changes_since_cursor(self):
+        """Test that only records saved after the cursor are returned, with the whole tree of a changed layout."""
+        self.assertFalse(get_changes(self.user, self.cursor)["supervisions"].exists())
+
+        failure = Failure.objects.create(start_date=timezone.now())
+        self.statistics.failure = failure
+        self.statistics.save()
+        comment = Comment.objects.create(text="Note", activity_statistics=self.statistics)
+        self.activities[1].up()
+        self.other_supervision.save()
+
+        changes = get_changes(self.user, self.cursor)
+
+        self.assertFalse(changes["supervisions"].exists())
+        self.assertEqual(list(changes["statistics"]), [self.statistics])
+        self.assertEqual(list(changes["failures"]), [failure])
+        self.assertEqual(list(changes["comments"]), [comment])
+        self.assertEqual(list(changes["layouts"]), [self.layout])
+        self.assertEqual(len(changes["activities"]), 2)
+        self.assertIsNone(changes["app_settings"])
+
+    def test_deletes_are_returned_without_cascades(self):
+        """Test that a delete leaves a tombstone of the deleted record only, not of the records it cascaded to."""
+        supervision_id, statistics_id = self.supervision.pk, self.statistics.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.supervision.delete()
+            Activity.objects.filter(pk__in=[activity.pk for activity in self.activities]).delete()
+
+        self.assertEqual(Tombstone.objects.count(), 3)
+
+        deleted = get_changes(self.user, self.cursor)["deleted"]
+
+        self.assertEqual(deleted["supervisions"], [supervision_id])
+        self.assertCountEqual(deleted["activities"], [activity.pk for activity in self.activities])
+        self.assertNotIn(statistics_id, deleted["statistics"])
+        self.assertEqual(deleted["layouts"], [])
+
+    def test_cascades_from_records_not_synced_are_returned(self):
+        """Test that deleting a worker or an organization leaves tombstones of the synced records it cascaded to."""
+        supervision_ids = [self.supervision.pk, self.other_supervision.pk]
+        layout_id, activity_ids = self.layout.pk, [activity.pk for activity in self.activities]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.supervision.worker.delete()
+            self.layout.organization.delete()
+
+        deleted = get_changes(self.user, self.cursor)["deleted"]
+
+        self.assertCountEqual(deleted["supervisions"], supervision_ids)
+        self.assertEqual(deleted["statistics"], [self.statistics.pk])
+        self.assertEqual(deleted["layouts"], [layout_id])
+        self.assertCountEqual(deleted["activities"], activity_ids)
+
+    def test_expired_cursor_resets(self):
+        """Test that a cursor older than the kept tombstones gets a full sync and old tombstones are purged."""
+        with self.settings(SYNC={"TOMBSTONE_DAYS": 1, "CURSOR_LAG_SECONDS": 60}):
+            changes = get_changes(self.user, self.cursor - timedelta(days=2))
+            Tombstone.objects.create(model="analytics.supervision", object_id=1, deleted_date=self.cursor - timedelta(days=2))
+            Tombstone.objects.create(model="analytics.supervision", object_id=2)
+
+            self.assertEqual(purge_tombstones(), 1)
+
+        self.assertTrue(changes["reset"])
+        self.assertEqual(list(changes["supervisions"]), [self.supervision])
+
+    def test_sync_endpoint(self):
+        """Test that the endpoint returns the changes and a cursor for the next sync."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(reverse("sync"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["supervisions"]], [self.supervision.pk])
+        self.assertEqual(response.data["deleted"]["supervisions"], [])
+
+        response = client.get(reverse("sync"), {"cursor": response.data["cursor"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data["reset"])
+        self.assertEqual(client.get(reverse("sync"), {"cursor": "yesterday"}).status_code, 400)
+
+
+class LiveFeedTestCase(AnalyticsTestCase):
+    """Test cases for the live supervision feed."""
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.channel = live.organization_channel(self.organization.pk)
+
+    def _receive(self, loop, subscription) -> list[dict]:
+        events = []
+        while (event := loop.run_until_complete(subscription.get(0.05))) is not None:
+            events.append(event)
+        return events
+
+    def test_services_publish_events_after_commit(self):
+        """Test that transitions, failures and the finish are published to the organization once committed."""
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        subscription = loop.run_until_complete(get_event_bus().subscribe(self.channel))
+        other = loop.run_until_complete(get_event_bus().subscribe(live.organization_channel(self.organization.pk + 1)))
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(
+            reverse("analytics_create", args=[self.supervision.pk]), {"activity": self.activity.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self._receive(loop, subscription), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(reverse("activity_start_failure", args=[self.supervision.pk, self.activity.pk]))
+            client.post(reverse("activity_finish_failure", args=[self.supervision.pk, self.activity.pk]))
+            client.post(reverse("finish_supervision", args=[self.supervision.pk]))
+
+        events = self._receive(loop, subscription)
+        self.assertEqual(
+            [event["type"] for event in events],
+            [live.FAILURE_STARTED, live.FAILURE_FINISHED, live.SUPERVISION_FINISHED],
+        )
+        self.assertEqual(events[0]["supervision"], self.supervision.pk)
+        self.assertEqual(events[0]["activity"], self.activity.pk)
+        self.assertEqual(self._receive(loop, other), [])
+        loop.run_until_complete(subscription.close())
+        loop.run_until_complete(other.close())
+
+    async def test_stream_endpoint(self):
+        """Test that the endpoint streams the events of the organization as Server-Sent Events."""
+        token = str(AccessToken.for_user(self.user))
+        url = reverse("live_feed")
+
+        response = await self.async_client.get(url, {"access_token": token}, headers={"accept": "text/event-stream"})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(url, {"organization": self.organization.pk})
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(
+            url, {"organization": self.organization.pk, "access_token": token}, headers={"accept": "text/event-stream"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+        get_event_bus().publish(self.channel, {"type": live.ACTIVITY_STARTED, "supervision": self.supervision.pk})
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        self.assertTrue(chunk.startswith(b"event: activity_started\ndata: {"))
+        await stream.aclose()
+
+    def test_stream_endpoint_requires_asgi(self):
+        """Test that the stream is refused when the request is not served by the ASGI server."""
+        token = str(AccessToken.for_user(self.user))
+
+        response = self.client.get(reverse("live_feed"), {"organization": self.organization.pk, "access_token": token})
+
+        self.assertEqual(response.status_code, 501)
+        self.assertEqual(response.json()["code"], "live_feed_requires_asgi")
+
+
+class CommentMapTestCase(AnalyticsTestCase):
+    """Test cases for the spatial comment queries."""
+
+    def setUp(self):
+        """Set up test data."""
+        super().setUp()
+        self.other_supervision = Supervision.objects.create(
+            worker=self.worker, organization=self.organization, user=self.user
+        )
+        statistics = ActivityStatistics.objects.create(
+            supervision=self.supervision, activity=self.activity, start_date=timezone.now()
+        )
+        other_statistics = ActivityStatistics.objects.create(
+            supervision=self.other_supervision, activity=self.activity, start_date=timezone.now()
+        )
+        # Two comments about 110 m apart in Minsk, one in Moscow
+        self.near = Comment.objects.create(
+            text="Near", activity_statistics=statistics, coordinates=Point(27.5600, 53.9000, srid=4326)
+        )
+        self.close = Comment.objects.create(
+            text="Close", activity_statistics=statistics, coordinates=Point(27.5600, 53.9010, srid=4326)
+        )
+        self.far = Comment.objects.create(
+            text="Far", activity_statistics=other_statistics, coordinates=Point(37.6200, 55.7500, srid=4326)
+        )
+        Comment.objects.create(text="Without coordinates", activity_statistics=other_statistics)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_parse_query_params(self):
+        """Test that points and bounding boxes are parsed and out of range values rejected."""
+        point = parse_point_query_param("27.56,53.9")
+        self.assertEqual((point.x, point.y, point.srid), (27.56, 53.9, 4326))
+        for value in ("53.9", "a,b", "181,0", "0,91", "nan,0"):
+            self.assertIsNone(parse_point_query_param(value))
+
+        polygon = parse_bbox_query_param("27,53,28,54")
+        self.assertEqual(polygon.extent, (27, 53, 28, 54))
+        self.assertEqual(polygon.srid, 4326)
+        for value in ("28,53,27,54", "27,53,28", "27,53,28,95"):
+            self.assertIsNone(parse_bbox_query_param(value))
+
+    def test_grid_and_circle_bbox(self):
+        """Test that the grid halves with every zoom level and the circle box widens away from the equator."""
+        self.assertEqual(geo.grid_size(0), 45)
+        self.assertEqual(geo.grid_size(1), geo.grid_size(0) / 2)
+
+        min_x, min_y, max_x, max_y = geo.circle_bbox(Point(0, 60, srid=4326), geo.METERS_PER_DEGREE).extent
+        self.assertAlmostEqual(max_y - min_y, 2)
+        self.assertAlmostEqual(max_x - min_x, 4)
+
+    def test_invalid_params(self):
+        """Test that invalid locations return no rows or a validation error."""
+        response = self.client.get(reverse("supervision"), {"bbox": "28,53,27,54"})
+        self.assertEqual(response.data["total_objects"], 0)
+        response = self.client.get(reverse("comment_map"), {"point": "27.56,53.9", "radius": geo.MAX_RADIUS + 1})
+        self.assertEqual(response.data["total_objects"], 0)
+
+        response = self.client.get(reverse("comment_nearest"), {"point": "53.9"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse("comment_clusters"), {"bbox": "27,53,28,54", "zoom": geo.MAX_ZOOM + 1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bbox_and_radius(self):
+        """Test that comments, supervisions and activity statistics are filtered by comment location."""
+        response = self.client.get(reverse("comment_map"), {"bbox": "27,53,28,54"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.close.pk, self.near.pk])
+        self.assertEqual(response.data["results"][0]["supervision"], self.supervision.pk)
+
+        response = self.client.get(reverse("comment_map"), {"point": "27.56,53.9", "radius": 50})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.near.pk])
+
+        request = Request(APIRequestFactory().get("/api/supervisions/", {"point": "37.62,55.75", "radius": 1000}))
+        supervisions = CommentLocationFilter().filter_queryset(request, Supervision.objects.all(), SupervisionViewSet())
+        self.assertEqual(list(supervisions), [self.other_supervision])
+        response = self.client.get(reverse("analytics", args=[self.supervision.pk]), {"bbox": "27,53,28,54"})
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get(reverse("analytics", args=[self.supervision.pk]), {"bbox": "37,55,38,56"})
+        self.assertEqual(len(response.data), 0)
+
+    def test_nearest(self):
+        """Test that the nearest comments come closest first with their distance, within the max distance."""
+        response = self.client.get(reverse("comment_nearest"), {"point": "27.56,53.9005", "limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row["id"] for row in response.data}, {self.near.pk, self.close.pk})
+        self.assertAlmostEqual(response.data[0]["distance"], 55, delta=1)
+
+        response = self.client.get(
+            reverse("comment_nearest"), {"point": "37.62,55.75", "max_distance": 1000, "limit": 5}
+        )
+        self.assertEqual([row["id"] for row in response.data], [self.far.pk])
+
+    def test_clusters(self):
+        """Test that nearby comments are clustered at low zoom levels and kept apart at high ones."""
+        response = self.client.get(reverse("comment_clusters"), {"bbox": "20,50,40,60", "zoom": 5})
+        self.assertEqual(response.status_code, 200)
+        clusters = sorted(response.data, key=lambda cluster: cluster["count"])
+        self.assertEqual([cluster["count"] for cluster in clusters], [1, 2])
+        self.assertEqual(clusters[0]["comment"], self.far.pk)
+        self.assertIsNone(clusters[1]["comment"])
+
+        response = self.client.get(
+            reverse("comment_clusters"), {"bbox": "27,53,28,54", "zoom": 18, "organization": self.organization.pk}
+        )
+        self.assertEqual(sorted(cluster["comment"] for cluster in response.data), [self.near.pk, self.close.pk])
+
+    def test_geojson_export(self):
+        """Test that comments with coordinates stream as a GeoJSON FeatureCollection in chunks."""
+        with mock.patch.object(geo, "EXPORT_CHUNK_SIZE", 2):
+            response = self.client.get(reverse("comment_export"), HTTP_ACCEPT="application/geo+json")
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.is_async)
+            self.assertEqual(response["Content-Type"], "application/geo+json")
+            collection = json.loads(b"".join(response.streaming_content))
+
+        self.assertEqual(collection["type"], "FeatureCollection")
+        features = collection["features"]
+        self.assertEqual([feature["properties"]["id"] for feature in features], [self.near.pk, self.close.pk, self.far.pk])
+        self.assertEqual(features[0]["type"], "Feature")
+        self.assertEqual(features[0]["geometry"], {"type": "Point", "coordinates": [27.56, 53.9]})
+        self.assertEqual(features[2]["properties"]["supervision"], self.other_supervision.pk)
+        self.assertEqual(features[2]["properties"]["organization"], self.organization.pk)
+
+        response = self.client.get(reverse("comment_export"), {"supervision": self.supervision.pk, "start_date": "x"})
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), {"type": "FeatureCollection", "features": []})
+
+    async def test_geojson_export_under_asgi(self):
+        """Test that the export is streamed by an async iterator under ASGI."""
+        headers = {"accept": "application/geo+json", "authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+        with mock.patch.object(geo, "EXPORT_CHUNK_SIZE", 2):
+            response = await self.async_client.get(reverse("comment_export"), headers=headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.is_async)
+            collection = json.loads(b"".join([chunk async for chunk in response.streaming_content]))
+
+        features = collection["features"]
+        self.assertEqual([feature["properties"]["id"] for feature in features], [self.near.pk, self.close.pk, self.far.pk])
@@ -3,6 +3,46 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    path(
+        "norms/",
+        views.ActivityNormViewSet.as_view({"get": "list"}),
+        name="activity_norms",
+    ),
+    path(
+        "reports/daily-activity/",
+        views.DailyActivityReportViewSet.as_view({"get": "list"}),
+        name="daily_activity_report",
+    ),
+    path(
+        "comments/",
+        views.CommentMapViewSet.as_view({"get": "list"}),
+        name="comment_map",
+    ),
+    path(
+        "comments/export/",
+        views.CommentExportViewSet.as_view({"get": "export"}),
+        name="comment_export",
+    ),
+    path(
+        "comments/nearest/",
+        views.CommentSearchViewSet.as_view({"get": "nearest"}),
+        name="comment_nearest",
+    ),
+    path(
+        "comments/clusters/",
+        views.CommentSearchViewSet.as_view({"get": "clusters"}),
+        name="comment_clusters",
+    ),
+    path(
+        "live/",
+        views.LiveFeedViewSet.as_view({"get": "stream"}),
+        name="live_feed",
+    ),
+    path(
+        "sync/",
+        views.SyncViewSet.as_view({"get": "list"}),
+        name="sync",
+    ),
     path(
         "",
         views.SupervisionViewSet.as_view({"post": "create", "get": "list"}),
@@ -18,6 +58,11 @@ urlpatterns = [
         views.SupervisionViewSet.as_view({"post": "delete_not_verified", }),
         name="delete_not_verified_supervisions",
     ),
+    path(
+        "adherence/",
+        views.SupervisionViewSet.as_view({"get": "adherence"}),
+        name="supervision_adherence",
+    ),
     path(
         "last-active-supervision/",
         views.SupervisionViewSet.as_view({"get": "last_active_supervision", }),
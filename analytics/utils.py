@@ -1,8 +1,10 @@
+import math
 from datetime import date
 from typing import Optional
 from urllib.parse import quote
 
 from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
 
 
 def get_yandex_map_link(latitude: float, longitude: float, zoom=15) -> str:
@@ -24,4 +26,45 @@ def parse_date_query_param(value: str) -> Optional[date]:
 
 def dates_are_same_day(date1: date, date2: date) -> bool:
     """Check if two dates represent the same day."""
-    return date1 == date2
\ No newline at end of file
+    return date1 == date2
+
+
+def _parse_floats(value: str, count: int) -> Optional[list[float]]:
+    try:
+        numbers = [float(part) for part in value.split(",")]
+    except (ValueError, AttributeError):
+        return None
+
+    if len(numbers) != count or not all(math.isfinite(number) for number in numbers):
+        return None
+    return numbers
+
+
+def parse_point_query_param(value: str) -> Optional[Point]:
+    """Parse a "longitude,latitude" string from query parameters to a WGS 84 point."""
+    numbers = _parse_floats(value, 2)
+    if numbers is None:
+        return None
+
+    longitude, latitude = numbers
+    if not (-180 <= longitude <= 180 and -90 <= latitude <= 90):
+        return None
+    return Point(longitude, latitude, srid=4326)
+
+
+def parse_bbox_query_param(value: str) -> Optional[Polygon]:
+    """Parse a "min_longitude,min_latitude,max_longitude,max_latitude" string to a WGS 84 polygon."""
+    numbers = _parse_floats(value, 4)
+    if numbers is None:
+        return None
+
+    min_longitude, min_latitude, max_longitude, max_latitude = numbers
+    if not (-180 <= min_longitude < max_longitude <= 180 and -90 <= min_latitude < max_latitude <= 90):
+        return None
+    return bbox_polygon(min_longitude, min_latitude, max_longitude, max_latitude)
+
+
+def bbox_polygon(min_longitude: float, min_latitude: float, max_longitude: float, max_latitude: float) -> Polygon:
+    polygon = Polygon.from_bbox((min_longitude, min_latitude, max_longitude, max_latitude))
+    polygon.srid = 4326
+    return polygon
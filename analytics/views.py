@@ -1,10 +1,12 @@
-import pandas as pd
+import time
 from io import BytesIO
 
 import pytz
-from django.db.models import Value, ExpressionWrapper, F, fields, Prefetch, Sum, DurationField, CharField, Case, When, \
-    Func, Count, OuterRef, Subquery, IntegerField
-from django.db.models.functions import Concat, Coalesce, Extract
+from django.conf import settings
+from django.db.models import Value, ExpressionWrapper, F, fields, Prefetch
+from django.db.models.functions import Concat
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, filters
@@ -16,16 +18,29 @@ from rest_framework.mixins import (
     RetrieveModelMixin, UpdateModelMixin, DestroyModelMixin,
 )
 from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
 from analytics import serializers, exceptions
+from analytics import geo
+from analytics.adherence import get_adherence_reports
 from analytics.exceptions import AnalyticsDoesNotExistException
-from analytics.filters import SupervisionDateFilter
+from analytics.live import organization_channel, stream_events
+from analytics.sync import get_changes
+from analytics.filters import (
+    CommentDateFilter,
+    CommentLocationFilter,
+    DailyRollupDateFilter,
+    SupervisionDateFilter,
+    SupervisionOutlierFilter,
+)
 from analytics.models import (
+    ActivityNorm,
     ActivityStatistics,
+    DailyActivityRollup,
     Supervision,
     Comment,
 )
@@ -35,18 +50,31 @@ from analytics.services import (
     ActivityStatisticsService,
     CommentService,
 )
-from core import paginators
+from core import metrics, paginators
+from core.event_bus import get_event_bus
 from core.permissions import CustomDjangoModelPermissions
+from core.renderers import EventStreamRenderer, GeoJSONRenderer
 from core.utils import localize_datetime, timedelta_to_str, success_response
+from core.view_mixins import AsyncDispatchMixin, AtomicWritesMixin, ReplicaReadMixin
+from users.authentication import CachedJWTAuthentication, QueryParamJWTAuthentication
 from users.signals import ConstantGroups
 from django.utils.translation import gettext_lazy as _
 
 
-class AnalyticsListView(ListModelMixin, GenericViewSet):
+class AnalyticsListView(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.AnalyticsDetailsSerializer
-    queryset = ActivityStatistics.objects.all()
+    queryset = ActivityStatistics.objects.select_related(
+        "activity",
+        "failure",
+        "supervision__organization",
+        "supervision__worker__classifier",
+        "supervision__user__classifier",
+    ).prefetch_related("comments__files")
+    filter_backends = (DjangoFilterBackend, CommentLocationFilter)
+    filterset_fields = ("is_outlier", "verified")
     ordering = ["start_date"]
+    comment_lookup = "activity_statistics"
 
     def get_queryset(self):
         supervision_id = self.kwargs.get("pk")
@@ -54,7 +82,7 @@ class AnalyticsListView(ListModelMixin, GenericViewSet):
         return self.queryset.filter(supervision_id=supervision_id)
 
 
-class AnalyticsCreateViewSet(CreateModelMixin, GenericViewSet):
+class AnalyticsCreateViewSet(AtomicWritesMixin, CreateModelMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.AnalyticsCreateSerializer
     queryset = ActivityStatistics.objects.all()
@@ -64,8 +92,8 @@ class AnalyticsCreateViewSet(CreateModelMixin, GenericViewSet):
         serializer.is_valid(raise_exception=True)
 
         supervision_id = self.kwargs.get("pk")
-        get_object_or_404(Supervision, id=supervision_id)
-        serializer.validated_data["supervision_id"] = supervision_id
+        # The instance is kept on the new statistics for the live event, see analytics.live
+        serializer.validated_data["supervision"] = get_object_or_404(Supervision, id=supervision_id)
 
         previous_activity_statistic = ActivityStatistics.objects.filter(
             supervision_id=supervision_id, end_date__isnull=True
@@ -116,6 +144,30 @@ class AnalyticsCreateViewSet(CreateModelMixin, GenericViewSet):
                 location=OpenApiParameter.QUERY,
                 description="Filter by verification status"
             ),
+            OpenApiParameter(
+                name="has_outliers",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Filter by whether any activity statistics of the supervision are flagged as outliers"
+            ),
+            OpenApiParameter(
+                name="bbox",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Only supervisions with a comment in the bounding box min_longitude,min_latitude,max_longitude,max_latitude"
+            ),
+            OpenApiParameter(
+                name="point",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Only supervisions with a comment within radius meters of the point longitude,latitude"
+            ),
+            OpenApiParameter(
+                name="radius",
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description=f"Radius of point in meters, at most {geo.MAX_RADIUS}"
+            ),
             OpenApiParameter(
                 name="ordering",
                 type=OpenApiTypes.STR,
@@ -197,7 +249,15 @@ class AnalyticsCreateViewSet(CreateModelMixin, GenericViewSet):
     )
 )
 class SupervisionViewSet(
-    RetrieveModelMixin, CreateModelMixin, ListModelMixin, UpdateModelMixin, DestroyModelMixin, GenericViewSet
+    AsyncDispatchMixin,
+    AtomicWritesMixin,
+    ReplicaReadMixin,
+    RetrieveModelMixin,
+    CreateModelMixin,
+    ListModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    GenericViewSet,
 ):
     """
     ViewSet for managing supervision sessions.
@@ -207,7 +267,14 @@ class SupervisionViewSet(
     serializer_class = serializers.SupervisionSerializer
     queryset = Supervision.objects.all()
     pagination_class = paginators.CustomPagination
-    filter_backends = (filters.SearchFilter, DjangoFilterBackend, SupervisionDateFilter, filters.OrderingFilter)
+    filter_backends = (
+        filters.SearchFilter,
+        DjangoFilterBackend,
+        SupervisionDateFilter,
+        SupervisionOutlierFilter,
+        CommentLocationFilter,
+        filters.OrderingFilter,
+    )
     filterset_fields = ('id', 'organization', 'worker', 'user', 'verified')
     search_fields = (
         'id',
@@ -219,6 +286,10 @@ class SupervisionViewSet(
     )
     ordering_fields = ('id', 'organization_id', 'worker_id', 'user_id', 'start_date', 'end_date', 'delta', 'verified')
     ordering = ('-id',)
+    comment_lookup = "activity_statistics__supervision"
+
+    # last_active_supervision shows the user's running supervision and stays on the primary
+    replica_actions = ("list", "retrieve", "export", "adherence")
 
     EXPORT_FILE_NAME = 'Mera_Export_Supervision'
 
@@ -231,58 +302,34 @@ class SupervisionViewSet(
             return serializers.SupervisionCreateSerializer
         elif self.action in ("partial_update", "update"):
             return serializers.SupervisionUpdateSerializer
+        elif self.action == "adherence":
+            return serializers.ScheduleAdherenceSerializer
 
     def get_queryset(self):
         qs = self.queryset
 
         if self.action in ("list", "export", "last_active_supervision"):
-            activity_count_subquery = ActivityStatistics.objects.filter(
-                supervision=OuterRef('pk')
-            ).annotate(
-                actual_duration=Extract(F('end_date') - F('start_date'), 'epoch'),
-                planned_duration=Extract(
-                    F('activity__planned_end_time') - F('activity__planned_start_time'),
-                    'epoch'
-                )
-            ).filter(
-                actual_duration__gt=F('planned_duration'),
-                end_date__isnull=False,
-                start_date__isnull=False,
-                activity__planned_end_time__isnull=False,
-                activity__planned_start_time__isnull=False
-            ).values('supervision').annotate(
-                count=Count('id')
-            ).values('count')
-
-            qs = (self.queryset.select_related("organization", "worker", "user").prefetch_related(
+            # Failure time and overtime are computed by the model from the prefetched statistics
+            qs = self.queryset.select_related(
+                "organization", "worker__classifier", "user__classifier"
+            ).prefetch_related(
                 Prefetch(
                     "statistics",
-                    queryset=ActivityStatistics.objects.select_related("failure", "activity").prefetch_related("comments")
-                ),
-            ).annotate(
-                total_failure_delta=Sum(
-                    F('statistics__failure__end_date') - F('statistics__failure__start_date'),
-                    output_field=DurationField()
-                )
-            ).annotate(
-                display_total_failure_delta=Case(
-                    When(total_failure_delta__isnull=True, then=Value('--:--:--')),
-                    default=Func(
-                        F('total_failure_delta'),
-                        function='TO_CHAR',
-                        template="%(function)s(%(expressions)s, 'HH24:MI:SS')"
-                    ),
-                    output_field=CharField()
+                    queryset=ActivityStatistics.objects.select_related(
+                        "failure", "activity"
+                    ).prefetch_related("comments__files")
                 ),
-                overtime_activities_count=Coalesce(
-                    Subquery(activity_count_subquery),
-                    0,
-                    output_field=IntegerField()
-                )
-            ))
+            )
+
+        elif self.action == "retrieve":
+            qs = self.queryset.select_related("organization", "worker__classifier", "user__classifier")
 
         return qs
 
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aget_serializer_data(instance))
+
     def create(self, request, *args, **kwargs):
         last_supervision = Supervision.objects.filter(user=request.user).order_by("-id").first()
         if last_supervision and last_supervision.end_date is None:
@@ -388,6 +435,12 @@ class SupervisionViewSet(
                 location=OpenApiParameter.QUERY,
                 description="Filter by verification status"
             ),
+            OpenApiParameter(
+                name="has_outliers",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Filter by whether any activity statistics of the supervision are flagged as outliers"
+            ),
             OpenApiParameter(
                 name="ordering",
                 type=OpenApiTypes.STR,
@@ -422,13 +475,71 @@ class SupervisionViewSet(
         }
         return Response(data=data, status=status.HTTP_200_OK)
 
-    def last_active_supervision(self, request):
-        supervision = SupervisionService().get_user_last_active_supervision(request.user)
+    async def last_active_supervision(self, request):
+        supervision = await SupervisionService().aget_user_last_active_supervision(
+            request.user, queryset=self.get_queryset()
+        )
         if supervision:
-            serializer = self.get_serializer(supervision)
-            return Response(data=serializer.data, status=status.HTTP_200_OK)
+            data = await self.aget_serializer_data(supervision)
+            return Response(data=data, status=status.HTTP_200_OK)
         return Response({"details": _("No active supervision.")}, status=status.HTTP_200_OK)
 
+    @extend_schema(
+        summary="Schedule adherence of supervisions",
+        description=(
+            "Compare supervisions with their planned times: late start and early finish against the planned times "
+            "of the supervision, overtime of activities against their planned duration and idle gaps between "
+            "consecutive activities. Supports the filtering, searching and ordering of the supervision list."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                name="search",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Search supervisions by ID, organization name, worker name, or user name"
+            ),
+            OpenApiParameter(
+                name="organization",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Filter by organization ID"
+            ),
+            OpenApiParameter(
+                name="worker",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Filter by worker ID"
+            ),
+            OpenApiParameter(
+                name="verified",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                description="Filter by verification status"
+            ),
+            OpenApiParameter(
+                name="start_date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description="Filter by start date (YYYY-MM-DD)"
+            ),
+            OpenApiParameter(
+                name="end_date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description="Filter by end date (YYYY-MM-DD)"
+            ),
+        ],
+        responses={
+            200: serializers.ScheduleAdherenceSerializer(many=True),
+            403: {"description": "Permission denied"}
+        }
+    )
+    def adherence(self, request):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        serializer = self.get_serializer(get_adherence_reports(page), many=True)
+        return self.get_paginated_response(serializer.data)
+
     @extend_schema(
         summary="Export supervisions",
         description="Export verified supervisions to Excel format with detailed analytics data.",
@@ -456,6 +567,7 @@ class SupervisionViewSet(
     )
     @action(detail=False, methods=['get'])
     def export(self, request):
+        started = time.perf_counter()
         tz_param = request.query_params.get('timezone', 'Europe/Moscow')
         target_tz = pytz.timezone(tz_param)
 
@@ -503,6 +615,9 @@ class SupervisionViewSet(
             '-statistics__id',
         )
 
+        # pandas (with numpy) and openpyxl are imported on first export only, see core.startup
+        import pandas as pd
+
         df = pd.DataFrame(data)
 
         for field_name in df.columns:
@@ -556,10 +671,12 @@ class SupervisionViewSet(
         response['Content-Disposition'] = f'attachment; filename={file_name}.xlsx'
         response.content = output.getvalue()
 
+        metrics.EXPORT_ROWS.labels(export="supervisions").observe(len(df))
+        metrics.EXPORT_DURATION.labels(export="supervisions").observe(time.perf_counter() - started)
         return response
 
 
-class AnalyticsCommentView(CreateModelMixin, UpdateModelMixin, GenericViewSet):
+class AnalyticsCommentView(AtomicWritesMixin, CreateModelMixin, UpdateModelMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.CommentCreateSerializer
     queryset = Comment.objects.all()
@@ -572,6 +689,9 @@ class AnalyticsCommentView(CreateModelMixin, UpdateModelMixin, GenericViewSet):
         if not activity_statistics:
             raise AnalyticsDoesNotExistException()
 
+        for file in serializer.validated_data.get("files") or ():
+            metrics.UPLOAD_SIZE.labels(kind="comment_file").observe(file.size)
+
         CommentService.create_comment(
             activity_statistics_id=activity_statistics_id,
             user=self.request.user,
@@ -587,13 +707,13 @@ class AnalyticsCommentView(CreateModelMixin, UpdateModelMixin, GenericViewSet):
         serializer.is_valid(raise_exception=True)
         instance = self.perform_update(serializer)
 
-        return Response(serializers.CommentSerializer(instance).data)
+        return Response(serializers.CommentSerializer(instance, context=self.get_serializer_context()).data)
 
     def perform_update(self, serializer):
         return serializer.save()
 
 
-class AnalyticsFailureView(GenericViewSet):
+class AnalyticsFailureView(AtomicWritesMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.FailureSerializer
     queryset = Comment.objects.all()
@@ -601,7 +721,7 @@ class AnalyticsFailureView(GenericViewSet):
     def _get_activity_statistics(self) -> ActivityStatistics:
         supervision_id = self.kwargs.get("supervision_id")
         activity_id = self.kwargs.get("activity_id")
-        activity_statistics = ActivityStatistics.objects.filter(
+        activity_statistics = ActivityStatistics.objects.select_related("supervision").filter(
             supervision_id=supervision_id, activity_id=activity_id, end_date__isnull=True).order_by("-id").first()
 
         if not activity_statistics:
@@ -625,10 +745,16 @@ class AnalyticsFailureView(GenericViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class AnalyticsDetailsView(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
+class AnalyticsDetailsView(AtomicWritesMixin, ReplicaReadMixin, RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.AnalyticsDetailsSerializer
-    queryset = ActivityStatistics.objects.prefetch_related("comments")
+    queryset = ActivityStatistics.objects.select_related(
+        "activity",
+        "failure",
+        "supervision__organization",
+        "supervision__worker__classifier",
+        "supervision__user__classifier",
+    ).prefetch_related("comments__files")
     lookup_field = "pk"
 
     def get_serializer_class(self):
@@ -644,7 +770,7 @@ class AnalyticsDetailsView(RetrieveModelMixin, UpdateModelMixin, GenericViewSet)
         super().update(request, *args, **kwargs)
 
         instance = self.get_object()
-        serializer = serializers.AnalyticsDetailsSerializer(instance=instance)
+        serializer = serializers.AnalyticsDetailsSerializer(instance=instance, context=self.get_serializer_context())
         return Response(serializer.data)
 
     @extend_schema(
@@ -688,3 +814,340 @@ class AnalyticsDetailsView(RetrieveModelMixin, UpdateModelMixin, GenericViewSet)
         ActivityStatisticsService().clear_verification(activity_statistics)
 
         return success_response()
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="List activity norms",
+        description=(
+            "Retrieve time norms of activities: median, 10% trimmed mean, P10 and P90 of the durations of "
+            "verified activity statistics without a failure, per activity, per worker classifier and per "
+            "organization."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                name="min_samples",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Only norms computed from at least this many activity statistics",
+            ),
+        ],
+        responses={200: serializers.ActivityNormSerializer(many=True)},
+    ),
+)
+class ActivityNormViewSet(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, GenericViewSet):
+    permission_classes = (CustomDjangoModelPermissions,)
+    serializer_class = serializers.ActivityNormSerializer
+    queryset = ActivityNorm.objects.select_related("activity").order_by("activity_id", "scope", "id")
+    pagination_class = paginators.CustomPagination
+    filter_backends = (DjangoFilterBackend,)
+    filterset_fields = ("activity", "scope", "classifier", "organization")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        min_samples = self.request.query_params.get("min_samples")
+        if min_samples and min_samples.isdigit():
+            queryset = queryset.filter(sample_count__gte=int(min_samples))
+
+        return queryset
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Daily activity report",
+        description=(
+            "Retrieve verified activity statistics summed up per local day, organization, worker and activity: "
+            "count, total, min and max duration, failure time and overtime count. "
+            "Refreshed by the refresh_rollups management command."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                name="start_date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description="Filter by day (YYYY-MM-DD). Rollups of this day and later."
+            ),
+            OpenApiParameter(
+                name="end_date",
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                description="Filter by day (YYYY-MM-DD). Rollups of this day and earlier."
+            ),
+            OpenApiParameter(
+                name="ordering",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Order results by field (prefix with - for descending)"
+            ),
+        ],
+        responses={200: serializers.DailyActivityRollupSerializer(many=True)},
+    ),
+)
+class DailyActivityReportViewSet(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, GenericViewSet):
+    permission_classes = (CustomDjangoModelPermissions,)
+    serializer_class = serializers.DailyActivityRollupSerializer
+    queryset = DailyActivityRollup.objects.select_related("organization", "worker", "activity")
+    pagination_class = paginators.CustomPagination
+    filter_backends = (DjangoFilterBackend, DailyRollupDateFilter, filters.OrderingFilter)
+    filterset_fields = ("organization", "worker", "activity")
+    ordering_fields = ("day", "worker_id", "activity_id", "statistics_count", "total_duration", "failure_duration")
+    ordering = ("-day", "worker_id", "activity_id")
+
+
+COMMENT_LOCATION_PARAMETERS = [
+    OpenApiParameter(
+        name="organization",
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description="Filter by organization ID of the supervision",
+    ),
+    OpenApiParameter(
+        name="supervision",
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description="Filter by supervision ID",
+    ),
+    OpenApiParameter(
+        name="worker",
+        type=OpenApiTypes.INT,
+        location=OpenApiParameter.QUERY,
+        description="Filter by worker ID of the supervision",
+    ),
+    OpenApiParameter(
+        name="start_date",
+        type=OpenApiTypes.DATE,
+        location=OpenApiParameter.QUERY,
+        description="Filter by created date (YYYY-MM-DD). Comments of this day and later.",
+    ),
+    OpenApiParameter(
+        name="end_date",
+        type=OpenApiTypes.DATE,
+        location=OpenApiParameter.QUERY,
+        description="Filter by created date (YYYY-MM-DD). Comments of this day and earlier.",
+    ),
+]
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="List comments on the map",
+        description="Retrieve the comments with coordinates, in a bounding box or within a radius of a point.",
+        tags=["Analytics"],
+        parameters=[
+            *COMMENT_LOCATION_PARAMETERS,
+            OpenApiParameter(
+                name="bbox",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Bounding box min_longitude,min_latitude,max_longitude,max_latitude",
+            ),
+            OpenApiParameter(
+                name="point",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Comments within radius meters of the point longitude,latitude",
+            ),
+            OpenApiParameter(
+                name="radius",
+                type=OpenApiTypes.NUMBER,
+                location=OpenApiParameter.QUERY,
+                description=f"Radius of point in meters, at most {geo.MAX_RADIUS}",
+            ),
+        ],
+        responses={200: serializers.CommentLocationSerializer(many=True)},
+    ),
+)
+class CommentMapViewSet(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, GenericViewSet):
+    permission_classes = (CustomDjangoModelPermissions,)
+    serializer_class = serializers.CommentLocationSerializer
+    queryset = Comment.objects.filter(coordinates__isnull=False).select_related(
+        "activity_statistics"
+    ).prefetch_related("files").order_by("-id")
+    pagination_class = paginators.CustomPagination
+    filter_backends = (CommentDateFilter, CommentLocationFilter)
+
+    replica_actions = ("list",)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        for param, lookup in (
+            ("organization", "activity_statistics__supervision__organization_id"),
+            ("supervision", "activity_statistics__supervision_id"),
+            ("worker", "activity_statistics__supervision__worker_id"),
+        ):
+            value = params.get(param)
+            if value is None:
+                continue
+            if not value.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(**{lookup: int(value)})
+
+        return queryset
+
+
+class CommentExportViewSet(CommentMapViewSet):
+    renderer_classes = (*api_settings.DEFAULT_RENDERER_CLASSES, GeoJSONRenderer)
+
+    replica_actions = ("export",)
+
+    @extend_schema(
+        summary="Export comments as GeoJSON",
+        description=(
+            "Stream the comments with coordinates as a GeoJSON FeatureCollection of points, with the comment, "
+            "activity statistics, activity, supervision, organization and worker ids and the text and created "
+            "date as properties. Takes the filters of the comment map."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            *COMMENT_LOCATION_PARAMETERS,
+            OpenApiParameter(
+                name="bbox",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                description="Bounding box min_longitude,min_latitude,max_longitude,max_latitude",
+            ),
+        ],
+        responses={(200, "application/geo+json"): OpenApiTypes.OBJECT},
+    )
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # The stream is read after the request, when its routing to a replica has ended
+        features = geo.geojson_features(queryset.using(queryset.db))
+        if isinstance(request._request, ASGIRequest):
+            content = geo.astream_feature_collection(features)
+        else:
+            content = geo.stream_feature_collection(features)
+        response = StreamingHttpResponse(content, content_type="application/geo+json")
+        response["Content-Disposition"] = 'attachment; filename="comments.geojson"'
+        return response
+
+
+class CommentSearchViewSet(CommentMapViewSet):
+    """Nearest comments and clusters: short lists, not paginated."""
+
+    pagination_class = None
+    filter_backends = ()
+
+    replica_actions = ("nearest", "clusters")
+
+    @extend_schema(
+        summary="Nearest comments",
+        description="Retrieve the comments nearest to a point, closest first, with their distance in meters.",
+        tags=["Analytics"],
+        parameters=[*COMMENT_LOCATION_PARAMETERS, serializers.CommentNearestQuerySerializer],
+        responses={200: serializers.CommentLocationSerializer(many=True)},
+    )
+    def nearest(self, request, *args, **kwargs):
+        query = serializers.CommentNearestQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        comments = geo.nearest(
+            self.get_queryset(),
+            query.validated_data["point"],
+            query.validated_data["limit"],
+            query.validated_data["max_distance"],
+        )
+        return Response(self.get_serializer(comments, many=True).data)
+
+    @extend_schema(
+        summary="Comment clusters",
+        description=(
+            "Retrieve the comments in a bounding box grouped into clusters on a grid of the web map zoom level, "
+            "about 64 clusters per 256 px map tile. A cluster of one comment comes with its id."
+        ),
+        tags=["Analytics"],
+        parameters=[*COMMENT_LOCATION_PARAMETERS, serializers.CommentClusterQuerySerializer],
+        responses={200: serializers.CommentClusterSerializer(many=True)},
+    )
+    def clusters(self, request, *args, **kwargs):
+        query = serializers.CommentClusterQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        clusters = geo.clusters(self.get_queryset(), query.validated_data["bbox"], query.validated_data["zoom"])
+        return Response(serializers.CommentClusterSerializer(clusters, many=True).data)
+
+
+@extend_schema_view(
+    list=extend_schema(
+        summary="Sync feed",
+        description=(
+            "Records of the current supervisor changed or deleted since the cursor of the previous sync: "
+            "supervisions, activity statistics, failures and comments, layouts with their activity groups and "
+            "activities, and the app settings. Without a cursor, everything is returned. A layout comes with all "
+            "its groups and activities when any of them changed. Deleted ids do not list the records the delete of "
+            "a synced record cascaded to, e.g. the statistics of a deleted supervision."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                name="cursor",
+                type=OpenApiTypes.DATETIME,
+                location=OpenApiParameter.QUERY,
+                description="Cursor returned by the previous sync",
+            ),
+        ],
+        responses={200: serializers.SyncSerializer},
+    ),
+)
+class SyncViewSet(AtomicWritesMixin, GenericViewSet):
+    """Reads stay on the primary: a cursor past the replica's position would skip changes for good."""
+
+    permission_classes = (CustomDjangoModelPermissions,)
+    serializer_class = serializers.SyncSerializer
+    queryset = Supervision.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        query = serializers.SyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        changes = get_changes(request.user, query.validated_data.get("cursor"))
+        return Response(self.get_serializer(changes).data)
+
+
+class LiveFeedViewSet(AsyncDispatchMixin, AtomicWritesMixin, GenericViewSet):
+    authentication_classes = (CachedJWTAuthentication, QueryParamJWTAuthentication)
+    permission_classes = (CustomDjangoModelPermissions,)
+    renderer_classes = (*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer)
+    serializer_class = serializers.LiveFeedQuerySerializer
+    queryset = Supervision.objects.all()
+
+    @extend_schema(
+        summary="Live supervision feed",
+        description=(
+            "Server-Sent Events of one organization: activity_started, failure_started, failure_finished and "
+            "supervision_finished, each with the supervision, worker and organization ids. A comment line is sent "
+            "while idle. Needs the asgi server profile; EventSource clients pass the token as access_token."
+        ),
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                name="organization",
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                description="Organization to follow",
+                required=True,
+            ),
+        ],
+        responses={
+            (200, "text/event-stream"): OpenApiTypes.STR,
+            501: {"description": "Not served by the ASGI server"},
+        },
+    )
+    async def stream(self, request, *args, **kwargs):
+        # A WSGI worker would be held for the whole life of the stream
+        if not isinstance(request._request, ASGIRequest):
+            raise exceptions.LiveFeedRequiresASGIException()
+
+        query = serializers.LiveFeedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        # Subscribed before the response starts, so no event after the request is missed
+        subscription = await get_event_bus().subscribe(organization_channel(query.validated_data["organization"]))
+        response = StreamingHttpResponse(
+            stream_events(subscription, settings.LIVE_FEED["HEARTBEAT_SECONDS"]),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        # Nginx would buffer the stream otherwise
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -6,3 +6,6 @@ class AppSettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app_settings'
     verbose_name = _('Application Settings')
+
+    def ready(self):
+        from app_settings import signals  # noqa: F401
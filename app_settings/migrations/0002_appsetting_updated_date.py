@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-19 19:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_settings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appsetting',
+            name='created_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='created_date'),
+        ),
+        migrations.AddField(
+            model_name='appsetting',
+            name='updated_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='updated_date'),
+        ),
+    ]
@@ -1,8 +1,10 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from core.model_mixins import CreatedUpdatedDateMixin
 
-class AppSetting(models.Model):
+
+class AppSetting(CreatedUpdatedDateMixin):
     """
     Singleton model for application settings.
     Only one instance should exist for the entire application.
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_settings.models import AppSetting
+from app_settings.utils import clear_settings_cache
+
+
+@receiver(post_save, sender=AppSetting)
+@receiver(post_delete, sender=AppSetting)
+def invalidate_settings_cache(sender, **kwargs):
+    """Drop cached settings now and once more after commit, so no process re-caches uncommitted data."""
+    clear_settings_cache()
+    transaction.on_commit(clear_settings_cache)
@@ -1,9 +1,15 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 
+from app_settings import utils
 from app_settings.models import AppSetting
+from core.testing import QueryCountTestMixin
+from users.models import User
 
 
 class AppSettingModelTest(TestCase):
@@ -116,3 +122,72 @@ class AppSettingAPITest(APITestCase):
         app_setting = AppSetting.objects.get(pk=1)
         self.assertEqual(app_setting.hide_failure_btn, True)
         self.assertEqual(app_setting.hide_info_btn, True)
+
+
+class AppSettingCacheTest(TestCase):
+    """Test cases for the two-tier AppSetting cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        utils.clear_settings_cache()
+        self.app_setting = AppSetting.load()
+
+    def test_repeated_reads_do_not_query_database(self):
+        """Test that settings are read from the database only once."""
+        utils.get_app_settings()
+
+        with CaptureQueriesContext(connection) as context:
+            app_settings = utils.get_app_settings()
+
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(app_settings.pk, 1)
+
+    def test_save_invalidates_cache(self):
+        """Test that saving the settings is visible on the next read."""
+        self.assertFalse(utils.should_hide_failure_button())
+
+        self.app_setting.hide_failure_btn = True
+        self.app_setting.save()
+
+        self.assertTrue(utils.should_hide_failure_button())
+
+    def test_version_change_invalidates_local_copy(self):
+        """Test that a version bump from another process is picked up after the local TTL."""
+        utils.get_app_settings()
+        AppSetting.objects.filter(pk=1).update(hide_info_btn=True)
+        cache.set(utils.SETTINGS_VERSION_CACHE_KEY, "changed-elsewhere", None)
+
+        self.assertFalse(utils.should_hide_info_button())
+
+        utils._local_cache.expires_at = 0
+        self.assertTrue(utils.should_hide_info_button())
+
+
+class AppSettingQueryCountTest(QueryCountTestMixin, TestCase):
+    """Test cases for the number of queries of the AppSetting API endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        utils.clear_settings_cache()
+        self.user = User.objects.create_superuser(username="admin", email="admin@test.com", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_reads_are_served_from_cache(self):
+        """Test that reading the settings runs no queries once the cache is warm."""
+        self.client.get(reverse('app-settings-current'))
+
+        self.assertMaxRequestQueries(0, 'get', reverse('app-settings-current'))
+        self.assertMaxRequestQueries(0, 'get', reverse('app-settings-detail', kwargs={'pk': 1}))
+
+    def test_updates_run_bounded_queries(self):
+        """Test that updating the settings runs a bounded number of queries."""
+        data = {'hide_failure_btn': True}
+
+        # Includes the savepoint pair of the handler transaction inside the test transaction
+        self.assertMaxRequestQueries(7, 'post', reverse('app-settings-update-current'), data=data, format='json')
+        self.assertMaxRequestQueries(
+            7, 'patch', reverse('app-settings-detail', kwargs={'pk': 1}), data=data, format='json'
+        )
@@ -2,29 +2,124 @@
 Utility functions for accessing application settings.
 Provides easy access to the singleton AppSetting instance.
 """
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
 from django.core.cache import cache
 from django.conf import settings
 
 from app_settings.models import AppSetting
+from core.metrics import record_cache_read
+
+
+SETTINGS_CACHE_KEY = 'app_settings'
+SETTINGS_VERSION_CACHE_KEY = 'app_settings:version'
+SETTINGS_CACHE_TIMEOUT = 60 * 60
+
+METRICS_CACHE_NAME = 'app_settings'
+
+# How long a process trusts its in-memory copy before re-checking the version key
+LOCAL_CACHE_TTL = 2
+
+
+class _LocalSettingsCache:
+    """In-process copy of the settings values, validated against the shared version key."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.version = None
+        self.values = None
+        self.expires_at = 0.0
+
+    def store(self, version, values):
+        self.version = version
+        self.values = values
+        self.touch()
+
+    def touch(self):
+        self.expires_at = time.monotonic() + LOCAL_CACHE_TTL
+
+    def is_fresh(self):
+        return self.values is not None and time.monotonic() < self.expires_at
+
+
+_local_cache = _LocalSettingsCache()
+
+
+def _load_settings_values():
+    app_settings = AppSetting.load()
+    return {
+        field.attname: getattr(app_settings, field.attname)
+        for field in AppSetting._meta.concrete_fields
+    }
+
+
+def _get_settings_values():
+    if _local_cache.is_fresh():
+        record_cache_read(METRICS_CACHE_NAME, hit=True)
+        return _local_cache.values
+
+    version = cache.get(SETTINGS_VERSION_CACHE_KEY)
+    if version is not None and version == _local_cache.version:
+        _local_cache.touch()
+        record_cache_read(METRICS_CACHE_NAME, hit=True)
+        return _local_cache.values
+
+    cached = cache.get(SETTINGS_CACHE_KEY) if version is not None else None
+    hit = cached is not None and cached['version'] == version
+    if not hit:
+        if version is None:
+            version = uuid.uuid4().hex
+            cache.set(SETTINGS_VERSION_CACHE_KEY, version, None)
+
+        cached = {'version': version, 'values': _load_settings_values()}
+        cache.set(SETTINGS_CACHE_KEY, cached, SETTINGS_CACHE_TIMEOUT)
+
+    record_cache_read(METRICS_CACHE_NAME, hit=hit)
+    _local_cache.store(version, cached['values'])
+    return cached['values']
+
+
+async def _aget_settings_values():
+    if _local_cache.is_fresh():
+        record_cache_read(METRICS_CACHE_NAME, hit=True)
+        return _local_cache.values
+
+    version = await cache.aget(SETTINGS_VERSION_CACHE_KEY)
+    if version is not None and version == _local_cache.version:
+        _local_cache.touch()
+        record_cache_read(METRICS_CACHE_NAME, hit=True)
+        return _local_cache.values
+
+    return await sync_to_async(_get_settings_values)()
 
 
 def get_app_settings():
     """
     Get the application settings singleton instance.
-    Uses caching for better performance.
+    Reads go through an in-process copy that re-checks a shared version key
+    in the cache every LOCAL_CACHE_TTL seconds; the database is queried only
+    after the settings were changed.
     
     Returns:
         AppSetting: The singleton settings instance
     """
-    cache_key = 'app_settings'
-    app_settings = cache.get(cache_key)
-    
-    if app_settings is None:
-        app_settings = AppSetting.load()
-        # Cache for 5 minutes
-        cache.set(cache_key, app_settings, 300)
-    
-    return app_settings
+    return AppSetting(**_get_settings_values())
+
+
+async def aget_app_settings():
+    """
+    Async counterpart of get_app_settings().
+    The in-process copy and the version check are served without a thread;
+    only a rebuild after a settings change falls back to the sync path.
+
+    Returns:
+        AppSetting: The singleton settings instance
+    """
+    return AppSetting(**await _aget_settings_values())
 
 
 def get_setting(setting_name, default=None):
@@ -48,9 +143,12 @@ def get_setting(setting_name, default=None):
 def clear_settings_cache():
     """
     Clear the settings cache.
-    Call this after updating settings to ensure fresh data.
+    Called by the AppSetting save/delete signals; bumping the version key
+    makes every process drop its in-memory copy within LOCAL_CACHE_TTL seconds.
     """
-    cache.delete('app_settings')
+    _local_cache.clear()
+    cache.set(SETTINGS_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+    cache.delete(SETTINGS_CACHE_KEY)
 
 
 def should_hide_failure_button():
@@ -8,7 +8,9 @@ from drf_spectacular.types import OpenApiTypes
 
 from app_settings import serializers
 from app_settings.models import AppSetting
+from app_settings.utils import aget_app_settings, get_app_settings
 from core.permissions import CustomDjangoModelPermissions
+from core.view_mixins import AsyncDispatchMixin, AtomicWritesMixin
 
 
 @extend_schema_view(
@@ -44,19 +46,27 @@ from core.permissions import CustomDjangoModelPermissions
         }
     )
 )
-class AppSettingViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
+class AppSettingViewSet(AsyncDispatchMixin, AtomicWritesMixin, RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
     """
     ViewSet for managing application settings singleton.
     Provides retrieve and update operations for the single AppSetting instance.
     """
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.AppSettingSerializer
+    queryset = AppSetting.objects.all()
     
     def get_object(self):
         """
         Always return the singleton instance.
+        Reads are served from the settings cache, writes load the row from the database.
         """
-        return AppSetting.load()
+        if self.action in ("update", "partial_update"):
+            return AppSetting.load()
+
+        return get_app_settings()
+
+    async def retrieve(self, request, *args, **kwargs):
+        return Response(await self.aget_serializer_data(await aget_app_settings()))
 
     @extend_schema(
         summary="Get current application settings",
@@ -68,15 +78,14 @@ class AppSettingViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
         }
     )
     @action(detail=False, methods=['get'])
-    def current(self, request):
+    async def current(self, request):
         """
         Get the current application settings.
         Always returns the singleton instance.
         """
         try:
-            app_setting = AppSetting.load()
-            serializer = self.get_serializer(app_setting)
-            return Response(serializer.data)
+            app_setting = await aget_app_settings()
+            return Response(await self.aget_serializer_data(app_setting))
         except Exception as e:
             return Response(
                 {"error": "Failed to retrieve application settings"},
@@ -0,0 +1,12 @@
+"""
+Gunicorn settings shared by the wsgi and asgi server profiles.
+"""
+import os
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (worker memory) of a finished worker from the Prometheus samples
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
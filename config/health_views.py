@@ -1,51 +1,114 @@
 """
 Health check views for monitoring API and documentation status.
 """
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views import View
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.types import OpenApiTypes
 
+from core.health import get_readiness_report
+from core.view_mixins import AsyncDispatchMixin, AtomicWritesMixin
 
-@extend_schema(
-    summary="API Health Check",
-    description="Check if the API is running and accessible.",
-    tags=["Health"],
-    responses={
-        200: {
-            "description": "API is healthy",
-            "content": {
-                "application/json": {
-                    "schema": {
-                        "type": "object",
-                        "properties": {
-                            "status": {"type": "string", "example": "healthy"},
-                            "message": {"type": "string", "example": "API is running"},
-                            "version": {"type": "string", "example": "1.0.0"}
+
+class HealthCheckView(AsyncDispatchMixin, AtomicWritesMixin, APIView):
+    """Health check endpoint for API monitoring, served natively under ASGI."""
+    permission_classes = (AllowAny,)
+
+    @extend_schema(
+        summary="API Health Check",
+        description="Check if the API is running and accessible.",
+        tags=["Health"],
+        responses={
+            200: {
+                "description": "API is healthy",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "status": {"type": "string", "example": "healthy"},
+                                "message": {"type": "string", "example": "API is running"},
+                                "version": {"type": "string", "example": "1.0.0"}
+                            }
                         }
                     }
                 }
             }
         }
-    }
-)
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def health_check(request):
-    """Health check endpoint for API monitoring."""
-    return Response({
-        "status": "healthy",
-        "message": "Mera API is running",
-        "version": "1.0.0",
-        "documentation": {
-            "swagger_ui": "/api/docs/",
-            "redoc": "/api/redoc/",
-            "schema": "/api/schema/"
+    )
+    async def get(self, request):
+        return Response({
+            "status": "healthy",
+            "message": "Mera API is running",
+            "version": "1.0.0",
+            "documentation": {
+                "swagger_ui": "/api/docs/",
+                "redoc": "/api/redoc/",
+                "schema": "/api/schema/"
+            }
+        })
+
+
+class ReadinessCheckView(AsyncDispatchMixin, AtomicWritesMixin, APIView):
+    """
+    Readiness endpoint for the load balancer: probes the databases, caches and
+    default storage. Probe results are cached for a few seconds per process.
+    """
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+
+    @extend_schema(
+        summary="API Readiness Check",
+        description=(
+            "Probe the database (with replication lag of replicas), cache and storage. "
+            "Returns 503 when a dependency fails or does not answer within its timeout."
+        ),
+        tags=["Health"],
+        responses={
+            200: {
+                "description": "All dependencies are reachable",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "status": {"type": "string", "example": "ready"},
+                                "cached": {"type": "boolean", "example": False},
+                                "checked_at": {"type": "string", "format": "date-time"},
+                                "checks": {
+                                    "type": "object",
+                                    "example": {
+                                        "database:default": {"status": "ok", "latency_ms": 1.3},
+                                        "cache:default": {"status": "ok", "latency_ms": 0.8},
+                                        "storage:default": {"status": "ok", "latency_ms": 12.4},
+                                    },
+                                },
+                            }
+                        }
+                    }
+                }
+            },
+            503: {"description": "A dependency is unavailable"},
         }
-    })
+    )
+    async def get(self, request):
+        # Probes block on sockets; run them off the event loop and off the request thread
+        report, cached = await sync_to_async(get_readiness_report, thread_sensitive=False)()
+        return Response(
+            {
+                "status": "ready" if report.ready else "unavailable",
+                "cached": cached,
+                "checked_at": report.checked_at,
+                "checks": {name: result.as_dict() for name, result in report.checks.items()},
+            },
+            status=status.HTTP_200_OK if report.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
 
 
 @extend_schema(
@@ -0,0 +1,33 @@
+"""
+Prometheus metrics endpoint.
+"""
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from core.authentication import MetricsTokenAuthentication
+from core.metrics import render_metrics
+from core.permissions import IsMetricsScraper
+
+
+class MetricsView(APIView):
+    """Metrics of all workers in the Prometheus text exposition format."""
+    authentication_classes = (MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+    permission_classes = (IsMetricsScraper,)
+
+    @extend_schema(
+        summary="Prometheus metrics",
+        description="Request latency, DB queries per request, cache hit ratios, export and upload sizes "
+                    "and worker memory in the Prometheus text format. Requires the METRICS_TOKEN bearer "
+                    "token or a staff user.",
+        tags=["Health"],
+        responses={
+            200: {"description": "Metrics", "content": {"text/plain": {"schema": {"type": "string"}}}},
+            401: {"description": "Authentication required"},
+            403: {"description": "Permission denied"},
+        }
+    )
+    def get(self, request):
+        return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -67,19 +67,55 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.middleware.locale.LocaleMiddleware",
+    "core.middleware.RequestProfilingMiddleware",
 ]
 
+# Opt-in per-request profiling: Server-Timing headers and logging of requests over budget
+REQUEST_PROFILING = {
+    "ENABLED": env.bool("REQUEST_PROFILING_ENABLED", default=False),
+    "PATH_PREFIXES": ("/api/supervisions/", "/api/layouts/", "/api/users/"),
+    "BUDGETS": {
+        "total_ms": env.int("REQUEST_PROFILING_TOTAL_MS", default=500),
+        "db_queries": env.int("REQUEST_PROFILING_DB_QUERIES", default=30),
+        "db_ms": env.int("REQUEST_PROFILING_DB_MS", default=200),
+    },
+    "SLOW_SQL_LIMIT": 5,
+}
+
+# Bearer token of the Prometheus scraper for /api/metrics/ (staff users are allowed too)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
+# Sync feed of the mobile clients (/api/supervisions/sync/), see analytics.sync
+SYNC = {
+    # Deletions are kept this long; clients with an older cursor get a full sync
+    "TOMBSTONE_DAYS": env.int("SYNC_TOMBSTONE_DAYS", default=30),
+    # The next cursor lags behind so that rows of transactions still open are not skipped
+    "CURSOR_LAG_SECONDS": env.int("SYNC_CURSOR_LAG_SECONDS", default=60),
+}
+
+# Readiness probes of /api/health/ready/ (timeouts in seconds)
+HEALTH_CHECK = {
+    "CACHE_SECONDS": env.int("HEALTH_CHECK_CACHE_SECONDS", default=5),
+    "TIMEOUTS": {
+        "database": env.float("HEALTH_CHECK_DATABASE_TIMEOUT", default=2.0),
+        "cache": env.float("HEALTH_CHECK_CACHE_TIMEOUT", default=1.0),
+        "storage": env.float("HEALTH_CHECK_STORAGE_TIMEOUT", default=3.0),
+    },
+    "MAX_REPLICATION_LAG": env.int("HEALTH_CHECK_MAX_REPLICATION_LAG", default=30),
+}
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -118,6 +154,34 @@ DATABASES = {
     }
 }
 
+# Django's native connection pool (psycopg 3). Connections are borrowed per
+# request instead of opened per request; it replaces CONN_MAX_AGE.
+if env.bool("POSTGRES_POOL", default=False):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("POSTGRES_POOL_MIN_SIZE", default=2),
+            "max_size": env.int("POSTGRES_POOL_MAX_SIZE", default=10),
+            "timeout": env.float("POSTGRES_POOL_TIMEOUT", default=10.0),
+        },
+    }
+
+# Read replicas: streaming replicas of the default database, one per host.
+# Safe reads of the views with core.view_mixins.ReplicaReadMixin go to them.
+for number, host in enumerate(env.list("POSTGRES_REPLICA_HOSTS", default=[])):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "ATOMIC_REQUESTS": False,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.db_routers.ReplicaRouter"]
+READ_REPLICAS = {
+    "ALIASES": [alias for alias in DATABASES if alias.startswith("replica_")],
+    # Reads of a user stay on the primary for this long after their own write
+    "STICKY_SECONDS": env.int("READ_REPLICA_STICKY_SECONDS", default=10),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -217,17 +281,30 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # django-allauth settings
 AUTHENTICATION_BACKENDS = (
-    "django.contrib.auth.backends.ModelBackend",  # Default backend (needed for admin)
+    "users.backends.CachedPermissionsBackend",  # ModelBackend with cached permissions (needed for admin)
     "rest_framework_simplejwt.authentication.JWTAuthentication",  # allauth specific
 )
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
     ),
+    # orjson in place of the json module: the supervision list pages are large.
+    # MessagePack is served to clients asking for it, JSON stays the default.
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "core.parsers.ORJSONParser",
+        "core.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
@@ -361,6 +438,16 @@ CORS_ALLOW_HEADERS = [
 
 REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
 
+# Live supervision feed (/api/supervisions/live/), see analytics.live and core.event_bus
+LIVE_FEED = {
+    "BACKEND": env("LIVE_FEED_BACKEND", default="core.event_bus.RedisEventBus"),
+    "REDIS_URL": REDIS_URL,
+    # Comment lines keep idle streams open through proxies
+    "HEARTBEAT_SECONDS": env.int("LIVE_FEED_HEARTBEAT_SECONDS", default=15),
+    # Events kept per subscriber of the in-memory backend
+    "QUEUE_SIZE": 100,
+}
+
 # Cache configuration
 CACHES = {
     "default": {
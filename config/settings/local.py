@@ -1,6 +1,7 @@
 # ruff: noqa: E501
 from .base import *  # noqa: F403
 from .base import INSTALLED_APPS
+from .base import LIVE_FEED
 from .base import MIDDLEWARE
 from .base import env
 
@@ -38,3 +39,7 @@ EMAIL_BACKEND = env(
 # ------------------------------------------------------------------------------
 # http://whitenoise.evans.io/en/latest/django.html#using-whitenoise-in-development
 INSTALLED_APPS = ["whitenoise.runserver_nostatic", *INSTALLED_APPS]
+
+# LIVE FEED
+# ------------------------------------------------------------------------------
+LIVE_FEED = {**LIVE_FEED, "BACKEND": "core.event_bus.InMemoryEventBus"}
@@ -1,6 +1,7 @@
 # ruff: noqa: E501
 from .base import *  # noqa: F403
 from .base import DATABASES
+from .base import READ_REPLICAS
 from .base import env
 
 # GENERAL
@@ -11,7 +12,10 @@ SECRET_KEY = env("DJANGO_SECRET_KEY")
 
 # DATABASES
 # ------------------------------------------------------------------------------
-DATABASES["default"]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
+for alias in ["default", *READ_REPLICAS["ALIASES"]]:
+    # A pooled connection is returned to the pool after each request instead
+    if "pool" not in DATABASES[alias].get("OPTIONS", {}):
+        DATABASES[alias]["CONN_MAX_AGE"] = env.int("CONN_MAX_AGE", default=60)
 
 # CACHES
 # ------------------------------------------------------------------------------
@@ -7,6 +7,7 @@ Or use Docker for running tests where dependencies are pre-installed.
 """
 
 from .base import *  # noqa: F403
+from .base import LIVE_FEED
 from .base import TEMPLATES
 from .base import env
 
@@ -49,3 +50,17 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver/"
+
+# CACHES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/settings/#caches
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "",
+    },
+}
+
+# LIVE FEED
+# ------------------------------------------------------------------------------
+LIVE_FEED = {**LIVE_FEED, "BACKEND": "core.event_bus.InMemoryEventBus"}
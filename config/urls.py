@@ -24,7 +24,8 @@ from config.auth_views import (
     CustomTokenRefreshView,
     CustomTokenVerifyView,
 )
-from config.health_views import health_check, docs_health_check
+from config.health_views import HealthCheckView, ReadinessCheckView, docs_health_check
+from config.metrics_views import MetricsView
 
 
 urlpatterns = [
@@ -44,8 +45,10 @@ urlpatterns = [
     path("api/app-settings/", include("app_settings.urls")),
     
     # Health checks
-    path("api/health/", health_check, name="health_check"),
+    path("api/health/", HealthCheckView.as_view(), name="health_check"),
+    path("api/health/ready/", ReadinessCheckView.as_view(), name="readiness_check"),
     path("api/docs/health/", docs_health_check, name="docs_health_check"),
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
     
     # API Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -1,7 +1,11 @@
+from django import forms
 from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
 from django.utils import timezone
 from django.utils.formats import localize
+from django.utils.html import format_html, format_html_join
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
@@ -130,3 +134,123 @@ class LocalizedDateTimeAdminMixin:
         wrapper.short_description = field_name
         wrapper.admin_order_field = field_name
         return wrapper
+
+
+class AutocompleteListFilter(admin.SimpleListFilter):
+    """
+    Changelist filter rendered as an admin autocomplete widget.
+    Options are searched on demand through the admin autocomplete view, so the
+    changelist never loads the whole related table.
+    The admin using it must include AutocompleteListFilterAdminMixin for the widget media.
+    """
+    template = "admin/autocomplete_list_filter.html"
+
+    # ForeignKey of a model registered in the admin site, used to validate autocomplete requests
+    source_model = None
+    field_name = None
+    # Queryset lookup applied with the selected primary key
+    lookup_field = None
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        self.admin_site = model_admin.admin_site
+        self.source_field = (self.source_model or model)._meta.get_field(self.field_name)
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup_field: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": _("All"),
+            "hidden_params": [
+                (name, value)
+                for name, value in changelist.params.items()
+                if name != self.parameter_name
+            ],
+        }
+
+    @property
+    def form(self):
+        field = forms.ModelChoiceField(
+            queryset=self.source_field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(
+                self.source_field, self.admin_site, attrs={"onchange": "this.form.submit()"}
+            ),
+        )
+        form_class = type("AutocompleteListFilterForm", (forms.Form,), {self.parameter_name: field})
+        return form_class(initial={self.parameter_name: self.value()}, auto_id="id_filter_%s")
+
+
+class AutocompleteListFilterAdminMixin:
+    @property
+    def media(self):
+        return super().media + AutocompleteSelect(None, self.admin_site).media
+
+
+class PaginatedInlineMixin:
+    """
+    Inline that renders a single page of related objects instead of the whole set.
+    The page is selected with the `<model name>_page` query parameter.
+    """
+    per_page = 20
+
+    @property
+    def page_query_param(self):
+        return f"{self.model._meta.model_name}_page"
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset_class = super().get_formset(request, obj, **kwargs)
+        if obj is None or obj.pk is None:
+            return formset_class
+
+        page = self._get_page(request, obj, formset_class.fk)
+        self.title = self._get_page_title(request, page)
+
+        class PaginatedFormSet(formset_class):
+            def get_queryset(self):
+                if not hasattr(self, "_paginated_queryset"):
+                    self._paginated_queryset = super().get_queryset().filter(pk__in=page.object_list)
+                    self._queryset = self._paginated_queryset
+                return self._paginated_queryset
+
+        return PaginatedFormSet
+
+    def _get_page(self, request, obj, fk):
+        # get_formset is called several times per request, the page is resolved once
+        if getattr(self, "_page", None) is None:
+            queryset = self.get_queryset(request).filter(**{fk.name: obj}).order_by("pk")
+            paginator = Paginator(queryset.values_list("pk", flat=True), self.per_page)
+            self._page = paginator.get_page(request.GET.get(self.page_query_param))
+            self._page.object_list = list(self._page.object_list)
+
+        return self._page
+
+    def _get_page_title(self, request, page):
+        if page.paginator.num_pages <= 1:
+            return None
+
+        def page_link(number):
+            if number == page.number or number == Paginator.ELLIPSIS:
+                return format_html("<b>{}</b>", number)
+
+            params = request.GET.copy()
+            params[self.page_query_param] = number
+            return format_html('<a href="?{}">{}</a>', params.urlencode(), number)
+
+        return format_html(
+            "{} ({}): {}",
+            self.verbose_name_plural,
+            page.paginator.count,
+            format_html_join(" ", "{}", ((page_link(number),) for number in page.paginator.get_elided_page_range(page.number))),
+        )
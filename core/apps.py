@@ -6,3 +6,16 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
     verbose_name = _("core")
+
+    def ready(self):
+        from django.db import models
+        from django.db.backends.signals import connection_created
+        from rest_framework.serializers import ModelSerializer
+
+        from core import checks  # noqa: F401
+        from core.metrics import install_query_counter
+        from core.serializers import DateTimeField
+
+        connection_created.connect(install_query_counter)
+        # Datetimes of model serializers become MessagePack Timestamps, as rest_framework_gis maps geometries
+        ModelSerializer.serializer_field_mapping[models.DateTimeField] = DateTimeField
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.utils.crypto import constant_time_compare
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates a metrics scraper by the static settings.METRICS_TOKEN bearer token.
+    Other Authorization headers are left to the next authentication class.
+    """
+
+    keyword = b"bearer"
+
+    def authenticate(self, request):
+        token = settings.METRICS_TOKEN
+        parts = get_authorization_header(request).split()
+        if not token or len(parts) != 2 or parts[0].lower() != self.keyword:
+            return None
+
+        if not constant_time_compare(parts[1].decode("latin-1"), token):
+            return None
+
+        return AnonymousUser(), self
+
+    def authenticate_header(self, request):
+        return "Bearer"
@@ -0,0 +1,176 @@
+"""
+Benchmark harness for the API hot paths.
+
+Apps register benchmarks in their ``benchmarks`` module with @benchmark; the
+run_benchmarks command discovers them, runs them against a test database with a
+synthetic dataset, stores the timings as JSON and compares them to a baseline.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+
+import django
+from django.utils.module_loading import autodiscover_modules
+from rest_framework.test import APIClient
+
+from users.models import User
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Called once with the BenchmarkContext, returns the callable to time
+    setup: Callable
+    rounds: int
+    warmup: int
+    # Calls per round, for functions too fast to time one call at a time
+    number: int
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rounds: int
+    number: int
+    min: float
+    median: float
+    mean: float
+    p95: float
+    stdev: float
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_timings(cls, benchmark: Benchmark, timings: list[float], extra: dict) -> "BenchmarkResult":
+        ordered = sorted(timings)
+        return cls(
+            name=benchmark.name,
+            rounds=len(timings),
+            number=benchmark.number,
+            min=ordered[0],
+            median=statistics.median(ordered),
+            mean=statistics.fmean(ordered),
+            p95=ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+            stdev=statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+            extra=extra,
+        )
+
+
+@dataclass
+class Comparison:
+    name: str
+    median: float
+    baseline_median: float | None
+
+    @property
+    def change(self) -> float | None:
+        if not self.baseline_median:
+            return None
+
+        return self.median / self.baseline_median - 1
+
+
+class BenchmarkContext:
+    """Shared state of a benchmark run: an API client authenticated as a superuser."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.user, _ = User.objects.get_or_create(
+            username=f"{label}_benchmark_admin",
+            defaults={"is_staff": True, "is_superuser": True},
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method: str, url: str, status_code: int = 200, **kwargs):
+        response = getattr(self.client, method)(url, **kwargs)
+        if response.status_code != status_code:
+            raise AssertionError(
+                f"{method.upper()} {url} returned {response.status_code}, expected {status_code}: "
+                f"{response.content[:500]!r}"
+            )
+
+        return response
+
+
+_registry: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, rounds: int = 20, warmup: int = 2, number: int = 1):
+    """Register a benchmark; the decorated function receives the context and returns the callable to time."""
+
+    def decorator(setup):
+        if name in _registry:
+            raise ValueError(f"Benchmark {name} is already registered")
+
+        _registry[name] = Benchmark(name=name, setup=setup, rounds=rounds, warmup=warmup, number=number)
+        return setup
+
+    return decorator
+
+
+def get_benchmarks() -> list[Benchmark]:
+    autodiscover_modules("benchmarks")
+    return sorted(_registry.values(), key=lambda registered: registered.name)
+
+
+def run_benchmark(benchmark: Benchmark, context, rounds: int | None = None) -> BenchmarkResult:
+    """Time the benchmark; a dict returned by the callable is reported as extra values (e.g. row counts)."""
+    function = benchmark.setup(context)
+
+    result = None
+    for _ in range(benchmark.warmup):
+        result = function()
+
+    timings = []
+    for _ in range(rounds or benchmark.rounds):
+        started = time.perf_counter()
+        for _ in range(benchmark.number):
+            result = function()
+        timings.append((time.perf_counter() - started) / benchmark.number)
+
+    return BenchmarkResult.from_timings(benchmark, timings, result if isinstance(result, dict) else {})
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    return completed.stdout.strip()
+
+
+def results_to_json(results: list[BenchmarkResult], meta: dict) -> str:
+    return json.dumps(
+        {
+            "meta": {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                **meta,
+            },
+            "benchmarks": {result.name: asdict(result) for result in results},
+        },
+        indent=2,
+    )
+
+
+def compare(results: list[BenchmarkResult], baseline: dict) -> list[Comparison]:
+    """Compare median timings with a baseline loaded from results_to_json() output."""
+    baseline_benchmarks = baseline.get("benchmarks", {})
+    return [
+        Comparison(
+            name=result.name,
+            median=result.median,
+            baseline_median=baseline_benchmarks.get(result.name, {}).get("median"),
+        )
+        for result in results
+    ]
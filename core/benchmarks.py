@@ -0,0 +1,16 @@
+from datetime import time, timedelta
+
+from core.benchmarking import benchmark
+from core.utils import time_difference, timedelta_to_str
+
+
+@benchmark("timedelta_to_str", rounds=50, number=10_000)
+def timedelta_to_str_benchmark(context):
+    delta = timedelta(hours=3, minutes=25, seconds=41, microseconds=120)
+    return lambda: timedelta_to_str(delta)
+
+
+@benchmark("time_difference", rounds=50, number=10_000)
+def time_difference_benchmark(context):
+    start_time, end_time = time(22, 15), time(1, 40)
+    return lambda: time_difference(start_time, end_time)
@@ -0,0 +1,19 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.compatibility)
+def check_duplicate_middleware(app_configs, **kwargs):
+    """Warn about middleware listed more than once; each entry runs on every request."""
+    return [
+        Warning(
+            f"{path} is listed {count} times in MIDDLEWARE.",
+            hint="Remove the duplicated entry.",
+            obj="settings.MIDDLEWARE",
+            id="core.W001",
+        )
+        for path, count in Counter(settings.MIDDLEWARE).items()
+        if count > 1
+    ]
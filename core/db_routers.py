@@ -0,0 +1,102 @@
+"""
+Routing of safe reads to the PostgreSQL read replicas.
+
+Everything goes to the primary ("default") unless a view opts in with
+core.view_mixins.ReplicaReadMixin: its safe actions then read from one of
+settings.READ_REPLICAS["ALIASES"] for the rest of the request. After a user's
+own write, their reads stay on the primary for READ_REPLICAS["STICKY_SECONDS"],
+so they never see a replica that has not caught up with it yet.
+"""
+import logging
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "default"
+
+_read_alias: ContextVar[str | None] = ContextVar("read_alias", default=None)
+
+
+def _config() -> dict:
+    return getattr(settings, "READ_REPLICAS", {})
+
+
+def get_replica_aliases() -> list[str]:
+    return list(_config().get("ALIASES", ()))
+
+
+def start_request_routing():
+    """Reads of a new request go to the primary until a view routes them to a replica."""
+    return _read_alias.set(None)
+
+
+def stop_request_routing(token):
+    _read_alias.reset(token)
+
+
+def route_reads_to_replica() -> str | None:
+    """Send the remaining reads of the current request to a random replica, if any is configured."""
+    replicas = get_replica_aliases()
+    if not replicas:
+        return None
+
+    alias = random.choice(replicas)
+    _read_alias.set(alias)
+    return alias
+
+
+def get_read_alias() -> str | None:
+    return _read_alias.get()
+
+
+def _sticky_key(user) -> str:
+    return f"db_routing:primary:{user.pk}"
+
+
+def pin_to_primary(user):
+    """Keep the user's reads on the primary until the replicas have caught up with their write."""
+    sticky_seconds = _config().get("STICKY_SECONDS", 10)
+    if not get_replica_aliases() or not sticky_seconds:
+        return
+
+    try:
+        cache.set(_sticky_key(user), True, timeout=sticky_seconds)
+    except Exception:
+        logger.warning("Could not pin user %s to the primary database", user.pk, exc_info=True)
+
+
+def is_pinned_to_primary(user) -> bool:
+    if not user or not user.is_authenticated:
+        return False
+
+    try:
+        return bool(cache.get(_sticky_key(user)))
+    except Exception:
+        # Without the cache a recent write cannot be ruled out
+        logger.warning("Could not check the primary pin of user %s", user.pk, exc_info=True)
+        return True
+
+
+class ReplicaRouter:
+    """Reads go where the current request was routed, writes and migrations to the primary."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas are copies of the primary, objects read from either may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replica_aliases():
+            return False
+
+        return None
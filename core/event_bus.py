@@ -0,0 +1,118 @@
+"""
+Publish/subscribe bus of the live feeds.
+
+Events are JSON objects published to a named channel. RedisEventBus fans them
+out to the subscribers of all processes with Redis pub/sub; InMemoryEventBus
+reaches the subscribers of its own process only and serves tests and local
+development. The backend is selected by settings.LIVE_FEED["BACKEND"].
+Publishing is synchronous and best effort, subscribing is async: a
+subscription lives on the event loop of an ASGI streaming response.
+"""
+import asyncio
+import functools
+import json
+import logging
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+from redis import asyncio as redis_asyncio
+
+logger = logging.getLogger(__name__)
+
+
+def encode_event(event: dict) -> str:
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+class InMemorySubscription:
+    def __init__(self, bus: "InMemoryEventBus", channel: str):
+        self.bus = bus
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=bus.queue_size)
+
+    def put(self, event: dict):
+        # A subscriber that falls behind loses its oldest events
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> dict | None:
+        """Next event, or None when none came within the timeout."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.bus.subscriptions[self.channel].discard(self)
+
+
+class InMemoryEventBus:
+    def __init__(self, options: dict):
+        self.queue_size = options.get("QUEUE_SIZE", 100)
+        self.subscriptions: dict[str, set[InMemorySubscription]] = {}
+
+    def publish(self, channel: str, event: dict):
+        # Events go through JSON as with Redis, so subscribers get the same values
+        event = json.loads(encode_event(event))
+        for subscription in list(self.subscriptions.get(channel, ())):
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # The event loop of the subscriber is closed
+                self.subscriptions[channel].discard(subscription)
+
+    async def subscribe(self, channel: str) -> InMemorySubscription:
+        subscription = InMemorySubscription(self, channel)
+        self.subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+
+class RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float) -> dict | None:
+        """Next event, or None when none came within the timeout."""
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message["data"])
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisEventBus:
+    def __init__(self, options: dict):
+        self.url = options["REDIS_URL"]
+        # A dashboard event is not worth a slow request when Redis is unreachable
+        self.client = redis.Redis.from_url(self.url, socket_connect_timeout=1, socket_timeout=1)
+
+    def publish(self, channel: str, event: dict):
+        self.client.publish(channel, encode_event(event))
+
+    async def subscribe(self, channel: str) -> RedisSubscription:
+        # Subscriptions block on their connection; every one gets its own client on the current event loop
+        client = redis_asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(client, pubsub)
+
+
+@functools.cache
+def get_event_bus():
+    return import_string(settings.LIVE_FEED["BACKEND"])(settings.LIVE_FEED)
+
+
+def publish(channel: str, event: dict):
+    """Publish the event; a bus failure is logged, it never fails the request that caused the event."""
+    try:
+        get_event_bus().publish(channel, event)
+    except Exception:
+        logger.exception("Publishing a live event to %s failed", channel)
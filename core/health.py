@@ -0,0 +1,178 @@
+"""
+Readiness probes of the database, cache and storage dependencies.
+
+Probes run in parallel threads, each with its own timeout. Results are kept
+for settings.HEALTH_CHECK["CACHE_SECONDS"] per process, and only one request
+at a time runs the probes, so load balancer health traffic cannot stampede
+the dependencies.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import storages
+from django.db import connections, transaction
+
+
+OK = "ok"
+ERROR = "error"
+TIMEOUT = "timeout"
+
+DEFAULT_TIMEOUTS = {"database": 2.0, "cache": 1.0, "storage": 3.0}
+
+REPLICATION_LAG_SQL = (
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="health")
+_lock = threading.Lock()
+_report: "ReadinessReport | None" = None
+
+
+@dataclass
+class ProbeResult:
+    status: str
+    latency_ms: float | None = None
+    detail: str | None = None
+    extra: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        data = {"status": self.status, "latency_ms": self.latency_ms}
+        if self.detail:
+            data["detail"] = self.detail
+        return {**data, **self.extra}
+
+
+@dataclass
+class ReadinessReport:
+    checks: dict[str, ProbeResult]
+    checked_at: datetime
+    monotonic: float
+
+    @property
+    def ready(self) -> bool:
+        return all(result.status == OK for result in self.checks.values())
+
+
+def _config() -> dict:
+    return getattr(settings, "HEALTH_CHECK", {})
+
+
+def probe_database(alias: str, timeout: float) -> dict:
+    """Run a trivial query; on a PostgreSQL replica also report the replication lag."""
+    connection = connections[alias]
+    try:
+        # SET LOCAL ends with the transaction, so a pooled connection is returned without the probe's timeout
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SET LOCAL statement_timeout = %s", [int(timeout * 1000)])
+            cursor.execute("SELECT 1")
+
+            if connection.vendor != "postgresql":
+                return {}
+
+            cursor.execute(REPLICATION_LAG_SQL)
+            lag = cursor.fetchone()[0]
+    finally:
+        # Probe threads are reused; their connections must not linger between probes
+        connection.close()
+
+    if lag is None:
+        return {}
+
+    lag = float(lag)
+    max_lag = _config().get("MAX_REPLICATION_LAG", 30)
+    if lag > max_lag:
+        raise RuntimeError(f"Replication lag {lag:.1f} s exceeds {max_lag} s")
+
+    return {"replication_lag_seconds": round(lag, 3)}
+
+
+def probe_cache(alias: str, timeout: float) -> dict:
+    """Write and read back a key; backends that swallow errors return a wrong value instead."""
+    cache = caches[alias]
+    key = f"health:{uuid.uuid4().hex}"
+    value = uuid.uuid4().hex
+
+    cache.set(key, value, timeout=max(int(timeout), 1) + 5)
+    try:
+        if cache.get(key) != value:
+            raise RuntimeError("Value written to the cache was not read back")
+    finally:
+        cache.delete(key)
+
+    return {}
+
+
+def probe_storage(alias: str, timeout: float) -> dict:
+    """Check that the storage answers; nothing is written."""
+    storages[alias].exists("health-check")
+    return {}
+
+
+def _probes() -> dict[str, tuple]:
+    timeouts = {**DEFAULT_TIMEOUTS, **_config().get("TIMEOUTS", {})}
+    probes = {}
+    for alias in settings.DATABASES:
+        probes[f"database:{alias}"] = (probe_database, alias, timeouts["database"])
+    for alias in settings.CACHES:
+        probes[f"cache:{alias}"] = (probe_cache, alias, timeouts["cache"])
+    probes["storage:default"] = (probe_storage, "default", timeouts["storage"])
+    return probes
+
+
+def _timed(probe, alias, timeout) -> ProbeResult:
+    started = time.perf_counter()
+    try:
+        extra = probe(alias, timeout)
+    except Exception as e:
+        return ProbeResult(ERROR, round((time.perf_counter() - started) * 1000, 2), f"{type(e).__name__}: {e}")
+
+    return ProbeResult(OK, round((time.perf_counter() - started) * 1000, 2), extra=extra)
+
+
+def run_probes() -> dict[str, ProbeResult]:
+    """Run all probes in parallel; a probe over its timeout is reported without waiting for it."""
+    probes = _probes()
+    started = time.monotonic()
+    futures = {name: _executor.submit(_timed, *probe) for name, probe in probes.items()}
+
+    results = {}
+    for name, future in futures.items():
+        timeout = probes[name][2]
+        try:
+            results[name] = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+        except FutureTimeoutError:
+            results[name] = ProbeResult(TIMEOUT, None, f"No answer within {timeout} s")
+
+    return results
+
+
+def get_readiness_report() -> tuple[ReadinessReport, bool]:
+    """Return the latest report and whether it came from the per-process cache."""
+    global _report
+
+    max_age = _config().get("CACHE_SECONDS", 5)
+    report = _report
+    if report and time.monotonic() - report.monotonic < max_age:
+        return report, True
+
+    with _lock:
+        # Requests that waited for the lock reuse the report of the request that held it
+        report = _report
+        if report and time.monotonic() - report.monotonic < max_age:
+            return report, True
+
+        _report = ReadinessReport(run_probes(), datetime.now(timezone.utc), time.monotonic())
+        return _report, False
+
+
+def clear_readiness_report():
+    global _report
+    _report = None
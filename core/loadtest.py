@@ -0,0 +1,170 @@
+"""
+Closed-loop load test of the API.
+
+Worker threads send requests back to back for a fixed time, each over its own
+database connection, while a sampler counts the PostgreSQL connections that
+are idle in a transaction, i.e. hold a transaction open without running a
+query. Used by the run_load_test command.
+"""
+import statistics
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db import connection, connections
+
+
+IDLE_IN_TRANSACTION_SQL = (
+    "SELECT count(*) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND pid <> pg_backend_pid() "
+    "AND state IN ('idle in transaction', 'idle in transaction (aborted)')"
+)
+
+
+@dataclass
+class LoadResult:
+    name: str
+    threads: int
+    duration: float
+    latencies: list[float] = field(default_factory=list, repr=False)
+    errors: int = 0
+    # Connections idle in a transaction, one count per sample; empty off PostgreSQL
+    idle_samples: list[int] = field(default_factory=list, repr=False)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def percentile(self, percent: int) -> float | None:
+        if not self.latencies:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+    @property
+    def idle_in_transaction_mean(self) -> float | None:
+        return statistics.fmean(self.idle_samples) if self.idle_samples else None
+
+    @property
+    def idle_in_transaction_max(self) -> int | None:
+        return max(self.idle_samples) if self.idle_samples else None
+
+    def as_dict(self) -> dict:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "name": self.name,
+            "threads": self.threads,
+            "duration": round(self.duration, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput": round(self.throughput, 2),
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "idle_in_transaction_mean": self.idle_in_transaction_mean,
+            "idle_in_transaction_max": self.idle_in_transaction_max,
+        }
+
+
+class IdleInTransactionSampler(threading.Thread):
+    """Count the connections idle in a transaction every ``interval`` seconds until stopped."""
+
+    def __init__(self, interval: float = 0.05):
+        super().__init__(name="idle-in-transaction-sampler", daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self._stop_event.is_set():
+                    cursor.execute(IDLE_IN_TRANSACTION_SQL)
+                    self.samples.append(cursor.fetchone()[0])
+                    self._stop_event.wait(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self) -> list[int]:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def run_load(name: str, worker_factory: Callable, threads: int, duration: float) -> LoadResult:
+    """
+    Run ``threads`` workers for ``duration`` seconds.
+
+    ``worker_factory(number)`` is called in the worker thread and returns the
+    callable sending one request; it raises on an unexpected response.
+    """
+    result = LoadResult(name=name, threads=threads, duration=duration)
+    lock = threading.Lock()
+    clock = {}
+
+    def start_clock():
+        clock["started"] = time.perf_counter()
+        clock["deadline"] = clock["started"] + duration
+
+    # Workers set up their data before the clock starts
+    ready = threading.Barrier(threads + 1, action=start_clock)
+    failures = []
+
+    def work(number):
+        try:
+            try:
+                send = worker_factory(number)
+            except Exception as e:
+                failures.append(e)
+                ready.abort()
+                return
+
+            try:
+                ready.wait()
+            except threading.BrokenBarrierError:
+                return
+
+            latencies, errors = [], 0
+            while time.perf_counter() < clock["deadline"]:
+                started = time.perf_counter()
+                try:
+                    send()
+                except Exception:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+            with lock:
+                result.latencies.extend(latencies)
+                result.errors += errors
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=work, args=(number,), name=f"load-{number}") for number in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    sampler = IdleInTransactionSampler() if connection.vendor == "postgresql" else None
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        for worker in workers:
+            worker.join()
+        raise RuntimeError(f"Load test worker setup failed: {failures[0]!r}") from failures[0]
+
+    if sampler:
+        sampler.start()
+
+    for worker in workers:
+        worker.join()
+
+    result.duration = time.perf_counter() - clock["started"]
+    if sampler:
+        result.idle_samples = sampler.stop()
+
+    return result
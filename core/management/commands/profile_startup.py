@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import DEFERRED_MODULES, profile_startup
+
+
+class Command(BaseCommand):
+    help = "Reports per-module import time of django.setup() and URLconf loading (python -X importtime)"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=30,
+            help="Number of modules to show",
+        )
+        parser.add_argument(
+            "--sort",
+            choices=("cumulative", "self"),
+            default="cumulative",
+            help="Sort by cumulative import time (with submodules) or by the module's own time",
+        )
+        parser.add_argument(
+            "--top-level",
+            action="store_true",
+            help="Show only modules imported directly by the startup code",
+        )
+        parser.add_argument(
+            "--prefix",
+            help="Show only modules whose name starts with this prefix",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = profile_startup()
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        imports = profile.imports
+        if options["top_level"]:
+            imports = [timing for timing in imports if timing.depth == 0]
+        if options["prefix"]:
+            imports = [timing for timing in imports if timing.module.startswith(options["prefix"])]
+
+        sort_key = "cumulative_us" if options["sort"] == "cumulative" else "self_us"
+        imports = sorted(imports, key=lambda timing: getattr(timing, sort_key), reverse=True)[:options["limit"]]
+
+        self.stdout.write(
+            f"Startup: {profile.seconds * 1000:.0f} ms, "
+            f"max RSS {profile.max_rss_kb / 1024:.1f} MB, "
+            f"{len(profile.modules)} modules loaded"
+        )
+        self.stdout.write(f"{'self ms':>10} {'cumulative ms':>14}  module")
+        for timing in imports:
+            self.stdout.write(
+                f"{timing.self_us / 1000:>10.1f} {timing.cumulative_us / 1000:>14.1f}  "
+                f"{'  ' * timing.depth}{timing.module}"
+            )
+
+        loaded = [module for module in DEFERRED_MODULES if profile.loaded(module)]
+        if loaded:
+            self.stdout.write(self.style.WARNING(f"Deferred modules imported at startup: {', '.join(loaded)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No deferred modules imported at startup"))
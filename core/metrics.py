@@ -0,0 +1,113 @@
+"""
+Prometheus metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set, every gunicorn worker writes its samples to
+that directory and the /api/metrics/ endpoint aggregates them, so a scrape sees
+all workers, not just the one serving it.
+"""
+import os
+import resource
+from contextvars import ContextVar
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client import REGISTRY
+
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+EXPORT_ROWS_BUCKETS = (10, 100, 1_000, 10_000, 50_000, 100_000, 500_000)
+UPLOAD_SIZE_BUCKETS = (10_240, 102_400, 512_000, 1_048_576, 5_242_880, 10_485_760, 52_428_800)
+
+REQUEST_LATENCY = Histogram(
+    "mynorm_request_latency_seconds",
+    "Request latency by view and action",
+    ("view", "action", "method", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "mynorm_request_db_queries",
+    "Database queries per request by view and action",
+    ("view", "action"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "mynorm_cache_requests",
+    "Reads of the application caches by result (hit ratio = hit / (hit + miss))",
+    ("cache", "result"),
+)
+EXPORT_DURATION = Histogram(
+    "mynorm_export_duration_seconds",
+    "Duration of data exports",
+    ("export",),
+    buckets=LATENCY_BUCKETS,
+)
+EXPORT_ROWS = Histogram(
+    "mynorm_export_rows",
+    "Rows written by data exports",
+    ("export",),
+    buckets=EXPORT_ROWS_BUCKETS,
+)
+UPLOAD_SIZE = Histogram(
+    "mynorm_upload_size_bytes",
+    "Size of uploaded files",
+    ("kind",),
+    buckets=UPLOAD_SIZE_BUCKETS,
+)
+WORKER_MEMORY = Gauge(
+    "mynorm_worker_memory_bytes",
+    "Resident memory of each worker process",
+    multiprocess_mode="liveall",
+)
+
+_request_queries: ContextVar[list | None] = ContextVar("request_queries", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; counts queries of the current request."""
+    counter = _request_queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver."""
+    # Inserted first: temporary execute_wrapper() contexts pop from the end of the list
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def start_query_count():
+    counter = [0]
+    return counter, _request_queries.set(counter)
+
+
+def stop_query_count(token):
+    _request_queries.reset(token)
+
+
+def record_cache_read(cache_name: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache_name, result="hit" if hit else "miss").inc()
+
+
+def update_worker_memory():
+    try:
+        with open("/proc/self/statm") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    WORKER_MEMORY.set(rss)
+
+
+def render_metrics() -> bytes:
+    """Render metrics in the text exposition format, across workers when multiprocess mode is on."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry)
+
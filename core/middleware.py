@@ -0,0 +1,181 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from rest_framework.permissions import SAFE_METHODS
+
+from core import db_routers, metrics
+from core.profiling import instrument_serializers, profile_request
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """
+    Opt-in per-request profiling for the API (settings.REQUEST_PROFILING).
+
+    Adds a Server-Timing header with DB, cache, serializer and total time and
+    logs requests over budget together with their slowest SQL statements.
+    The middleware is sync-only: while enabled, async views run in the request
+    thread so their queries can be recorded.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, "REQUEST_PROFILING", {})
+        if not config.get("ENABLED"):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.path_prefixes = tuple(config.get("PATH_PREFIXES", ()))
+        self.budgets = config.get("BUDGETS", {})
+        self.slow_sql_limit = config.get("SLOW_SQL_LIMIT", 5)
+        instrument_serializers()
+
+    def __call__(self, request):
+        if not request.path.startswith(self.path_prefixes):
+            return self.get_response(request)
+
+        with profile_request() as profile:
+            response = self.get_response(request)
+
+        response["Server-Timing"] = profile.server_timing()
+
+        exceeded = self._exceeded_budgets(profile)
+        if exceeded:
+            slow_sql = "\n".join(
+                f"  {query.duration * 1000:.1f} ms [{query.alias}] {query.sql}"
+                for query in profile.slowest_queries(self.slow_sql_limit)
+            )
+            logger.warning(
+                "Slow request %s %s (%s): %s\nSlowest SQL:\n%s",
+                request.method,
+                request.get_full_path(),
+                ", ".join(exceeded),
+                profile.server_timing(),
+                slow_sql or "  none",
+            )
+
+        return response
+
+    def _exceeded_budgets(self, profile) -> list[str]:
+        measured = {
+            "total_ms": profile.total_time * 1000,
+            "db_ms": profile.db_time * 1000,
+            "db_queries": len(profile.queries),
+            "cache_ms": profile.cache_time * 1000,
+            "serializer_ms": profile.serializer_time * 1000,
+        }
+        return [
+            f"{name} {measured[name]:.0f} > {budget}"
+            for name, budget in self.budgets.items()
+            if name in measured and measured[name] > budget
+        ]
+
+
+class MetricsMiddleware:
+    """
+    Records Prometheus request latency and DB query count by view and action,
+    and the worker memory. Works for both sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        counter, token = metrics.start_query_count()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop_query_count(token)
+
+        self._record(request, response, time.perf_counter() - started, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        counter, token = metrics.start_query_count()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop_query_count(token)
+
+        self._record(request, response, time.perf_counter() - started, counter[0])
+        return response
+
+    @staticmethod
+    def _record(request, response, duration, query_count):
+        match = request.resolver_match
+        if match is None:
+            view, action = "<unresolved>", ""
+        else:
+            view = match.view_name
+            action = getattr(match.func, "actions", {}).get(request.method.lower(), "")
+
+        metrics.REQUEST_LATENCY.labels(
+            view=view, action=action, method=request.method, status=response.status_code
+        ).observe(duration)
+        metrics.REQUEST_DB_QUERIES.labels(view=view, action=action).observe(query_count)
+        metrics.update_worker_memory()
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scopes the read replica routing of core.db_routers to the request and, after
+    a successful write by an authenticated user, keeps that user's reads on the
+    primary for READ_REPLICAS["STICKY_SECONDS"].
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = db_routers.start_request_routing()
+        try:
+            response = self.get_response(request)
+        finally:
+            db_routers.stop_request_routing(token)
+
+        self._pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = db_routers.start_request_routing()
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_routers.stop_request_routing(token)
+
+        if request.method not in SAFE_METHODS:
+            await sync_to_async(self._pin_writer)(request, response)
+        return response
+
+    @staticmethod
+    def _pin_writer(request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+
+        # DRF stores the user it authenticated (JWT) on the Django request
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            db_routers.pin_to_primary(user)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-19 19:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_classifier_options_alter_organization_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='App label and model name', max_length=100, verbose_name='model')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='object id')),
+                ('deleted_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='deleted date')),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'indexes': [models.Index(fields=['deleted_date'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
@@ -14,6 +14,18 @@ class CreatedUpdatedDateMixin(models.Model):
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        # Every update of an existing row moves updated_date, including saves limited to some fields
+        update_fields = kwargs.get("update_fields")
+        if not self._state.adding and not args:
+            if update_fields is None:
+                self.updated_date = timezone.now()
+            elif update_fields and "updated_date" not in update_fields:
+                self.updated_date = timezone.now()
+                kwargs["update_fields"] = [*update_fields, "updated_date"]
+
+        super().save(*args, **kwargs)
+
 
 class CreatedUpdatedByMixin(models.Model):
     created_by = models.ForeignKey(
@@ -76,3 +88,67 @@ class VerifiedMixin(models.Model):
 
     class Meta:
         abstract = True
+
+
+class ChangedFieldsMixin(models.Model):
+    """
+    Tracks field values loaded from the database.
+    save() on an existing row writes only the fields that changed since it was loaded.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    @property
+    def changed_fields(self) -> list[str]:
+        loaded_values = getattr(self, "_loaded_values", None)
+        if loaded_values is None:
+            return []
+
+        changed_fields = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key:
+                continue
+
+            if field.attname in loaded_values:
+                if getattr(self, field.attname) != loaded_values[field.attname]:
+                    changed_fields.append(field.name)
+            elif field.attname in self.__dict__:
+                # Deferred field assigned after loading
+                changed_fields.append(field.name)
+
+        return changed_fields
+
+    def save(self, *args, **kwargs):
+        is_tracked_update = (
+            not self._state.adding
+            and hasattr(self, "_loaded_values")
+            and not args
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        )
+        if is_tracked_update:
+            kwargs["update_fields"] = self.changed_fields
+
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or not hasattr(self, "_loaded_values"):
+            self._loaded_values = {
+                field.attname: getattr(self, field.attname)
+                for field in self._meta.concrete_fields
+                if field.attname in self.__dict__
+            }
+        else:
+            if update_fields and isinstance(self, CreatedUpdatedDateMixin):
+                # Saved along with the changes, see CreatedUpdatedDateMixin.save
+                update_fields = [*update_fields, "updated_date"]
+            for field_name in update_fields:
+                field = self._meta.get_field(field_name)
+                self._loaded_values[field.attname] = getattr(self, field.attname)
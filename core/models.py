@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from core.model_mixins import CreatedUpdatedMixin
@@ -44,3 +45,21 @@ class Classifier(CreatedUpdatedMixin):
     class Meta:
         verbose_name = _("Classifier")
         verbose_name_plural = _("Classifiers")
+
+
+class Tombstone(models.Model):
+    """Deletion of an object synced to the mobile clients, see analytics.sync."""
+
+    model = models.CharField(verbose_name=_("model"), max_length=100, help_text=_("App label and model name"))
+    object_id = models.PositiveBigIntegerField(verbose_name=_("object id"))
+    deleted_date = models.DateTimeField(verbose_name=_("deleted date"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Tombstone")
+        verbose_name_plural = _("Tombstones")
+        indexes = [
+            models.Index(fields=["deleted_date"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
@@ -1,3 +1,6 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from rest_framework import pagination
 from rest_framework.response import Response
 
@@ -24,3 +27,34 @@ class CustomPagination(pagination.PageNumberPagination):
                 "count": 0,
             }
         )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables.
+    Unfiltered querysets take the row count from PostgreSQL planner statistics
+    instead of running an exact COUNT(*); small or filtered querysets are counted exactly.
+    """
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        query = getattr(object_list, "query", None)
+
+        if query is not None and not query.where and connections[object_list.db].vendor == "postgresql":
+            estimated_count = self._get_estimated_count()
+            if estimated_count > self.exact_count_threshold:
+                return estimated_count
+
+        return super().count
+
+    def _get_estimated_count(self) -> int:
+        with connections[self.object_list.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.object_list.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        return row[0] if row else 0
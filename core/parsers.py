@@ -0,0 +1,56 @@
+import codecs
+import struct
+
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser, get_encoding
+
+from core.renderers import POINT_EXT_TYPE, POINT_FORMAT, MessagePackRenderer, ORJSONRenderer
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser with orjson; NaN and infinity are rejected, as by JSONParser with STRICT_JSON."""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = get_encoding(parser_context or {})
+        data = stream.read()
+
+        try:
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+            return orjson.loads(data)
+        except (orjson.JSONDecodeError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+def _ext_hook(code: int, data: bytes):
+    if code == POINT_EXT_TYPE:
+        try:
+            longitude, latitude = struct.unpack(POINT_FORMAT, data)
+        except struct.error as exc:
+            raise ValueError(f"Invalid point extension: {exc}")
+        return {"type": "Point", "coordinates": [longitude, latitude]}
+
+    raise ValueError(f"Unknown extension type {code}")
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parse ``application/msgpack`` request bodies.
+
+    Timestamps become aware UTC datetimes and point extensions GeoJSON
+    points, as sent by MessagePackRenderer; DateTimeField and GeometryField
+    accept both.
+    """
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3, ext_hook=_ext_hook)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission, IsAuthenticated, DjangoObjectPermissions, DjangoModelPermissions
 
+from core.authentication import MetricsTokenAuthentication
+from users.cache import get_user_group_names
 from users.signals import ConstantGroups
 
 
@@ -22,7 +24,7 @@ class IsSupervisorGroup(IsAuthenticated, BasePermission):
         if not super().has_permission(request, view):
             return False
         
-        return request.user.groups.filter(name=ConstantGroups.SUPERVISOR).exists()
+        return ConstantGroups.SUPERVISOR in get_user_group_names(request.user)
 
 
 class IsWorkerGroup(IsAuthenticated, BasePermission):
@@ -35,7 +37,7 @@ class IsWorkerGroup(IsAuthenticated, BasePermission):
         if not super().has_permission(request, view):
             return False
 
-        return request.user.groups.filter(name=ConstantGroups.WORKER).exists()
+        return ConstantGroups.WORKER in get_user_group_names(request.user)
 
 class CustomDjangoModelPermissions(DjangoModelPermissions):
     perms_map = {
@@ -47,3 +49,15 @@ class CustomDjangoModelPermissions(DjangoModelPermissions):
         'PATCH': ['%(app_label)s.change_%(model_name)s'],
         'DELETE': ['%(app_label)s.delete_%(model_name)s'],
     }
+
+
+class IsMetricsScraper(BasePermission):
+    """
+    Allow the metrics scraper (METRICS_TOKEN) and staff users.
+    """
+
+    def has_permission(self, request, view):
+        if isinstance(request.successful_authenticator, MetricsTokenAuthentication):
+            return True
+
+        return bool(request.user and request.user.is_authenticated and request.user.is_staff)
@@ -0,0 +1,172 @@
+"""
+Per-request profiling of database, cache and serializer time.
+Used by core.middleware.RequestProfilingMiddleware.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+
+_current_profile: ContextVar["RequestProfile | None"] = ContextVar("request_profile", default=None)
+_MISS = object()
+
+
+@dataclass
+class QueryTiming:
+    sql: str
+    duration: float
+    alias: str
+
+
+@dataclass
+class RequestProfile:
+    queries: list[QueryTiming] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_calls: int = 0
+    cache_time: float = 0.0
+    serializer_time: float = 0.0
+    total_time: float = 0.0
+    _serializer_depth: int = 0
+    _cache_depth: int = 0
+
+    @property
+    def db_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def slowest_queries(self, limit: int) -> list[QueryTiming]:
+        return sorted(self.queries, key=lambda query: query.duration, reverse=True)[:limit]
+
+    def server_timing(self) -> str:
+        """Format the profile as a Server-Timing header value (durations in ms)."""
+        metrics = (
+            ("db", self.db_time, f"{len(self.queries)} queries"),
+            ("cache", self.cache_time, f"{self.cache_hits} hits, {self.cache_misses} misses"),
+            ("serializer", self.serializer_time, None),
+            ("total", self.total_time, None),
+        )
+        return ", ".join(
+            f'{name};dur={duration * 1000:.1f}' + (f';desc="{description}"' if description else "")
+            for name, duration, description in metrics
+        )
+
+
+def get_current_profile() -> RequestProfile | None:
+    return _current_profile.get()
+
+
+class _QueryRecorder:
+    """connection.execute_wrapper() hook that records statement durations."""
+
+    def __init__(self, profile: RequestProfile, alias: str):
+        self.profile = profile
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.profile.queries.append(QueryTiming(sql, time.perf_counter() - started, self.alias))
+
+
+def _instrument_cache(cache, profile: RequestProfile, stack: ExitStack):
+    """Wrap the cache instance methods for this request; the instances are per request context."""
+
+    def timed(name, record):
+        original = getattr(cache, name)
+
+        def wrapper(*args, **kwargs):
+            # Backends implement some calls on top of others (get_many via get); count the outer one
+            if profile._cache_depth:
+                return original(*args, **kwargs)
+
+            profile._cache_depth += 1
+            started = time.perf_counter()
+            try:
+                return record(original, *args, **kwargs)
+            finally:
+                profile._cache_depth -= 1
+                profile.cache_calls += 1
+                profile.cache_time += time.perf_counter() - started
+
+        setattr(cache, name, wrapper)
+        stack.callback(cache.__dict__.pop, name, None)
+
+    def record_get(original, key, default=None, *args, **kwargs):
+        value = original(key, _MISS, *args, **kwargs)
+        if value is _MISS:
+            profile.cache_misses += 1
+            return default
+
+        profile.cache_hits += 1
+        return value
+
+    def record_get_many(original, keys, *args, **kwargs):
+        keys = list(keys)
+        values = original(keys, *args, **kwargs)
+        profile.cache_hits += len(values)
+        profile.cache_misses += len(keys) - len(values)
+        return values
+
+    def record_call(original, *args, **kwargs):
+        return original(*args, **kwargs)
+
+    timed("get", record_get)
+    timed("get_many", record_get_many)
+    for name in ("set", "add", "delete", "set_many", "delete_many", "incr", "decr", "touch", "has_key"):
+        timed(name, record_call)
+
+
+def _timed_data_property(prop):
+    def getter(serializer):
+        profile = get_current_profile()
+        if profile is None:
+            return prop.fget(serializer)
+
+        profile._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return prop.fget(serializer)
+        finally:
+            profile._serializer_depth -= 1
+            if not profile._serializer_depth:
+                profile.serializer_time += time.perf_counter() - started
+
+    getter._profiled = True
+    return property(getter)
+
+
+def instrument_serializers():
+    """Time serializer.data; a no-op outside profiled requests."""
+    from rest_framework import serializers
+
+    for serializer_class in (serializers.BaseSerializer, serializers.Serializer, serializers.ListSerializer):
+        prop = serializer_class.__dict__["data"]
+        if not getattr(prop.fget, "_profiled", False):
+            serializer_class.data = _timed_data_property(prop)
+
+
+@contextmanager
+def profile_request():
+    """Record database and cache activity of the current request."""
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    started = time.perf_counter()
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(_QueryRecorder(profile, alias)))
+        for alias in settings.CACHES:
+            _instrument_cache(caches[alias], profile, stack)
+
+        try:
+            yield profile
+        finally:
+            profile.total_time = time.perf_counter() - started
+            _current_profile.reset(token)
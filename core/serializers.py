@@ -1,6 +1,23 @@
 from rest_framework import serializers
 
 from core.models import Organization, Classifier
+from core.renderers import MessagePackRenderer
+
+
+class DateTimeField(serializers.DateTimeField):
+    """
+    DateTimeField that leaves the datetime itself to MessagePack responses.
+
+    MessagePackRenderer packs aware datetimes as Timestamps, so only real
+    datetime fields are sent compactly; JSON gets the ISO 8601 string as before.
+    Model serializers map DateTimeField to it, see CoreConfig.ready().
+    """
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        if value and isinstance(getattr(request, "accepted_renderer", None), MessagePackRenderer):
+            return self.enforce_timezone(value)
+        return super().to_representation(value)
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
@@ -0,0 +1,103 @@
+"""
+Import-time profiling of worker startup.
+A fresh interpreter runs django.setup() and loads the URLconf, the same work a
+gunicorn worker or a management command does before serving anything.
+"""
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+
+
+# Modules that must only be imported on first use (e.g. by the supervision export)
+DEFERRED_MODULES = ("pandas", "openpyxl")
+
+STARTUP_SCRIPT = """
+import json
+import resource
+import sys
+import time
+
+started = time.perf_counter()
+
+import django
+django.setup()
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class StartupProfile:
+    seconds: float
+    max_rss_kb: int
+    modules: list[str]
+    imports: list[ImportTiming] = field(default_factory=list)
+
+    def loaded(self, module: str) -> bool:
+        return module in self.modules
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the stderr of ``python -X importtime``."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append(
+            ImportTiming(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(name.lstrip()) - 1) // 2,
+            )
+        )
+
+    return timings
+
+
+def profile_startup(settings_module: str | None = None, importtime: bool = True) -> StartupProfile:
+    """Run django.setup() and URLconf loading in a new interpreter and measure it."""
+    env = os.environ.copy()
+    if settings_module:
+        env["DJANGO_SETTINGS_MODULE"] = settings_module
+
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+
+    completed = subprocess.run(
+        command + ["-c", STARTUP_SCRIPT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Startup failed:\n{completed.stderr[-4000:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return StartupProfile(
+        seconds=result["seconds"],
+        max_rss_kb=result["max_rss_kb"],
+        modules=result["modules"],
+        imports=parse_importtime(completed.stderr) if importtime else [],
+    )
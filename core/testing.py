@@ -0,0 +1,59 @@
+"""
+Test helpers for query-count regression tests.
+A failing assertion lists the captured SQL, so an N+1 shows up in the test output.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(queries: list[dict]) -> str:
+    return "\n".join(f"{number}. {query['sql']}" for number, query in enumerate(queries, 1))
+
+
+class QueryCountTestMixin:
+    """
+    Mixin for TestCase classes that call API endpoints through ``self.client``.
+    """
+
+    query_count_database = DEFAULT_DB_ALIAS
+
+    def capture_request_queries(self, method: str, url: str, status_code: int = 200, **kwargs) -> list[dict]:
+        """Send a request and return the queries it ran."""
+        with CaptureQueriesContext(connections[self.query_count_database]) as context:
+            response = getattr(self.client, method)(url, **kwargs)
+
+        self.assertEqual(
+            response.status_code,
+            status_code,
+            f"{method.upper()} {url}: {getattr(response, 'data', response.content)}",
+        )
+        return context.captured_queries
+
+    def assertMaxRequestQueries(self, max_queries: int, method: str, url: str, status_code: int = 200, **kwargs):
+        """Test that a request runs at most ``max_queries`` queries."""
+        queries = self.capture_request_queries(method, url, status_code, **kwargs)
+        if len(queries) > max_queries:
+            self.fail(
+                f"{method.upper()} {url} ran {len(queries)} queries, expected at most {max_queries}:\n"
+                f"{format_queries(queries)}"
+            )
+
+        return queries
+
+    def assertConstantRequestQueries(self, max_queries: int, url: str, grow, **kwargs):
+        """
+        Test that a GET request runs the same bounded number of queries before
+        and after ``grow()`` adds rows to its result.
+        """
+        # Warm up the caches (permissions, settings) so that both runs see the same state
+        self.capture_request_queries("get", url, **kwargs)
+
+        before = self.assertMaxRequestQueries(max_queries, "get", url, **kwargs)
+        grow()
+        after = self.assertMaxRequestQueries(max_queries, "get", url, **kwargs)
+
+        if len(before) != len(after):
+            self.fail(
+                f"GET {url} ran {len(before)} queries, then {len(after)} after adding rows:\n"
+                f"{format_queries(after)}"
+            )
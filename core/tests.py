@@ -1,3 +1,690 @@
-from django.test import TestCase
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import msgpack
+from django.contrib.gis.geos import Point
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from prometheus_client import REGISTRY
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet
+
+from analytics.models import Supervision
+from app_settings.utils import clear_settings_cache, get_app_settings
+from app_settings.views import AppSettingViewSet
+from core.benchmarking import Benchmark, BenchmarkResult, compare, get_benchmarks, run_benchmark
+from core import db_routers, health
+from core.checks import check_duplicate_middleware
+from core.db_routers import ReplicaRouter
+from core.models import Classifier, Organization, Tombstone
+from core.parsers import MessagePackParser, ORJSONParser
+from core.profiling import profile_request
+from core.renderers import POINT_EXT_TYPE, MessagePackRenderer, ORJSONRenderer
+from core.startup import DEFERRED_MODULES, parse_importtime, profile_startup
+from core.testing import QueryCountTestMixin
+from core.views import OrganizationListView
+from core.view_mixins import AsyncDispatchMixin
+from layouts.models import Layout
+from users.models import User
+
+
+REPLICA_SETTINGS = {"ALIASES": ["replica"], "STICKY_SECONDS": 10}
+
+PROFILING_SETTINGS = {
+    "ENABLED": True,
+    "PATH_PREFIXES": ("/api/users/",),
+    "BUDGETS": {"db_queries": 0},
+    "SLOW_SQL_LIMIT": 2,
+}
+
+
+class StartupBudgetTestCase(SimpleTestCase):
+    """Test that worker startup stays within its import-time budget."""
+
+    # Generous ceilings: they catch a heavy dependency imported at module level, not jitter
+    STARTUP_SECONDS_BUDGET = 5.0
+    STARTUP_RSS_MB_BUDGET = 250
+
+    @classmethod
+    def setUpClass(cls):
+        """Profile django.setup() and URLconf loading once for all tests."""
+        super().setUpClass()
+        cls.profile = profile_startup(importtime=False)
+
+    def test_deferred_modules_not_imported(self):
+        """Test that heavy modules are not imported by django.setup() or the URLconf."""
+        for module in DEFERRED_MODULES:
+            self.assertFalse(self.profile.loaded(module), f"{module} is imported at startup")
+
+    def test_startup_time_within_budget(self):
+        """Test that django.setup() and URLconf loading stay within the time budget."""
+        self.assertLess(self.profile.seconds, self.STARTUP_SECONDS_BUDGET)
+
+    def test_startup_memory_within_budget(self):
+        """Test that django.setup() and URLconf loading stay within the memory budget."""
+        self.assertLess(self.profile.max_rss_kb / 1024, self.STARTUP_RSS_MB_BUDGET)
+
+    def test_parse_importtime(self):
+        """Test that python -X importtime output is parsed into timings with depth."""
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     encodings.aliases",
+            "import time:       300 |        420 |   encodings",
+            "import time:        50 |        470 | site",
+        ])
+
+        timings = parse_importtime(output)
+
+        self.assertEqual([timing.module for timing in timings], ["encodings.aliases", "encodings", "site"])
+        self.assertEqual([timing.depth for timing in timings], [2, 1, 0])
+        self.assertEqual(timings[1].self_us, 300)
+        self.assertEqual(timings[1].cumulative_us, 420)
+
+
+@override_settings(REQUEST_PROFILING=PROFILING_SETTINGS)
+class RequestProfilingMiddlewareTestCase(TestCase):
+    """Test cases for RequestProfilingMiddleware."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(username="admin", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_server_timing_header(self):
+        """Test that profiled API responses carry DB, cache, serializer and total timings."""
+        cache.get("profiling-test-key")
+
+        with self.assertLogs("core.middleware", "WARNING") as logs:
+            response = self.client.get(reverse("user"))
+
+        self.assertEqual(response.status_code, 200)
+        server_timing = response["Server-Timing"]
+        for metric in ("db;dur=", "cache;dur=", "serializer;dur=", "total;dur="):
+            self.assertIn(metric, server_timing)
+        self.assertRegex(server_timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("db_queries", logs.output[0])
+        self.assertIn("Slowest SQL", logs.output[0])
+
+    def test_cache_hits_and_misses(self):
+        """Test that cache reads made while profiling are counted and timed."""
+        cache.set("profiling-hit", 1)
+        cache.delete("profiling-miss")
+
+        with profile_request() as profile:
+            self.assertEqual(cache.get("profiling-hit"), 1)
+            self.assertEqual(cache.get("profiling-miss", "default"), "default")
+            self.assertEqual(cache.get_many(["profiling-hit", "profiling-miss"]), {"profiling-hit": 1})
+
+        self.assertEqual((profile.cache_hits, profile.cache_misses, profile.cache_calls), (2, 2, 3))
+        self.assertEqual(cache.get("profiling-miss", "default"), "default")
+        self.assertNotIn("get", cache.__dict__)
+
+    def test_other_paths_are_not_profiled(self):
+        """Test that requests outside the configured prefixes get no header."""
+        response = self.client.get(reverse("health_check"))
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(REQUEST_PROFILING={"ENABLED": False})
+    def test_disabled_by_default(self):
+        """Test that the middleware is skipped when profiling is disabled."""
+        response = self.client.get(reverse("user"))
+
+        self.assertNotIn("Server-Timing", response)
+
+
+class DuplicateMiddlewareCheckTestCase(SimpleTestCase):
+    """Test cases for the duplicated middleware system check."""
+
+    def test_settings_have_no_duplicates(self):
+        """Test that the project MIDDLEWARE has no duplicated entries."""
+        self.assertEqual(check_duplicate_middleware(None), [])
+
+    @override_settings(MIDDLEWARE=[
+        "django.middleware.common.CommonMiddleware",
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ])
+    def test_duplicated_entry_is_reported(self):
+        """Test that a middleware listed twice is reported once as core.W001."""
+        warnings = check_duplicate_middleware(None)
+
+        self.assertEqual(len(warnings), 1)
+        self.assertEqual(warnings[0].id, "core.W001")
+        self.assertIn("django.middleware.common.CommonMiddleware", warnings[0].msg)
+
+
+class MetricsTestCase(TestCase):
+    """Test cases for the Prometheus metrics endpoint and request metrics."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.staff = User.objects.create_superuser(username="admin", password="password")
+        self.user = User.objects.create_user(username="worker", password="password")
+        self.client = APIClient()
+        self.url = reverse("metrics")
+
+    def _sample(self, name, labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_endpoint_requires_staff_or_token(self):
+        """Test that metrics are served to staff users and the scraper token only."""
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.force_authenticate(self.staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"mynorm_request_latency_seconds", response.content)
+
+    @override_settings(METRICS_TOKEN="scraper-secret")
+    def test_endpoint_accepts_metrics_token(self):
+        """Test that the scraper bearer token grants access and a wrong one does not."""
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer scraper-secret")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, 401)
+
+    def test_request_latency_and_queries_by_view_and_action(self):
+        """Test that requests are recorded with their view, action and query count."""
+        labels = {"view": "user", "action": "list"}
+        latency_labels = {**labels, "method": "GET", "status": "200"}
+        requests_before = self._sample("mynorm_request_latency_seconds_count", latency_labels)
+        queries_before = self._sample("mynorm_request_db_queries_sum", labels)
+
+        self.client.force_authenticate(self.staff)
+        self.assertEqual(self.client.get(reverse("user")).status_code, 200)
+
+        self.assertEqual(self._sample("mynorm_request_latency_seconds_count", latency_labels), requests_before + 1)
+        self.assertGreater(self._sample("mynorm_request_db_queries_sum", labels), queries_before)
+        self.assertGreater(self._sample("mynorm_worker_memory_bytes", {}), 0)
+
+    def test_settings_cache_reads_are_counted(self):
+        """Test that app settings cache reads are counted as hits and misses."""
+        clear_settings_cache()
+        misses_before = self._sample("mynorm_cache_requests_total", {"cache": "app_settings", "result": "miss"})
+        hits_before = self._sample("mynorm_cache_requests_total", {"cache": "app_settings", "result": "hit"})
+
+        get_app_settings()
+        get_app_settings()
+
+        self.assertEqual(
+            self._sample("mynorm_cache_requests_total", {"cache": "app_settings", "result": "miss"}),
+            misses_before + 1,
+        )
+        self.assertEqual(
+            self._sample("mynorm_cache_requests_total", {"cache": "app_settings", "result": "hit"}),
+            hits_before + 1,
+        )
+
+
+class CoreQueryCountTestCase(QueryCountTestMixin, TestCase):
+    """Test that the organization and classifier endpoints run a bounded number of queries."""
+
+    MAX_QUERIES = 3
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(username="admin", email="admin@test.com", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="0" * 18, name="Test classifier")
+
+    def _create_rows(self, count=5):
+        for _ in range(count):
+            number = Organization.objects.count()
+            Organization.objects.create(name=f"Org {number}")
+            Classifier.objects.create(code=str(number).zfill(18), name=f"Classifier {number}")
+
+    def test_list_endpoints(self):
+        """Test that the organization and classifier lists do not query per row."""
+        for url_name in ("organization_list", "classifier_list"):
+            self.assertConstantRequestQueries(self.MAX_QUERIES, reverse(url_name), self._create_rows)
+
+    def test_detail_endpoints(self):
+        """Test that the organization and classifier details run a fixed number of queries."""
+        self.assertConstantRequestQueries(
+            self.MAX_QUERIES, reverse("organization_detail", args=[self.organization.pk]), self._create_rows
+        )
+        self.assertConstantRequestQueries(
+            self.MAX_QUERIES, reverse("classifier_detail", args=[self.classifier.pk]), self._create_rows
+        )
+
+
+class BenchmarkHarnessTestCase(SimpleTestCase):
+    """Test cases for the benchmark harness."""
+
+    def test_benchmarks_are_discovered(self):
+        """Test that the app benchmark modules are registered."""
+        names = {registered.name for registered in get_benchmarks()}
+
+        self.assertTrue({"supervision_list", "layout_fetch", "timedelta_to_str"} <= names)
+
+    def test_run_benchmark_reports_timings_and_extra(self):
+        """Test that every round is timed and dict results are reported."""
+        calls = []
+        registered = Benchmark(
+            name="dummy",
+            setup=lambda context: lambda: calls.append(context) or {"rows": len(calls)},
+            rounds=5,
+            warmup=2,
+            number=3,
+        )
+
+        result = run_benchmark(registered, "context")
+
+        self.assertEqual(len(calls), 2 + 5 * 3)
+        self.assertEqual(result.rounds, 5)
+        self.assertEqual(result.extra, {"rows": 17})
+        self.assertTrue(result.min <= result.median <= result.p95)
+
+    def test_compare_with_baseline(self):
+        """Test that the median is compared with the baseline median."""
+        result = BenchmarkResult("dummy", rounds=1, number=1, min=0.1, median=0.12, mean=0.12, p95=0.2, stdev=0)
+        new = BenchmarkResult("new", rounds=1, number=1, min=0.1, median=0.1, mean=0.1, p95=0.1, stdev=0)
+
+        comparisons = compare([result, new], {"benchmarks": {"dummy": {"median": 0.1}}})
+
+        self.assertAlmostEqual(comparisons[0].change, 0.2)
+        self.assertIsNone(comparisons[1].change)
+
+
+class ReadinessCheckTestCase(TestCase):
+    """Test cases for the readiness endpoint and its dependency probes."""
+
+    def setUp(self):
+        """Set up test data."""
+        health.clear_readiness_report()
+        self.addCleanup(health.clear_readiness_report)
+        self.url = reverse("readiness_check")
+
+    def test_all_dependencies_ready(self):
+        """Test that every database, cache and the storage are probed with their latency."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+        checks = response.json()["checks"]
+        self.assertEqual(set(checks), {"database:default", "cache:default", "storage:default"})
+        for check in checks.values():
+            self.assertEqual(check["status"], "ok")
+            self.assertIsInstance(check["latency_ms"], float)
+
+    def test_probe_results_are_cached(self):
+        """Test that repeated requests within the cache window do not probe again."""
+        with mock.patch("core.health.run_probes", wraps=health.run_probes) as run_probes:
+            self.assertFalse(self.client.get(self.url).json()["cached"])
+            self.assertTrue(self.client.get(self.url).json()["cached"])
+
+        self.assertEqual(run_probes.call_count, 1)
+
+    @skipUnless(connection.vendor == "postgresql", "statement_timeout is a PostgreSQL setting")
+    def test_database_probe_does_not_leave_its_timeout(self):
+        """Test that the statement timeout of the probe does not stay on the connection after the probe."""
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW statement_timeout")
+            default_timeout = cursor.fetchone()[0]
+
+        def probe_and_show():
+            probe_connection = connections["default"]
+            # A pooled connection outlives close(); keep the session open to look at it after the probe
+            with mock.patch.object(probe_connection, "close"):
+                health.probe_database("default", 0.5)
+                with probe_connection.cursor() as cursor:
+                    cursor.execute("SHOW statement_timeout")
+                    timeout = cursor.fetchone()[0]
+            probe_connection.close()
+            return timeout
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(executor.submit(probe_and_show).result(), default_timeout)
+
+    def test_served_with_atomic_requests(self):
+        """Test that the async readiness view is not made atomic, which Django refuses."""
+        with mock.patch.dict(connections.settings["default"], {"ATOMIC_REQUESTS": True}):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}})
+    def test_unreachable_cache_fails(self):
+        """Test that a cache that does not keep values makes the instance unavailable."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["cache:default"]["status"], "error")
+        self.assertEqual(response.json()["checks"]["database:default"]["status"], "ok")
+
+    @override_settings(HEALTH_CHECK={"TIMEOUTS": {"storage": 0.05}})
+    def test_slow_dependency_times_out(self):
+        """Test that a probe over its timeout is reported without waiting for it."""
+        with mock.patch("core.health.probe_storage", side_effect=lambda alias, timeout: time.sleep(0.5) or {}):
+            started = time.perf_counter()
+            response = self.client.get(self.url)
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["storage:default"]["status"], "timeout")
+
+
+@override_settings(READ_REPLICAS=REPLICA_SETTINGS)
+class ReplicaRoutingTestCase(TestCase):
+    """Test cases for the routing of safe reads to the read replicas."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_superuser(username="admin", password="password")
+        self.other_user = User.objects.create_superuser(username="other", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Organization.objects.create(name="Test Org")
+
+    def _routed_reads(self, method, url, **kwargs) -> list:
+        """Run the request and return the aliases its reads were routed to; the queries still run on default."""
+        routed = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            routed.append(db_for_read(router, model, **hints))
+            return None
+
+        with mock.patch.object(ReplicaRouter, "db_for_read", record):
+            response = getattr(self.client, method)(url, **kwargs)
+
+        self.assertLess(response.status_code, 500)
+        return routed
+
+    def test_safe_reads_use_replica(self):
+        """Test that list, retrieve and async list actions read from a replica."""
+        organization = Organization.objects.get()
+        for url in (
+            reverse("organization_list"),
+            reverse("organization_detail", args=[organization.pk]),
+            f"{reverse('layout-list')}?supervision_id=0",
+        ):
+            self.assertIn("replica", self._routed_reads("get", url), url)
+
+        self.assertIsNone(db_routers.get_read_alias())
+
+    def test_actions_not_listed_stay_on_primary(self):
+        """Test that views and actions without the replica policy read from the primary."""
+        routed = self._routed_reads("get", reverse("user_last_active_supervision"))
+
+        self.assertTrue(routed)
+        self.assertNotIn("replica", routed)
+
+    def test_write_pins_user_to_primary(self):
+        """Test that after a write the user reads from the primary and other users do not."""
+        routed = self._routed_reads(
+            "post", reverse("app-settings-update-current"), data={"hide_failure_btn": True}, format="json"
+        )
+        self.assertNotIn("replica", routed)
+
+        self.assertNotIn("replica", self._routed_reads("get", reverse("organization_list")))
+
+        self.client.force_authenticate(self.other_user)
+        self.assertIn("replica", self._routed_reads("get", reverse("organization_list")))
+
+    def test_failed_write_does_not_pin_user(self):
+        """Test that a rejected write keeps the user on the replicas."""
+        self._routed_reads("post", reverse("app-settings-update-current"), data={"hide_failure_btn": "x"}, format="json")
+
+        self.assertIn("replica", self._routed_reads("get", reverse("organization_list")))
+
+    @override_settings(READ_REPLICAS={"ALIASES": [], "STICKY_SECONDS": 10})
+    def test_without_replicas_reads_use_primary(self):
+        """Test that without configured replicas nothing is routed away from the primary."""
+        routed = self._routed_reads("get", reverse("organization_list"))
+
+        self.assertEqual(set(routed), {None})
+
+    def test_writes_and_migrations_use_primary(self):
+        """Test that the router sends writes to the primary and never migrates a replica."""
+        router = ReplicaRouter()
+
+        self.assertEqual(router.db_for_write(Organization), "default")
+        self.assertFalse(router.allow_migrate("replica", "core"))
+        self.assertIsNone(router.allow_migrate("default", "core"))
+
+
+class AtomicWritesTestCase(TestCase):
+    """Test cases for the per-method transaction policy of the API views."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(username="admin", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Production settings; the test database does not use ATOMIC_REQUESTS
+        atomic_requests = mock.patch.dict(connections.settings["default"], {"ATOMIC_REQUESTS": True})
+        atomic_requests.start()
+        self.addCleanup(atomic_requests.stop)
+
+    def _handler_atomic_depth(self, view_class, handler, method, url, **kwargs) -> int:
+        """Return how many more atomic blocks are open in the handler than in the test."""
+        depths = []
+        original = getattr(view_class, handler)
+
+        def record(view, *args, **handler_kwargs):
+            depths.append(len(connection.atomic_blocks))
+            return original(view, *args, **handler_kwargs)
+
+        with mock.patch.object(view_class, handler, record):
+            response = getattr(self.client, method)(url, **kwargs)
+
+        self.assertLess(response.status_code, 400)
+        return depths[0] - len(connection.atomic_blocks)
+
+    def test_reads_run_in_autocommit(self):
+        """Test that a safe request is not wrapped in a transaction."""
+        depth = self._handler_atomic_depth(OrganizationListView, "list", "get", reverse("organization_list"))
+
+        self.assertEqual(depth, 0)
+
+    def test_writes_run_in_transaction(self):
+        """Test that a mutating request runs its handler in one transaction."""
+        depth = self._handler_atomic_depth(
+            AppSettingViewSet,
+            "update_current",
+            "post",
+            reverse("app-settings-update-current"),
+            data={"hide_failure_btn": True},
+            format="json",
+        )
+
+        self.assertEqual(depth, 1)
+
+    def test_async_dispatch_marks_async_views_non_atomic(self):
+        """Test that AsyncDispatchMixin alone exempts views with async handlers from ATOMIC_REQUESTS."""
+
+        class AsyncView(AsyncDispatchMixin, APIView):
+            async def get(self, request):
+                return Response()
+
+        class SyncView(AsyncDispatchMixin, APIView):
+            def get(self, request):
+                return Response()
+
+        class MixedViewSet(AsyncDispatchMixin, GenericViewSet):
+            async def retrieve(self, request, pk=None):
+                return Response()
+
+            def destroy(self, request, pk=None):
+                return Response()
+
+        def non_atomic(view):
+            return DEFAULT_DB_ALIAS in getattr(view, "_non_atomic_requests", set())
+
+        self.assertTrue(non_atomic(AsyncView.as_view()))
+        self.assertTrue(non_atomic(MixedViewSet.as_view({"get": "retrieve", "delete": "destroy"})))
+        self.assertFalse(non_atomic(SyncView.as_view()))
+        self.assertFalse(non_atomic(MixedViewSet.as_view({"delete": "destroy"})))
+
+    def test_async_views_are_served(self):
+        """Test that views with async handlers are not made atomic, which Django refuses."""
+        organization = Organization.objects.create(name="Test Org")
+        classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        worker = User.objects.create_user(
+            username="worker", password="password", organization=organization, classifier=classifier
+        )
+        Layout.objects.create(name="Test layout", organization=organization, classifier=classifier)
+        supervision = Supervision.objects.create(worker=worker, organization=organization, user=self.user)
+
+        urls = (
+            reverse("health_check"),
+            reverse("app-settings-detail", args=[1]),
+            reverse("app-settings-current"),
+            reverse("layout-list") + f"?supervision_id={supervision.pk}",
+            reverse("supervision_detail", args=[supervision.pk]),
+            reverse("user_last_active_supervision"),
+        )
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200, url)
+
+
+class ORJSONTestCase(SimpleTestCase):
+    """Test cases for the orjson renderer and parser."""
+
+    def test_renders_like_json_renderer(self):
+        """Test that the output is the same as the one of DRF's JSONRenderer."""
+        data = {
+            "id": 1,
+            "name": "Łódź — \u2028",
+            "date": datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "day": datetime(2024, 5, 1).date(),
+            "duration": timedelta(minutes=90),
+            "amount": Decimal("1.5"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "label": gettext_lazy("Organization"),
+            "nested": [{"a": None, "b": True}],
+            2: "non-string key",
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_renders_geometries_and_indent(self):
+        """Test that geometries are rendered as GeoJSON and an indent is honoured."""
+        rendered = ORJSONRenderer().render({"coordinates": Point(27.56, 53.9, srid=4326)})
+        self.assertEqual(json.loads(rendered), {"coordinates": {"type": "Point", "coordinates": [27.56, 53.9]}})
+
+        rendered = ORJSONRenderer().render({"id": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, b'{\n  "id": 1\n}')
+
+    def test_parser(self):
+        """Test that JSON is parsed in the declared charset and invalid JSON is rejected."""
+        parser = ORJSONParser()
+        self.assertEqual(parser.parse(BytesIO(b'{"text": "\xc5\x81"}')), {"text": "Ł"})
+        self.assertEqual(
+            parser.parse(BytesIO('{"text": "é"}'.encode("latin-1")), parser_context={"encoding": "latin-1"}),
+            {"text": "é"},
+        )
+        for body in (b'{"text": ', b'{"value": NaN}'):
+            with self.assertRaises(ParseError):
+                parser.parse(BytesIO(body))
+
+
+class MessagePackTestCase(TestCase):
+    """Test cases for the MessagePack renderer, parser and content negotiation."""
+
+    def test_render_and_parse(self):
+        """Test that datetimes become Timestamps and points extensions, and parse back to what serializers take."""
+        data = {
+            "start_date": "2024-05-01T13:30:15.500000+03:00",
+            "created": datetime(2024, 5, 1, 10, 30, tzinfo=dt_timezone.utc),
+            "naive": datetime(2024, 5, 1, 10, 30),
+            "coordinates": {"type": "Point", "coordinates": [27.56, 53.9]},
+            "amount": Decimal("1.5"),
+            "label": gettext_lazy("Organization"),
+            "items": (1, None, True),
+        }
+
+        rendered = MessagePackRenderer().render(data)
+        unpacked = msgpack.unpackb(rendered, ext_hook=msgpack.ExtType)
+        self.assertEqual(unpacked["start_date"], data["start_date"])
+        self.assertEqual(unpacked["created"], msgpack.Timestamp(1714559400))
+        self.assertEqual(unpacked["naive"], "2024-05-01T10:30:00")
+        self.assertEqual(unpacked["coordinates"].code, POINT_EXT_TYPE)
+        self.assertLess(len(rendered), len(ORJSONRenderer().render(data)))
+
+        parsed = MessagePackParser().parse(BytesIO(rendered))
+        self.assertEqual(parsed["start_date"], data["start_date"])
+        self.assertEqual(parsed["created"], data["created"])
+        self.assertEqual(parsed["coordinates"], data["coordinates"])
+        self.assertEqual(parsed["amount"], 1.5)
+        self.assertEqual(parsed["label"], str(data["label"]))
+        self.assertEqual(parsed["items"], [1, None, True])
+
+        for body in (b"\xc1", rendered[:-1], msgpack.packb(msgpack.ExtType(99, b""))):
+            with self.assertRaises(ParseError):
+                MessagePackParser().parse(BytesIO(body))
+
+    def test_content_negotiation(self):
+        """Test that MessagePack is served when accepted and JSON stays the default."""
+        user = User.objects.create_superuser(username="admin", email="admin@test.com", password="testpass")
+        Organization.objects.create(name="Test Org")
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse("organization_list")
+
+        response = client.get(url)
+        self.assertEqual(response["Content-Type"], "application/json")
+
+        response = client.get(url, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.content), client.get(url).json())
+
+    def test_datetime_fields_become_timestamps(self):
+        """Test that only datetime fields of serializers become Timestamps, when MessagePack is accepted."""
+
+        class TombstoneSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = Tombstone
+                fields = ("model", "deleted_date")
+
+        class TombstoneView(APIView):
+            authentication_classes = []
+            permission_classes = []
+
+            def get(self, request):
+                return Response(TombstoneSerializer(Tombstone.objects.get(), context={"request": request}).data)
+
+        deleted_date = datetime(2024, 5, 1, 10, 30, 15, 500000, tzinfo=dt_timezone.utc)
+        # Free text that looks like a datetime
+        Tombstone.objects.create(model="2024-05-01T10:30:15Z", object_id=1, deleted_date=deleted_date)
+        factory = APIRequestFactory()
+
+        response = TombstoneView.as_view()(factory.get("/", HTTP_ACCEPT="application/msgpack"))
+        response.render()
+        self.assertEqual(
+            msgpack.unpackb(response.content, timestamp=3),
+            {"model": "2024-05-01T10:30:15Z", "deleted_date": deleted_date},
+        )
+
+        response = TombstoneView.as_view()(factory.get("/"))
+        response.render()
+        self.assertEqual(json.loads(response.content)["deleted_date"], "2024-05-01T10:30:15.500000Z")
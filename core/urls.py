@@ -16,11 +16,11 @@ urlpatterns = [
     path(
         "classifiers/",
         views.ClassifierListView.as_view({"get": "list"}),
-        name="organization_list",
+        name="classifier_list",
     ),
     path(
         "classifiers/<int:pk>/",
         views.ClassifierListView.as_view({"get": "retrieve"}),
-        name="organization_detail",
+        name="classifier_detail",
     ),
 ]
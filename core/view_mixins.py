@@ -0,0 +1,141 @@
+import functools
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+from rest_framework.permissions import SAFE_METHODS
+
+from core import db_routers
+
+
+class AsyncDispatchMixin:
+    """
+    Let DRF views and viewsets declare ``async def`` handlers.
+
+    Authentication, permission and throttling checks run in a worker thread,
+    async handlers are awaited on the event loop and sync handlers of the same
+    view are run through ``sync_to_async``. Under ASGI a request waiting on
+    the database or cache no longer holds a worker.
+
+    Django refuses ATOMIC_REQUESTS for async views, so they are marked
+    non-atomic; AtomicWritesMixin gives their mutating handlers a transaction.
+    """
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        if actions is None:
+            # Plain APIView: Django marks the view as async when all handlers are.
+            view = super().as_view(**initkwargs)
+            return transaction.non_atomic_requests(view) if cls.view_is_async else view
+
+        view = super().as_view(actions, **initkwargs)
+        if not cls._has_async_handlers(actions):
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return transaction.non_atomic_requests(functools.update_wrapper(async_view, view))
+
+    @classmethod
+    def _has_async_handlers(cls, actions) -> bool:
+        handler_names = actions.values() if actions else cls.http_method_names
+        return any(iscoroutinefunction(getattr(cls, name, None)) for name in handler_names)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self._has_async_handlers(getattr(self, "action_map", None)):
+            return super().dispatch(request, *args, **kwargs)
+
+        return self.async_dispatch(request, *args, **kwargs)
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        """Async counterpart of APIView.dispatch."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """Async counterpart of GenericAPIView.get_object."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        obj = await queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).afirst()
+        if obj is None:
+            raise Http404
+
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def aget_serializer_data(self, *args, **kwargs):
+        """Serialize in a worker thread, nested relations may still hit the database."""
+        return await sync_to_async(lambda: self.get_serializer(*args, **kwargs).data)()
+
+
+class AtomicWritesMixin:
+    """
+    Per-method transaction policy in place of ATOMIC_REQUESTS.
+
+    Safe methods run in autocommit, so a long export or list holds no
+    transaction open on the primary. Mutating methods (creates, transitions,
+    finish, verify, comments) run their handler in one transaction, on the
+    sync and the async dispatch path alike.
+    """
+
+    @classonlymethod
+    def as_view(cls, *args, **kwargs):
+        return transaction.non_atomic_requests(super().as_view(*args, **kwargs))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        method = request.method.lower()
+        handler = getattr(self, method, None)
+        if request.method not in SAFE_METHODS and handler is not None and not iscoroutinefunction(handler):
+            # The handler is looked up after initial(), on both the sync and the async dispatch path
+            setattr(self, method, transaction.atomic(handler))
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe ``replica_actions`` of a view from a read replica.
+
+    The decision is made after authentication, so a user who has just written
+    keeps reading from the primary (see core.db_routers). Actions that are not
+    listed, e.g. the ones showing the user's own running state, stay on the
+    primary.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if (
+            request.method in SAFE_METHODS
+            and getattr(self, "action", None) in self.replica_actions
+            and not db_routers.is_pinned_to_primary(request.user)
+        ):
+            db_routers.route_reads_to_replica()
@@ -8,6 +8,7 @@ from drf_spectacular.types import OpenApiTypes
 from core import serializers
 from core.models import Organization, Classifier
 from core.permissions import IsSupervisor, IsSupervisorGroup, CustomDjangoModelPermissions
+from core.view_mixins import AtomicWritesMixin, ReplicaReadMixin
 
 
 @extend_schema_view(
@@ -39,7 +40,7 @@ from core.permissions import IsSupervisor, IsSupervisorGroup, CustomDjangoModelP
         }
     )
 )
-class OrganizationListView(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+class OrganizationListView(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
     """
     ViewSet for managing organizations.
     Provides list and retrieve operations for Organization model.
@@ -81,7 +82,7 @@ class OrganizationListView(ListModelMixin, RetrieveModelMixin, GenericViewSet):
         }
     )
 )
-class ClassifierListView(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+class ClassifierListView(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
     """
     ViewSet for managing classifiers.
     Provides list and retrieve operations for Classifier model.
@@ -0,0 +1,11 @@
+from django.urls import reverse
+
+from analytics.models import Supervision
+from core.benchmarking import benchmark
+
+
+@benchmark("layout_fetch", rounds=50)
+def layout_fetch(context):
+    supervision = Supervision.objects.filter(worker__username__startswith=f"{context.label}_").first()
+    url = f"{reverse('layout-list')}?supervision_id={supervision.pk}"
+    return lambda: context.request("get", url)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 19:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_tombstone'),
+        ('gallery', '0005_alter_imagegallery_created_date_and_more'),
+        ('layouts', '0008_activity_planned_end_time_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['updated_date'], name='activity_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activitygroup',
+            index=models.Index(fields=['updated_date'], name='activity_group_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='layout',
+            index=models.Index(fields=['updated_date'], name='layout_updated_idx'),
+        ),
+    ]
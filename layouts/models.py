@@ -26,6 +26,9 @@ class Layout(OrderedModel, CreatedUpdatedMixin):
     class Meta(OrderedModel.Meta):
         verbose_name = _("Layout")
         verbose_name_plural = _("Layouts")
+        indexes = [
+            models.Index(fields=["updated_date"], name="layout_updated_idx"),
+        ]
 
     def __str__(self):
         return self.name or _("Layout #") + self.id
@@ -64,6 +67,9 @@ class ActivityGroup(OrderedModel, CreatedUpdatedMixin):
         verbose_name = _("Activity Group")
         verbose_name_plural = _("Activity Groups")
         ordering = ("order",)
+        indexes = [
+            models.Index(fields=["updated_date"], name="activity_group_updated_idx"),
+        ]
 
 
 class Activity(OrderedModel, CreatedUpdatedMixin, PlannedStartEndTimeMixin):
@@ -83,6 +89,9 @@ class Activity(OrderedModel, CreatedUpdatedMixin, PlannedStartEndTimeMixin):
     class Meta(OrderedModel.Meta):
         verbose_name = _("Activity")
         verbose_name_plural = _("Activities")
+        indexes = [
+            models.Index(fields=["updated_date"], name="activity_updated_idx"),
+        ]
 
     @property
     def planned_delta(self):
@@ -1,3 +1,54 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from analytics.models import Supervision
+from core.models import Classifier, Organization
+from core.testing import QueryCountTestMixin
+from gallery.models import ImageGallery
+from layouts.models import Activity, ActivityGroup, Layout
+from users.models import User
+
+
+class LayoutQueryCountTestCase(QueryCountTestMixin, TestCase):
+    """Test that the layout list runs a bounded number of queries regardless of layout size."""
+
+    MAX_QUERIES = 5
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(
+            username="admin",
+            email="admin@test.com",
+            password="testpass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        organization = Organization.objects.create(name="Test Org")
+        classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        worker = User.objects.create_user(
+            username="worker",
+            email="worker@test.com",
+            password="testpass",
+            organization=organization,
+            classifier=classifier,
+        )
+        self.layout = Layout.objects.create(name="Test layout", organization=organization, classifier=classifier)
+        self.supervision = Supervision.objects.create(worker=worker, organization=organization, user=self.user)
+        self._create_activity_groups(1)
+
+    def _create_activity_groups(self, count=5):
+        for number in range(count):
+            image = ImageGallery.objects.create(name=f"Image {number}", image=f"gallery/image_{number}.png")
+            activity_group = ActivityGroup.objects.create(name=f"Group {number}", layout=self.layout, image=image)
+            for activity_number in range(3):
+                Activity.objects.create(name=f"Activity {activity_number}", activity_group=activity_group)
+
+    def test_layout_list(self):
+        """Test that the layout list does not query per activity group, image or activity."""
+        self.assertConstantRequestQueries(
+            self.MAX_QUERIES,
+            f"{reverse('layout-list')}?supervision_id={self.supervision.pk}",
+            self._create_activity_groups,
+        )
@@ -1,14 +1,17 @@
-from django.shortcuts import get_object_or_404
+from django.db.models import Prefetch
+from django.http import Http404
 from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import ListModelMixin
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from analytics.models import Supervision
 from core.permissions import CustomDjangoModelPermissions
+from core.view_mixins import AsyncDispatchMixin, AtomicWritesMixin, ReplicaReadMixin
 from layouts import serializers
-from layouts.models import Layout
+from layouts.models import ActivityGroup, Layout
 
 
 @extend_schema_view(
@@ -33,7 +36,7 @@ from layouts.models import Layout
         }
     )
 )
-class LayoutViewSet(ListModelMixin, GenericViewSet):
+class LayoutViewSet(AsyncDispatchMixin, AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, GenericViewSet):
     """
     ViewSet for managing layouts.
     Provides list operation for Layout model filtered by supervision's worker classifier.
@@ -41,19 +44,22 @@ class LayoutViewSet(ListModelMixin, GenericViewSet):
     permission_classes = (CustomDjangoModelPermissions,)
     serializer_class = serializers.LayoutSerializer
     queryset = Layout.objects.all().prefetch_related(
-        "activity_groups", "activity_groups__activities"
+        Prefetch("activity_groups", queryset=ActivityGroup.objects.select_related("image")),
+        "activity_groups__activities",
     )
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-
+    async def list(self, request, *args, **kwargs):
         supervision_id = self.request.query_params.get("supervision_id", None)
 
         if not supervision_id:
             raise ValidationError(
                 "The required query parameter `supervision_id` is missing"
             )
-        supervision = get_object_or_404(Supervision.objects, id=supervision_id)
-        qs = qs.filter(classifier_id=supervision.worker.classifier_id)
+        supervision = await Supervision.objects.filter(id=supervision_id).values("worker__classifier_id").afirst()
+        if supervision is None:
+            raise Http404
+
+        qs = self.get_queryset().filter(classifier_id=supervision["worker__classifier_id"])
+        layouts = [layout async for layout in qs]
 
-        return qs
+        return Response(await self.aget_serializer_data(layouts, many=True))
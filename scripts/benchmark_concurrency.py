@@ -0,0 +1,170 @@
+"""
+Compare concurrent-connection throughput of the WSGI and ASGI server profiles.
+
+Start both profiles against the same database, for example:
+
+    gunicorn config.wsgi --bind 127.0.0.1:5000 --workers 4
+    gunicorn config.asgi:application --worker-class uvicorn_worker.UvicornWorker \
+        --bind 127.0.0.1:5001 --workers 4
+
+then run:
+
+    python scripts/benchmark_concurrency.py \
+        --target wsgi=http://127.0.0.1:5000 --target asgi=http://127.0.0.1:5001 \
+        --path /api/health/ --path /api/app-settings/current/ \
+        --token <access token> --concurrency 200 --duration 20
+
+Every connection is a keep-alive HTTP/1.1 client issuing requests back to back,
+so the concurrency is the number of simultaneously open connections.
+Only the standard library is used.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+class Result:
+    def __init__(self, name: str, path: str):
+        self.name = name
+        self.path = path
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "target": self.name,
+            "path": self.path,
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": round(len(latencies) / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        }
+
+
+def _percentile(values: list, percent: int):
+    if not values:
+        return None
+
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return round(values[index] * 1000, 2)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get("content-length", 0)))
+
+    return status, headers.get("connection", "").lower() == "close"
+
+
+async def _connection(base_url: str, path: str, headers: dict, deadline: float, result: Result):
+    url = urlsplit(base_url)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+        + "".join(f"{key}: {value}\r\n" for key, value in headers.items())
+        + "\r\n"
+    ).encode()
+
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(url.hostname, port, ssl=url.scheme == "https")
+
+            started = time.monotonic()
+            writer.write(request)
+            await writer.drain()
+            status, close = await _read_response(reader)
+
+            if status >= 400:
+                result.errors += 1
+            else:
+                result.latencies.append(time.monotonic() - started)
+
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            result.errors += 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_target(name: str, base_url: str, path: str, args) -> Result:
+    headers = {"Accept": "application/json"}
+    if args.token:
+        headers["Authorization"] = f"Bearer {args.token}"
+
+    result = Result(name, path)
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(
+        *(_connection(base_url, path, headers, deadline, result) for _ in range(args.concurrency))
+    )
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, help="name=base_url, repeatable")
+    parser.add_argument("--path", action="append", help="request path, repeatable (default /api/health/)")
+    parser.add_argument("--token", help="JWT access token sent as a Bearer header")
+    parser.add_argument("--concurrency", type=int, default=100, help="open connections per run")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per target and path")
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.path or ["/api/health/"]:
+        for target in args.target:
+            name, _, base_url = target.partition("=")
+            result = asyncio.run(run_target(name, base_url, path, args))
+            results.append(result.as_dict())
+
+    print(f"{'target':<10} {'path':<36} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for row in results:
+        print(
+            f"{row['target']:<10} {row['path']:<36} {row['rps']:>9} {str(row['p50_ms']):>9} "
+            f"{str(row['p95_ms']):>9} {str(row['p99_ms']):>9} {row['errors']:>7}"
+        )
+
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump({"concurrency": args.concurrency, "duration": args.duration, "results": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 from django.utils.translation import gettext_lazy as _
 
 
@@ -9,5 +9,21 @@ class UsersConfig(AppConfig):
     verbose_name = _("users")
 
     def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.models import Group, Permission
+
         from users import signals
+
         post_migrate.connect(signals.create_default_groups, sender=self)
+
+        user_model = get_user_model()
+        post_save.connect(signals.invalidate_user_access_on_user_change, sender=user_model)
+        post_delete.connect(signals.invalidate_user_access_on_user_change, sender=user_model)
+        m2m_changed.connect(signals.invalidate_user_access_on_m2m_change, sender=user_model.groups.through)
+        m2m_changed.connect(signals.invalidate_user_access_on_m2m_change, sender=user_model.user_permissions.through)
+        m2m_changed.connect(signals.invalidate_all_user_access_on_change, sender=Group.permissions.through)
+        # Cached access holds group names and permission codenames, so renames invalidate it as well
+        post_save.connect(signals.invalidate_all_user_access_on_change, sender=Group)
+        post_save.connect(signals.invalidate_all_user_access_on_change, sender=Permission)
+        post_delete.connect(signals.invalidate_all_user_access_on_change, sender=Group)
+        post_delete.connect(signals.invalidate_all_user_access_on_change, sender=Permission)
@@ -0,0 +1,67 @@
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.cache import get_user_snapshot
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user from a short-lived cached snapshot
+    instead of loading the users_user row on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        user = get_user_snapshot(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document CachedJWTAuthentication with the same bearer scheme as simplejwt."""
+
+    target_class = "users.authentication.CachedJWTAuthentication"
+
+
+class QueryParamJWTAuthentication(CachedJWTAuthentication):
+    """
+    CachedJWTAuthentication with the access token in the ``access_token`` query parameter.
+    Only for streaming endpoints: browsers cannot send headers with EventSource,
+    and query strings end up in access logs.
+    """
+
+    query_param = "access_token"
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get(self.query_param)
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
+
+
+class QueryParamJWTScheme(OpenApiAuthenticationExtension):
+    target_class = "users.authentication.QueryParamJWTAuthentication"
+    name = "jwtQueryAuth"
+
+    def get_security_definition(self, auto_schema):
+        return {"type": "apiKey", "in": "query", "name": QueryParamJWTAuthentication.query_param}
@@ -0,0 +1,16 @@
+from django.contrib.auth.backends import ModelBackend
+
+from users.cache import get_user_permissions
+
+
+class CachedPermissionsBackend(ModelBackend):
+    """
+    ModelBackend that resolves permissions from the shared per-user cache
+    instead of querying user and group permissions on every request.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        return set(get_user_permissions(user_obj))
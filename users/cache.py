@@ -0,0 +1,140 @@
+"""
+Cached permission and group sets per user, and compact user snapshots for
+token authentication.
+Entries are stamped with a shared version, so changes to group permissions
+invalidate every user at once while membership changes drop a single entry.
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+
+from core.metrics import record_cache_read
+
+
+USER_ACCESS_CACHE_KEY = "user_access:{user_id}"
+USER_ACCESS_VERSION_CACHE_KEY = "user_access:version"
+USER_ACCESS_CACHE_TIMEOUT = 60 * 60
+
+USER_SNAPSHOT_CACHE_KEY = "user_snapshot:{user_id}"
+USER_SNAPSHOT_CACHE_TIMEOUT = 5 * 60
+USER_SNAPSHOT_FIELDS = (
+    "id",
+    "username",
+    "first_name",
+    "last_name",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "organization_id",
+    "classifier_id",
+    "enable_file_upload_only_from_camera",
+)
+
+
+def _get_version() -> str:
+    version = cache.get(USER_ACCESS_VERSION_CACHE_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(USER_ACCESS_VERSION_CACHE_KEY, version, None)
+        version = cache.get(USER_ACCESS_VERSION_CACHE_KEY, version)
+
+    return version
+
+
+def _load_user_access(user) -> dict:
+    from django.contrib.auth.backends import ModelBackend
+
+    backend = ModelBackend()
+    return {
+        "permissions": frozenset(backend.get_user_permissions(user) | backend.get_group_permissions(user)),
+        "groups": frozenset(user.groups.values_list("name", flat=True)),
+    }
+
+
+def get_user_access(user) -> dict:
+    """
+    Return {"version": str, "permissions": frozenset, "groups": frozenset} for the user.
+    The result is memoized on the user instance for the rest of the request.
+    """
+    access = getattr(user, "_access_cache", None)
+    if access is not None:
+        return access
+
+    key = USER_ACCESS_CACHE_KEY.format(user_id=user.pk)
+    cached = cache.get_many([key, USER_ACCESS_VERSION_CACHE_KEY])
+    version = cached.get(USER_ACCESS_VERSION_CACHE_KEY) or _get_version()
+    entry = cached.get(key)
+
+    hit = entry is not None and entry["version"] == version
+    record_cache_read("user_access", hit=hit)
+    if not hit:
+        entry = {"version": version, **_load_user_access(user)}
+        cache.set(key, entry, USER_ACCESS_CACHE_TIMEOUT)
+
+    user._access_cache = {"version": entry["version"], "permissions": entry["permissions"], "groups": entry["groups"]}
+    return user._access_cache
+
+
+def get_user_permissions(user) -> frozenset:
+    return get_user_access(user)["permissions"]
+
+
+def get_user_group_names(user) -> frozenset:
+    return get_user_access(user)["groups"]
+
+
+def get_user_snapshot(user_id):
+    """
+    Return a User built from the cached snapshot, or None if it does not exist.
+    Fields outside the snapshot are deferred and loaded on first access.
+    Permissions and group names are attached when their version is current.
+    """
+    user_model = get_user_model()
+    key = USER_SNAPSHOT_CACHE_KEY.format(user_id=user_id)
+    cached = cache.get_many([key, USER_ACCESS_VERSION_CACHE_KEY])
+    snapshot = cached.get(key)
+    record_cache_read("user_snapshot", hit=snapshot is not None)
+
+    if snapshot is None:
+        user = user_model.objects.only(*USER_SNAPSHOT_FIELDS).filter(pk=user_id).first()
+        if user is None:
+            return None
+
+        snapshot = {
+            "fields": {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS},
+            **get_user_access(user),
+        }
+        cache.set(key, snapshot, USER_SNAPSHOT_CACHE_TIMEOUT)
+        return user
+
+    fields = snapshot["fields"]
+    field_names = [field.attname for field in user_model._meta.concrete_fields if field.attname in fields]
+    user = user_model.from_db(
+        router.db_for_read(user_model),
+        field_names,
+        [fields[field_name] for field_name in field_names],
+    )
+    if snapshot["version"] == cached.get(USER_ACCESS_VERSION_CACHE_KEY):
+        user._access_cache = {
+            "version": snapshot["version"],
+            "permissions": snapshot["permissions"],
+            "groups": snapshot["groups"],
+        }
+
+    return user
+
+
+def invalidate_user_access(user_id: int) -> None:
+    cache.delete_many(
+        [
+            USER_ACCESS_CACHE_KEY.format(user_id=user_id),
+            USER_SNAPSHOT_CACHE_KEY.format(user_id=user_id),
+        ]
+    )
+
+
+def invalidate_all_user_access() -> None:
+    cache.set(USER_ACCESS_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
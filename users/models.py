@@ -5,6 +5,7 @@ from django.db.models import Q
 from core.models import Classifier, Organization
 from django.utils.translation import gettext_lazy as _
 
+from users.cache import get_user_group_names
 from users.signals import ConstantGroups
 
 
@@ -48,12 +49,12 @@ class User(AbstractUser):
 
     @property
     def is_worker(self) -> bool:
-        return self.groups.filter(name=ConstantGroups.WORKER).exists()
+        return ConstantGroups.WORKER in get_user_group_names(self)
 
     @property
     def is_supervisor(self) -> bool:
-        return self.groups.filter(name=ConstantGroups.SUPERVISOR).exists()
+        return ConstantGroups.SUPERVISOR in get_user_group_names(self)
 
     @property
     def is_admin(self) -> bool:
-        return self.groups.filter(name=ConstantGroups.ADMIN).exists() or self.is_staff or self.is_superuser
+        return self.is_staff or self.is_superuser or ConstantGroups.ADMIN in get_user_group_names(self)
@@ -3,6 +3,8 @@ from django.contrib.auth.models import Group, Permission
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
+from users.cache import invalidate_all_user_access, invalidate_user_access
+
 
 class ConstantGroups:
     """Constants for group names"""
@@ -76,6 +78,8 @@ def create_default_groups(sender, **kwargs):
             "change_imagegallery",
             "delete_imagegallery",
             "view_imagegallery",
+            "view_activitynorm",
+            "view_dailyactivityrollup",
         ],
         ConstantGroups.SUPERVISOR: [
             "add_activitystatistics",
@@ -102,6 +106,8 @@ def create_default_groups(sender, **kwargs):
             "view_user",
             "view_classifier",
             "view_organization",
+            "view_activitynorm",
+            "view_dailyactivityrollup",
         ],
         ConstantGroups.WORKER: [
             "view_activitystatistics",
@@ -116,6 +122,7 @@ def create_default_groups(sender, **kwargs):
             "view_user",
             "view_classifier",
             "view_organization",
+            "view_activitynorm",
         ],
     }
 
@@ -131,3 +138,28 @@ def create_default_groups(sender, **kwargs):
 
         if created:
             print(f"Created group: {group_name}")
+
+
+def invalidate_user_access_on_user_change(sender, instance, **kwargs):
+    """Drop the cached access and snapshot of a saved or deleted user."""
+    invalidate_user_access(instance.pk)
+
+
+def invalidate_user_access_on_m2m_change(sender, instance, action, reverse, **kwargs):
+    """Drop cached access when user groups or user permissions change."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if reverse:
+        invalidate_all_user_access()
+    else:
+        invalidate_user_access(instance.pk)
+
+
+def invalidate_all_user_access_on_change(sender, **kwargs):
+    """Drop every cached access when group permissions, groups or permissions change."""
+    action = kwargs.get("action")
+    if action is not None and action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    invalidate_all_user_access()
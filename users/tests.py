@@ -1,3 +1,168 @@
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from core.models import Classifier, Organization
+from core.testing import QueryCountTestMixin
+from users.authentication import CachedJWTAuthentication
+from users.models import User
+from users.signals import ConstantGroups
+
+
+class CachedUserAccessTestCase(TestCase):
+    """Tests for the cached per-user permission and group sets."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.group, _ = Group.objects.get_or_create(name=ConstantGroups.SUPERVISOR)
+        self.group.permissions.add(Permission.objects.get(codename="view_supervision"))
+        self.user = User.objects.create_user(username="supervisor", password="password")
+        self.user.groups.add(self.group)
+
+    def _fresh_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_permission_checks_hit_database_once(self):
+        """Test that repeated permission checks on a new request are served from cache."""
+        self.assertTrue(self._fresh_user().has_perm("analytics.view_supervision"))
+
+        user = self._fresh_user()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(user.has_perm("analytics.view_supervision"))
+            self.assertTrue(user.is_supervisor)
+            self.assertFalse(user.is_worker)
+
+        self.assertEqual(len(queries), 0)
+
+    def test_group_membership_change_invalidates_cache(self):
+        """Test that removing a user from a group drops its cached access."""
+        self.assertTrue(self._fresh_user().is_supervisor)
+
+        self.user.groups.remove(self.group)
+
+        user = self._fresh_user()
+        self.assertFalse(user.is_supervisor)
+        self.assertFalse(user.has_perm("analytics.view_supervision"))
+
+    def test_group_permission_change_invalidates_all_users(self):
+        """Test that changing group permissions invalidates every cached user."""
+        group = Group.objects.create(name="Auditors")
+        self.user.groups.add(group)
+        self.assertFalse(self._fresh_user().has_perm("analytics.delete_supervision"))
+
+        group.permissions.add(Permission.objects.get(codename="delete_supervision"))
+
+        self.assertTrue(self._fresh_user().has_perm("analytics.delete_supervision"))
+
+    def test_group_and_permission_renames_invalidate_all_users(self):
+        """Test that renaming a group or a permission invalidates every cached user."""
+        self.assertTrue(self._fresh_user().is_supervisor)
+        permission = Permission.objects.get(codename="view_supervision")
+
+        permission.codename = "browse_supervision"
+        permission.save()
+
+        user = self._fresh_user()
+        self.assertFalse(user.has_perm("analytics.view_supervision"))
+        self.assertTrue(user.has_perm("analytics.browse_supervision"))
+
+        self.group.name = "Inspectors"
+        self.group.save()
+
+        self.assertFalse(self._fresh_user().is_supervisor)
+
+    def test_inactive_user_has_no_permissions(self):
+        """Test that inactive users get no permissions from the cached backend."""
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertFalse(self._fresh_user().has_perm("analytics.view_supervision"))
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    """Tests for CachedJWTAuthentication."""
+
+    def setUp(self):
+        """Set up test data."""
+        cache.clear()
+        self.group, _ = Group.objects.get_or_create(name=ConstantGroups.WORKER)
+        self.user = User.objects.create_user(username="worker", password="password")
+        self.user.groups.add(self.group)
+        self.url = reverse("user_detail", args=[self.user.pk])
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {AccessToken.for_user(self.user)}"
+
+    def test_user_loaded_from_cache_after_first_request(self):
+        """Test that repeated authenticated requests do not query users_user for the request user."""
+        authentication = CachedJWTAuthentication()
+        token = authentication.get_validated_token(str(AccessToken.for_user(self.user)))
+        authentication.get_user(token)
+
+        with CaptureQueriesContext(connection) as queries:
+            user = authentication.get_user(token)
+            self.assertTrue(user.is_worker)
+            self.assertEqual(user.organization_id, self.user.organization_id)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that deactivating a user invalidates the cached snapshot."""
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        """Test that deleting a user invalidates the cached snapshot."""
+        self.client.get(self.url)
+
+        self.user.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+
+class UserQueryCountTestCase(QueryCountTestMixin, TestCase):
+    """Test that the user endpoints run a bounded number of queries regardless of result size."""
+
+    MAX_QUERIES = 5
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_superuser(username="admin", email="admin@test.com", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.organization = Organization.objects.create(name="Test Org")
+        self.classifier = Classifier.objects.create(code="1" * 18, name="Test classifier")
+        self.worker_group, _ = Group.objects.get_or_create(name=ConstantGroups.WORKER)
+
+    def _create_workers(self, count=5):
+        for _ in range(count):
+            worker = User.objects.create_user(
+                username=f"worker_{User.objects.count()}",
+                password="password",
+                organization=self.organization,
+                classifier=self.classifier,
+            )
+            worker.groups.add(self.worker_group)
+
+    def test_user_list(self):
+        """Test that the user list does not query per user."""
+        self._create_workers(1)
+
+        self.assertConstantRequestQueries(self.MAX_QUERIES, reverse("user"), self._create_workers)
+        self.assertConstantRequestQueries(self.MAX_QUERIES, f"{reverse('user')}?role=worker", self._create_workers)
+
+    def test_user_retrieve(self):
+        """Test that the user detail runs a fixed number of queries."""
+        self.assertConstantRequestQueries(
+            self.MAX_QUERIES, reverse("user_detail", args=[self.user.pk]), self._create_workers
+        )
@@ -6,6 +6,7 @@ from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiPara
 from drf_spectacular.types import OpenApiTypes
 
 from core.permissions import CustomDjangoModelPermissions
+from core.view_mixins import AtomicWritesMixin, ReplicaReadMixin
 from users import serializers
 from users.filters import UserFilter
 from users.models import User
@@ -71,7 +72,7 @@ from users.models import User
         }
     )
 )
-class UserListView(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+class UserListView(AtomicWritesMixin, ReplicaReadMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet):
     """
     ViewSet for managing users.
     Provides list and retrieve operations for User model with filtering and search capabilities.